@@ -0,0 +1,6 @@
+import os
+import sys
+
+
+# helpers shared by the tests, e.g. objfile
+sys.path.insert(0, os.path.dirname(__file__))
@@ -0,0 +1,42 @@
+import struct
+
+from zerotools.text.message.codec import get_encoder
+from zerotools.text.message.locale import Locale
+from zerotools.text.message.parser import InGameMessageParser
+
+
+def encode_text(text: str, suffix: bytes = b"\xff", locale: Locale = Locale.EN) -> bytes:
+    return get_encoder(locale).encode(text) + suffix
+
+
+def make_obj(tables: list) -> bytes:
+    # tables are lists of tables or of message bytes, laid out depth first right after their pointers
+    data = bytearray()
+
+    def place(entry) -> int:
+        offset = len(data)
+        if isinstance(entry, (bytes, bytearray)):
+            data.extend(entry)
+            return offset
+
+        data.extend(bytes(4 * len(entry)))
+        for n, child in enumerate(entry):
+            struct.pack_into("<I", data, offset + 4 * n, place(child))
+        return offset
+
+    place(tables)
+    return bytes(data)
+
+
+def make_parser(tables: list, locale: Locale = Locale.EN, lazy: bool = True) -> InGameMessageParser:
+    names = [f"TABLE{n}" for n in range(len(tables))]
+    return InGameMessageParser(make_obj(tables), table_names=names, locale=locale, lazy=lazy)
+
+
+def table_texts(ig_msg_parser: InGameMessageParser) -> list:
+    def walk(table):
+        if table.tables:
+            return [walk(sub_table) for sub_table in table.tables]
+        return [(message.message, message.suffix) for message in table.messages]
+
+    return walk(ig_msg_parser.msg_tables)
@@ -0,0 +1,46 @@
+import pytest
+
+from objfile import encode_text, make_parser, table_texts
+from zerotools.text.message.locale import Locale
+from zerotools.text.serializer.binaryfile import serialize_binary
+from zerotools.text.deserializer.binaryfile import rebuild_language_binary
+
+
+TABLES = [
+    [encode_text("Miku"), encode_text("La porte est fermée à clé.\nÇa ne s'ouvre pas.")],
+    [[encode_text("Camera Obscura"), encode_text("", b"\xfa\xff")], [encode_text("Mafuyu")]],
+]
+
+
+def test_round_trip(tmp_path):
+    ig_msg_parser = make_parser(TABLES)
+    bin_path = str(tmp_path / "IG_MSG_E.bin")
+    serialize_binary(ig_msg_parser, bin_path)
+
+    rebuilt = rebuild_language_binary(bin_path, Locale.EN)
+    assert rebuilt.table_names == ig_msg_parser.table_names
+    assert table_texts(rebuilt) == table_texts(ig_msg_parser)
+    assert rebuilt.encode() == ig_msg_parser.encode()
+
+
+def test_wrong_locale(tmp_path):
+    bin_path = str(tmp_path / "IG_MSG_E.bin")
+    serialize_binary(make_parser(TABLES), bin_path)
+
+    with pytest.raises(RuntimeError, match="holds EN text"):
+        rebuild_language_binary(bin_path, Locale.FR)
+
+
+def test_truncated(tmp_path):
+    bin_path = str(tmp_path / "IG_MSG_E.bin")
+    serialize_binary(make_parser(TABLES), bin_path)
+    with open(bin_path, "rb") as file_h:
+        data = file_h.read()
+
+    for size in range(len(data)):
+        truncated_path = str(tmp_path / "truncated.bin")
+        with open(truncated_path, "wb") as file_h:
+            file_h.write(data[:size])
+
+        with pytest.raises(RuntimeError):
+            rebuild_language_binary(truncated_path, Locale.EN)
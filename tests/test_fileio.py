@@ -0,0 +1,26 @@
+import os
+import random
+
+import pytest
+
+from zerotools.utils.fileio import move_fd_range
+
+
+@pytest.mark.parametrize(
+    "src_offset, dst_offset, size",
+    [(0, 1, 5000), (1, 0, 5000), (100, 3000, 4000), (3000, 100, 4000), (0, 6000, 5000), (6000, 0, 5000)],
+)
+@pytest.mark.parametrize("block_size", [256, 2**20])
+def test_move_fd_range(tmp_path, src_offset, dst_offset, size, block_size):
+    data = bytearray(random.Random(size).randbytes(12000))
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+
+    fd = os.open(path, os.O_RDWR)
+    try:
+        move_fd_range(fd, src_offset, dst_offset, size, block_size=block_size)
+    finally:
+        os.close(fd)
+
+    data[dst_offset : dst_offset + size] = data[src_offset : src_offset + size]
+    assert path.read_bytes() == data
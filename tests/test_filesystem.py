@@ -0,0 +1,57 @@
+import os
+
+from objfile import encode_text, make_parser, table_texts
+from zerotools.text.message.locale import Locale
+from zerotools.text.serializer.filesystem import serialize_fs
+from zerotools.text.deserializer.filesystem import rebuild_language_fs
+
+
+TABLES = [
+    [encode_text("Miku"), encode_text("La porte est fermée à clé.\nÇa ne s'ouvre pas.")],
+    [[encode_text("Camera Obscura"), encode_text("", b"\xfa\xff")], [encode_text("Mafuyu")]],
+]
+
+
+def _edit(path: str, text: str):
+    # the mtime is moved away from the one in the index, some file systems only keep seconds
+    stat = os.stat(path)
+    with open(path, mode="w", encoding="utf-8") as file_h:
+        file_h.write(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+def test_round_trip(tmp_path):
+    ig_msg_parser = make_parser(TABLES)
+    for index in (False, True):
+        out_folder = str(tmp_path / str(index))
+        serialize_fs(ig_msg_parser, out_folder, index=index)
+        assert os.path.isfile(os.path.join(out_folder, ".index")) == index
+
+        rebuilt = rebuild_language_fs(out_folder, Locale.EN)
+        assert rebuilt.table_names == ig_msg_parser.table_names
+        assert table_texts(rebuilt) == table_texts(ig_msg_parser)
+        assert rebuilt.encode() == ig_msg_parser.encode()
+
+
+def test_index_skips_listing(tmp_path):
+    serialize_fs(make_parser(TABLES), str(tmp_path), index=True)
+    # a stray file fails the listing of the folder, with an up to date index it is never listed
+    (tmp_path / "TABLE0" / "notes.txt").write_text("")
+    assert table_texts(rebuild_language_fs(str(tmp_path), Locale.EN))[0][0] == ("Miku", b"\xff")
+
+
+def test_index_stale_info(tmp_path):
+    serialize_fs(make_parser(TABLES), str(tmp_path), index=True)
+
+    # a message added to TABLE0 and the suffix of a TABLE1 message edited after the index was written
+    (tmp_path / "TABLE0" / "0002.TXT").write_text("Mio", encoding="utf-8")
+    _edit(str(tmp_path / "TABLE0" / ".info"), "0000,ff\n0001,ff\n0002,ff\n")
+    _edit(str(tmp_path / "TABLE1" / "0000" / ".info"), "0000,faff\n0001,faff\n")
+
+    rebuilt = rebuild_language_fs(str(tmp_path), Locale.EN)
+    assert [text for text, _ in table_texts(rebuilt)[0]] == [
+        "Miku",
+        "La porte est fermée à clé.\nÇa ne s'ouvre pas.",
+        "Mio",
+    ]
+    assert [suffix for _, suffix in table_texts(rebuilt)[1][0]] == [b"\xfa\xff", b"\xfa\xff"]
@@ -0,0 +1,78 @@
+import pytest
+
+from zerotools.utils.iso import ISO_SECTOR_SIZE
+from zerotools.imgbd.layout import LayoutStrategy, plan_layout, plan_layout_candidates
+from zerotools.imgbd.rebuild import compute_paddings
+
+
+def _sizes(*sectors: int) -> "list[int]":
+    return [n * ISO_SECTOR_SIZE for n in sectors]
+
+
+def test_aliases_keep_their_offset():
+    plan = plan_layout([0, 10, 10, 20], _sizes(10, 10, 10, 10), 30 * ISO_SECTOR_SIZE)
+    assert plan.strategy == LayoutStrategy.IN_PLACE
+    assert plan.offsets == [0, 10, 10, 20]
+
+
+def test_aliases_move_together():
+    candidates = plan_layout_candidates([0, 10, 10, 20], _sizes(10, 12, 12, 10), 50 * ISO_SECTOR_SIZE)
+    offsets = {(plan.strategy, plan.align): plan.offsets for plan in candidates}
+    assert offsets[LayoutStrategy.SLACK, 1] == [0, 30, 30, 20]
+    assert offsets[LayoutStrategy.SHIFT, 1] == [0, 10, 10, 22]
+
+
+def test_replaced_alias_gets_own_extent():
+    # F1 and F2 share sector 2, only F1 is replaced: F2 keeps the old data whatever happens to F1
+    for f1_sectors in (2, 3):
+        candidates = plan_layout_candidates(
+            [0, 2, 2, 4], _sizes(2, f1_sectors, 2, 2), 12 * ISO_SECTOR_SIZE, replaced={1}
+        )
+        assert (candidates[0].strategy, candidates[0].moved) == (LayoutStrategy.SLACK, [1])
+        offsets = {(plan.strategy, plan.align): plan.offsets for plan in candidates}
+        assert offsets[LayoutStrategy.SLACK, 1] == [0, 6, 2, 4]
+        for plan in candidates:
+            assert plan.offsets[1] != plan.offsets[2]
+            if plan.strategy != LayoutStrategy.REALIGN:
+                assert plan.offsets[2] == 2
+
+
+def test_replaced_aliases_one_keeps_offset():
+    plan = plan_layout([0, 2, 2, 4], _sizes(2, 2, 2, 2), 12 * ISO_SECTOR_SIZE, replaced={1, 2})
+    assert (plan.strategy, plan.moved) == (LayoutStrategy.SLACK, [2])
+    assert plan.offsets[:2] == [0, 2] and plan.offsets[3] == 4
+
+
+def test_aliases_pad_once():
+    # the smaller alias must not zero the end of the bigger one
+    paddings = compute_paddings([0, 0, 4], [3 * ISO_SECTOR_SIZE, 100, 100], 5 * ISO_SECTOR_SIZE)
+    assert paddings == [ISO_SECTOR_SIZE, 0, ISO_SECTOR_SIZE - 100]
+
+
+def test_entries_that_fit_stay_in_place():
+    plan = plan_layout([0, 4, 8], _sizes(4, 3, 4), 16 * ISO_SECTOR_SIZE)
+    assert plan.strategy == LayoutStrategy.IN_PLACE
+    assert plan.offsets == [0, 4, 8]
+    assert plan.moved == []
+
+
+def test_candidates_fewest_bytes_moved_first():
+    # the first entry grew, it moves to the free tail rather than pushing the others forward
+    candidates = plan_layout_candidates([0, 4, 8], _sizes(6, 3, 4), 20 * ISO_SECTOR_SIZE)
+    assert [plan.bytes_moved for plan in candidates] == sorted(plan.bytes_moved for plan in candidates)
+
+    plan = candidates[0]
+    assert (plan.strategy, plan.align, plan.offsets, plan.moved) == (LayoutStrategy.SLACK, 4, [12, 4, 8], [0])
+
+    offsets = {(plan.strategy, plan.align): plan.offsets for plan in candidates}
+    assert offsets[LayoutStrategy.SHIFT, 1] == [0, 6, 9]
+    assert offsets[LayoutStrategy.REALIGN, 4] == [0, 8, 12]
+
+
+def test_candidates_fit_in_img_bd():
+    candidates = plan_layout_candidates([0, 4, 8], _sizes(6, 4, 4), 14 * ISO_SECTOR_SIZE)
+    assert {plan.strategy for plan in candidates} == {LayoutStrategy.SHIFT, LayoutStrategy.REALIGN}
+    assert all(plan.img_bd_size <= 14 * ISO_SECTOR_SIZE for plan in candidates)
+
+    with pytest.raises(RuntimeError):
+        plan_layout([0, 4, 8], _sizes(6, 4, 4), 13 * ISO_SECTOR_SIZE)
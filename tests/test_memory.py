@@ -0,0 +1,42 @@
+import random
+import string
+
+from zerotools.text.memory import TranslationMemory
+from zerotools.text.message.locale import Locale
+from zerotools.utils.levenshtein import levenshtein
+
+
+def test_lookup_recall():
+    rnd = random.Random(3)
+    words = ["".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(2, 9))) for _ in range(300)]
+
+    # families of messages reused with a word changed here and there
+    texts = list()
+    for _ in range(60):
+        text = [rnd.choice(words) for _ in range(rnd.randint(2, 12))]
+        texts.append(" ".join(text))
+        for _ in range(rnd.randint(0, 15)):
+            changed = list(text)
+            changed[rnd.randrange(len(changed))] = rnd.choice(words)
+            texts.append(" ".join(changed))
+
+    memory = TranslationMemory(Locale.EN, Locale.FR)
+    for n, text in enumerate(texts):
+        memory.add(text, text.upper(), ("IG_MSG", "TABLE0", n))
+
+    # against every text scored, texts sharing few trigrams may be missed near min_score but never the best match
+    found = expected = 0
+    for _ in range(30):
+        query = rnd.choice(texts).split()
+        query[rnd.randrange(len(query))] = rnd.choice(words)
+        query = " ".join(query)
+
+        scores = [1 - levenshtein(query, text) / max(len(query), len(text)) for text in memory.texts]
+        best_scores = sorted((score for score in scores if score >= 0.5), reverse=True)[:5]
+        match_scores = [match.score for match in memory.lookup(query, k=5, min_score=0.5)]
+
+        assert match_scores[:1] == best_scores[:1]
+        found += sum(score == best_score for score, best_score in zip(match_scores, best_scores))
+        expected += len(best_scores)
+
+    assert found >= 0.97 * expected
@@ -0,0 +1,33 @@
+import struct
+
+import pytest
+
+from objfile import encode_text, make_parser, table_texts
+from zerotools.text.message.parser import InGameMessageParser
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_pointers_out_of_order(lazy):
+    # stock files may point back into the text without sharing it, the message without a terminator stops at the next
+    # start like it always did
+    messages = [encode_text("ABCD", suffix=b""), encode_text("EF"), encode_text("GH")]
+    offsets = [16, 16 + len(messages[0]), 16 + len(messages[0]) + len(messages[1])]
+    data = struct.pack("<4I", 4, offsets[2], offsets[0], offsets[1]) + b"".join(messages)
+
+    parser = InGameMessageParser(data, table_names=["TABLE0"], lazy=lazy)
+    assert table_texts(parser) == [[("GH", b"\xff"), ("ABCD", b""), ("EF", b"\xff")]]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_pooled_round_trip(lazy):
+    tables = [
+        [encode_text("The door is locked."), encode_text("Miku"), encode_text("locked."), encode_text("Miku")],
+        [encode_text("Camera Obscura"), encode_text("A"), encode_text("Obscura")],
+    ]
+    parser = make_parser(tables)
+    pooled = parser.encode(pooled=True)
+    assert len(pooled) < len(parser.encode())
+
+    pooled_parser = InGameMessageParser(pooled, table_names=parser.table_names, lazy=lazy)
+    assert table_texts(pooled_parser) == table_texts(parser)
+    assert pooled_parser.encode() == parser.encode()
@@ -0,0 +1,66 @@
+import io
+import random
+
+import pytest
+
+from zerotools.imgbd.patch import PatchRecordType, apply_patch, make_patch_records, write_patch
+from zerotools.imgbd.planner import CopyOperation, apply_copy_plan, plan_copy_operations
+
+
+def _operations() -> "list[CopyOperation]":
+    # an entry moved forward over its neighbour, a replaced one with its padding and a range zeroed
+    return [
+        CopyOperation("A", 4096, 3000, 96, src_offset=1024),
+        CopyOperation("B", 1024, 100, 924, source=io.BytesIO(b"b" * 100)),
+        CopyOperation("", 8192, 0, 512),
+    ]
+
+
+def test_records():
+    records = make_patch_records(_operations())
+    assert [(record.record_type, record.dst_offset, record.size) for record in records] == [
+        (PatchRecordType.COPY, 4096, 3000),
+        (PatchRecordType.ZERO, 7096, 96),
+        (PatchRecordType.DATA, 1024, 100),
+        (PatchRecordType.ZERO, 1124, 924),
+        (PatchRecordType.ZERO, 8192, 512),
+    ]
+
+
+def test_round_trip(tmp_path):
+    data = random.Random(1).randbytes(16384)
+    iso_path = tmp_path / "game.iso"
+    iso_path.write_bytes(data)
+
+    write_patch(str(tmp_path / "game.zpatch"), str(iso_path), _operations())
+    # the patch is only written, the iso is left untouched
+    assert iso_path.read_bytes() == data
+
+    expected_path = tmp_path / "expected.iso"
+    expected_path.write_bytes(data)
+    with open(expected_path, "rb+") as file_h:
+        apply_copy_plan(file_h, 0, plan_copy_operations(_operations()))
+
+    apply_patch(str(tmp_path / "game.zpatch"), str(iso_path))
+    assert iso_path.read_bytes() == expected_path.read_bytes()
+
+    # a patched iso is not the one the patch was made from
+    with pytest.raises(RuntimeError):
+        apply_patch(str(tmp_path / "game.zpatch"), str(iso_path))
+
+
+def test_corrupted_patch(tmp_path):
+    data = random.Random(2).randbytes(16384)
+    iso_path = tmp_path / "game.iso"
+    iso_path.write_bytes(data)
+
+    patch_path = tmp_path / "game.zpatch"
+    write_patch(str(patch_path), str(iso_path), _operations())
+
+    patch = bytearray(patch_path.read_bytes())
+    patch[40] ^= 1
+    patch_path.write_bytes(patch)
+
+    with pytest.raises(RuntimeError):
+        apply_patch(str(patch_path), str(iso_path))
+    assert iso_path.read_bytes() == data
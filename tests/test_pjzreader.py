@@ -0,0 +1,28 @@
+import struct
+
+from objfile import encode_text, make_obj, table_texts
+from zerotools.elf.version import ELF_EU
+from zerotools.zero.names import IMG_HD, IMG_BD
+from zerotools.zero.reader.pjzreader import PJZReader
+from zerotools.text.message.parser import InGameMessageParser
+from zerotools.utils.iso import ISO_SECTOR_SIZE
+
+
+def _write_fs(path, obj: bytes):
+    # extracted files of a game holding a single OBJ
+    (path / ELF_EU).write_bytes(b"\x00CD_FILE_DAT:T1=eIG_MSG_E_OBJ:0,;\x00")
+    (path / IMG_HD).write_bytes(struct.pack("<2I", 0, len(obj)))
+    (path / IMG_BD).write_bytes(obj + bytes(-len(obj) % ISO_SECTOR_SIZE))
+
+
+def test_close_with_views_alive(tmp_path):
+    obj = make_obj([[encode_text("Camera Obscura"), encode_text("Miku")]])
+    _write_fs(tmp_path, obj)
+
+    reader = PJZReader(str(tmp_path), mapped=True)
+    parser = InGameMessageParser(reader.view("IG_MSG_E.OBJ"), table_names=["TABLE0"], lazy=True)
+
+    # the lazily parsed messages still point into the map
+    reader.close()
+    assert table_texts(parser) == [[("Camera Obscura", b"\xff"), ("Miku", b"\xff")]]
+    assert parser.encode() == obj
@@ -0,0 +1,87 @@
+import io
+import random
+import tempfile
+
+import pytest
+
+from zerotools.imgbd.planner import CopyAction, CopyOperation, apply_copy_plan, plan_copy_operations
+
+
+def _expected(data: bytes, operations: "list[CopyOperation]") -> bytes:
+    # every operation reads the image as it was before any of them wrote
+    expected = bytearray(data)
+    for operation in operations:
+        if operation.source is not None:
+            content = operation.source.getvalue()
+        else:
+            content = data[operation.src_offset : operation.src_offset + operation.size]
+        end = operation.dst_offset + operation.size
+        expected[operation.dst_offset : end] = content
+        expected[end : end + operation.padding] = bytes(operation.padding)
+    return bytes(expected)
+
+
+def _apply(data: bytes, operations: "list[CopyOperation]") -> bytes:
+    plan = plan_copy_operations(operations)
+    with tempfile.TemporaryFile() as file_h:
+        file_h.write(data)
+        apply_copy_plan(file_h, 0, plan)
+        file_h.seek(0)
+        return file_h.read()
+
+
+def test_swap_is_staged():
+    data = b"A" * 16 + b"B" * 16
+    operations = [CopyOperation("A", 16, 16, src_offset=0), CopyOperation("B", 0, 16, src_offset=16)]
+
+    plan = plan_copy_operations(operations)
+    assert [action for action, _ in plan].count(CopyAction.STAGE) == 1
+    assert _apply(data, operations) == b"B" * 16 + b"A" * 16
+
+
+def test_rotation_stages_smallest():
+    data = b"A" * 8 + b"B" * 8 + b"C" * 8
+    operations = [
+        CopyOperation("A", 8, 8, src_offset=0),
+        CopyOperation("B", 16, 4, 4, src_offset=8),
+        CopyOperation("C", 0, 8, src_offset=16),
+    ]
+
+    plan = plan_copy_operations(operations)
+    assert [(action, operation.name) for action, operation in plan if action == CopyAction.STAGE] == [
+        (CopyAction.STAGE, "B")
+    ]
+    assert _apply(data, operations) == b"C" * 8 + b"A" * 8 + b"B" * 4 + bytes(4)
+
+
+def test_forward_shift_needs_no_stage():
+    data = bytes(range(64))
+    operations = [CopyOperation(str(n), n * 16 + 8, 16, src_offset=n * 16) for n in range(3)]
+
+    plan = plan_copy_operations(operations)
+    assert [operation.name for _, operation in plan] == ["2", "1", "0"]
+    assert all(action == CopyAction.COPY for action, _ in plan)
+    expected = _expected(data, operations)
+    assert _apply(data, operations) == expected
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_permutations(seed):
+    rnd = random.Random(seed)
+    slot = 64
+    num_entries = rnd.randint(1, 10)
+    destinations = list(range(num_entries + 2))
+    rnd.shuffle(destinations)
+
+    data = rnd.randbytes((num_entries + 2) * slot)
+    operations = list()
+    for n in range(num_entries):
+        size = rnd.randint(0, slot - 8)
+        source = io.BytesIO(rnd.randbytes(size)) if rnd.random() < 0.2 else None
+        padding = rnd.randint(0, slot - size - 8)
+        operations.append(
+            CopyOperation(str(n), destinations[n] * slot + rnd.randint(0, 8), size, padding, n * slot, source)
+        )
+
+    expected = _expected(data, operations)
+    assert _apply(data, operations) == expected
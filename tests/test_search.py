@@ -0,0 +1,45 @@
+from objfile import encode_text, make_parser
+from zerotools.text.search import SearchIndex, SearchSource, update_search_index
+from zerotools.text.message.locale import Locale
+
+
+def _source(path, file_name: str, locale: Locale, text: str, key=None) -> SearchSource:
+    # the path only has to exist, messages come from a hand-made OBJ
+    path.write_bytes(b"")
+    return SearchSource(
+        str(path), file_name, locale, key or [text], lambda: make_parser([[encode_text(text)]], locale=locale)
+    )
+
+
+def test_update_keeps_earlier_sources(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.json"))
+    assert index.update([_source(tmp_path / "a.iso", "IG_MSG_E.OBJ", Locale.EN, "Camera Obscura")]) == 1
+    assert index.update([_source(tmp_path / "b.json", "IG_MSG_F.OBJ", Locale.FR, "Appareil photo")]) == 1
+    index.save()
+
+    index = SearchIndex(str(tmp_path / "index.json"))
+    assert [hit.locale for hit in index.search("camera")] == [Locale.EN]
+    assert [hit.locale for hit in index.search("appareil")] == [Locale.FR]
+
+
+def test_update_reads_changed_sources_only(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.json"))
+    index.update([_source(tmp_path / "a.iso", "IG_MSG_E.OBJ", Locale.EN, "Miku")])
+    assert index.update([_source(tmp_path / "a.iso", "IG_MSG_E.OBJ", Locale.EN, "Miku")]) == 0
+
+    assert index.update([_source(tmp_path / "a.iso", "IG_MSG_E.OBJ", Locale.EN, "Mafuyu")]) == 1
+    assert index.search("miku") == []
+    assert [hit.message for hit in index.search("mafuyu")] == ["Mafuyu"]
+
+
+def test_removed_sources_are_pruned(tmp_path):
+    index_path = str(tmp_path / "index.json")
+    index = SearchIndex(index_path)
+    index.update([_source(tmp_path / "a.iso", "IG_MSG_E.OBJ", Locale.EN, "Miku")])
+    index.update([_source(tmp_path / "b.json", "IG_MSG_F.OBJ", Locale.FR, "Mafuyu")])
+    index.save()
+
+    (tmp_path / "a.iso").unlink()
+    index, num_updated = update_search_index(index_path)
+    assert num_updated == 0
+    assert [source.file for source in index.sources.values()] == ["IG_MSG_F.OBJ"]
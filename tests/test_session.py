@@ -0,0 +1,58 @@
+import json
+
+import zerotools.zero.session as session
+
+from dataclasses import asdict
+
+from zerotools.zero.reader.cache import TOCCache, fingerprint_iso, load_toc_cache, save_toc_cache, toc_cache_path
+
+
+def test_toc_cache_loaded_once(tmp_path, monkeypatch):
+    iso_path = tmp_path / "game.iso"
+    iso_path.write_bytes(b"")
+
+    toc_cache = TOCCache(
+        [0, 0, ""],
+        {"IMG_HD.BIN;1": [4096, 16], "IMG_BD.BIN;1": [8192, 32], "SLES_508.21;1": [12288, 64]},
+        "SLES_508.21;1",
+        "IMG_HD.BIN;1",
+        "IMG_BD.BIN;1",
+        [],
+        None,
+        "EN",
+        "SLES_508.21",
+    )
+    loads = []
+
+    def load_toc_cache(path):
+        loads.append(path)
+        return toc_cache
+
+    monkeypatch.setattr(session, "load_toc_cache", load_toc_cache)
+    monkeypatch.setattr(session, "invalidate_toc_cache", lambda path: None)
+
+    iso = session.ProjectZeroISO(str(iso_path))
+    assert iso.check_paths() == ("/SLES_508.21;1", "/IMG_HD.BIN;1", "/IMG_BD.BIN;1")
+    assert iso.get_file_offset("/IMG_BD.BIN;1") == 8192
+    assert iso.get_file_size("/IMG_BD.BIN;1") == 32
+    assert len(loads) == 1
+
+    iso.invalidate()
+    assert iso.get_file_size("/IMG_HD.BIN;1") == 16
+    assert len(loads) == 2
+
+
+def test_toc_cache_version(tmp_path):
+    iso_path = str(tmp_path / "game.iso")
+    with open(iso_path, "wb") as file_h:
+        file_h.write(bytes(4096))
+
+    toc_cache = TOCCache(fingerprint_iso(iso_path), {}, "", "", "", [["M0_EVENT_E.OBJ", 5, 4096, 100]], None, "EN", "")
+    save_toc_cache(iso_path, toc_cache)
+    assert load_toc_cache(iso_path).make_toc_entry_list()[0].size == 100
+
+    # caches of version 1 also held a max_size for each entry
+    old_cache = asdict(toc_cache) | {"version": 1, "toc": [["M0_EVENT_E.OBJ", 5, 4096, 100, 2048]]}
+    with open(toc_cache_path(iso_path), mode="w", encoding="utf-8") as file_h:
+        json.dump(old_cache, file_h)
+    assert load_toc_cache(iso_path) is None
@@ -0,0 +1,21 @@
+import argparse
+
+from zerotools.imgbd.patch import apply_patch
+
+
+def argument_parser():
+    parser = argparse.ArgumentParser(description="Apply a patch written by rebuild-iso onto a clean ISO.")
+    parser.add_argument("patch_path", type=str, help="patch path")
+    parser.add_argument("iso_path", type=str, help="ISO path")
+
+    return parser
+
+
+def main(args=None):
+    parser = argument_parser()
+    args = parser.parse_args(args)
+    apply_patch(args.patch_path, args.iso_path)
+
+
+if __name__ == "__main__":
+    main()
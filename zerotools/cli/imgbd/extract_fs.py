@@ -8,6 +8,7 @@ def argument_parser():
     parser.add_argument("img_bd_folder", type=str, help="folder path containing IMG_BD.BIN and IMG_HD.BIN")
     parser.add_argument("file_list_path", type=str, help="ordered list of file names to extract")
     parser.add_argument("out_folder", type=str, help="output folder")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of parallel extraction workers")
 
     return parser
 
@@ -15,7 +16,7 @@ def argument_parser():
 def main(args=None):
     parser = argument_parser()
     args = parser.parse_args(args)
-    extract_fs(args.img_bd_folder, args.file_list_path, args.out_folder)
+    extract_fs(args.img_bd_folder, args.file_list_path, args.out_folder, jobs=args.jobs)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,7 @@ def argument_parser():
     parser = argparse.ArgumentParser(description="Extract IMG_BD files from ISO.")
     parser.add_argument("iso_path", type=str, help="ISO path")
     parser.add_argument("out_folder", type=str, help="output folder")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of parallel extraction workers")
 
     return parser
 
@@ -14,7 +15,7 @@ def argument_parser():
 def main(args=None):
     parser = argument_parser()
     args = parser.parse_args(args)
-    extract_iso(args.iso_path, args.out_folder)
+    extract_iso(args.iso_path, args.out_folder, jobs=args.jobs)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@ from . import extract_fs
 from . import rebuild_fs
 from . import extract_iso
 from . import rebuild_iso
+from . import apply_patch
 
 
 class IMGBDArgParser(AutoParser):
@@ -13,6 +14,7 @@ class IMGBDArgParser(AutoParser):
         "extract-fs": ParserCommand(extract_fs.argument_parser(), extract_fs.main),
         "rebuild-iso": ParserCommand(rebuild_iso.argument_parser(), rebuild_iso.main),
         "rebuild-fs": ParserCommand(rebuild_fs.argument_parser(), rebuild_fs.main),
+        "apply-patch": ParserCommand(apply_patch.argument_parser(), apply_patch.main),
     }
 
 
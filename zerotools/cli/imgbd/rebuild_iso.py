@@ -7,6 +7,8 @@ def argument_parser():
     parser = argparse.ArgumentParser(description="Rebuild IMG_BD from files and inject it back into ISO.")
     parser.add_argument("img_bd_folder", type=str, help="IMG_BD folder")
     parser.add_argument("iso_path", type=str, help="ISO path")
+    parser.add_argument("-p", "--patch", type=str, default=None, help="write a patch file instead of modifying the ISO")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the candidate layouts")
 
     return parser
 
@@ -14,7 +16,11 @@ def argument_parser():
 def main(args=None):
     parser = argument_parser()
     args = parser.parse_args(args)
-    rebuild_img_bd_iso(args.img_bd_folder, args.iso_path)
+    layouts = rebuild_img_bd_iso(args.img_bd_folder, args.iso_path, patch_path=args.patch)
+
+    if args.verbose:
+        for n, layout in enumerate(layouts):
+            print(f"{'*' if n == 0 else ' '} {layout}")
 
 
 if __name__ == "__main__":
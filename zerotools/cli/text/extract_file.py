@@ -20,6 +20,10 @@ def argument_parser():
     parser.add_argument(
         "-l", "--locale", type=argenum_locale, required=True, help=f"locale (one of: {argenum_locale.option_str})"
     )
+    parser.add_argument("-i", "--index", action="store_true", help="FS: also write a .index file for faster rebuilds")
+    parser.add_argument(
+        "-r", "--report", action="store_true", help="print the overlapping and unreferenced byte ranges of the file"
+    )
 
     return parser
 
@@ -27,14 +31,23 @@ def argument_parser():
 def main(args=None):
     parser = argument_parser()
     args = parser.parse_args(args)
-    extract_file(
+    ig_msg_parser = extract_file(
         args.lang_file,
         args.out_file,
         name_list_src=args.name_list_src,
         locale=args.locale,
         serializer_format=args.format,
+        fs_index=args.index,
     )
 
+    if args.report:
+        report = ig_msg_parser.coverage_report()
+        print(f"{report.covered} of {report.file_size} bytes referenced")
+        for start, end in report.overlaps:
+            print(f"overlap      0x{start:08X}-0x{end:08X} ({end - start} bytes)")
+        for start, end in report.unreferenced:
+            print(f"unreferenced 0x{start:08X}-0x{end:08X} ({end - start} bytes)")
+
 
 if __name__ == "__main__":
     main()
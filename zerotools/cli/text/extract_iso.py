@@ -19,6 +19,7 @@ def argument_parser():
     parser.add_argument(
         "-l", "--locale", type=argenum_locale, default=None, help=f"locale (one of: {argenum_locale.option_str})"
     )
+    parser.add_argument("-i", "--index", action="store_true", help="FS: also write a .index file for faster rebuilds")
 
     return parser
 
@@ -26,7 +27,7 @@ def argument_parser():
 def main(args=None):
     parser = argument_parser()
     args = parser.parse_args(args)
-    extract_iso(args.iso_path, args.out_folder, serializer_format=args.format, locale=args.locale)
+    extract_iso(args.iso_path, args.out_folder, serializer_format=args.format, locale=args.locale, fs_index=args.index)
 
 
 if __name__ == "__main__":
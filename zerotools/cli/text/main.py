@@ -1,4 +1,4 @@
-from . import extract_iso, rebuild_iso, extract_file, rebuild_file
+from . import extract_iso, rebuild_iso, rebuild_iso_batch, extract_file, rebuild_file, search, memory
 from ...cli.parser import AutoParser, ParserCommand
 
 
@@ -8,8 +8,11 @@ class LanguageArgParser(AutoParser):
     commands = {
         "extract-iso": ParserCommand(extract_iso.argument_parser(), extract_iso.main),
         "rebuild-iso": ParserCommand(rebuild_iso.argument_parser(), rebuild_iso.main),
+        "rebuild-iso-batch": ParserCommand(rebuild_iso_batch.argument_parser(), rebuild_iso_batch.main),
         "extract-file": ParserCommand(extract_file.argument_parser(), extract_file.main),
         "rebuild-file": ParserCommand(rebuild_file.argument_parser(), rebuild_file.main),
+        "search": ParserCommand(search.argument_parser(), search.main),
+        "memory": ParserCommand(memory.argument_parser(), memory.main),
     }
 
 
@@ -0,0 +1,61 @@
+import sys
+import argparse
+
+from zerotools.cli.parser import ArgEnum
+from zerotools.cli.text.search import add_index_arguments, open_search_index
+from zerotools.text.memory import TranslationMemory
+from zerotools.text.message.locale import Locale
+
+
+def argument_parser():
+    argenum_locale = ArgEnum(Locale)
+
+    parser = argparse.ArgumentParser(description="Look up close texts and their existing translations.")
+    parser.add_argument("index_path", type=str, help="search index file, created or updated from the given sources")
+    parser.add_argument(
+        "source_locale", type=argenum_locale, help=f"locale of the texts (one of: {argenum_locale.option_str})"
+    )
+    parser.add_argument(
+        "target_locale", type=argenum_locale, help=f"locale of the translations (one of: {argenum_locale.option_str})"
+    )
+    parser.add_argument("text", type=str, nargs="*", help="texts to look up, read from stdin when omitted")
+    parser.add_argument("-q", "--queries", type=str, default=None, help="file with one text to look up per line")
+    parser.add_argument("-k", "--top", type=int, default=5, help="number of matches per text")
+    parser.add_argument("-s", "--min-score", type=float, default=0.5, help="lowest similarity, between 0 and 1")
+    add_index_arguments(parser)
+
+    return parser
+
+
+def main(args=None):
+    parser = argument_parser()
+    args = parser.parse_args(args)
+
+    if args.source_locale == args.target_locale:
+        parser.error("source and target locales must differ")
+
+    index = open_search_index(parser, args)
+    memory = TranslationMemory.from_search_index(index, args.source_locale, args.target_locale)
+    if args.verbose:
+        print(f"{len(memory)} texts with translations")
+
+    queries = list(args.text)
+    if args.queries is not None:
+        with open(args.queries, mode="r", encoding="utf-8") as file_h:
+            queries.extend(line for line in file_h.read().splitlines() if line)
+
+    # texts are looked up as they are typed when none is given
+    lines = queries if queries or args.queries is not None else (line.rstrip("\n") for line in sys.stdin)
+
+    # tab separated, \n in the texts stands for a new line like in the XML format
+    for line in lines:
+        text = line.replace("\\n", "\n")
+        for match in memory.lookup(text, k=args.top, min_score=args.min_score):
+            kind, table, number = match.locations[0]
+            source, target = match.source.replace("\n", "\\n"), match.target.replace("\n", "\\n")
+            print(f"{line}\t{match.score:.2f}\t{source}\t{target}\t{kind}\t{table}\t{number}\t{len(match.locations)}")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
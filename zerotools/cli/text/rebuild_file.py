@@ -19,6 +19,12 @@ def argument_parser():
     parser.add_argument(
         "-l", "--locale", type=argenum_locale, required=True, help=f"locale (one of: {argenum_locale.option_str})"
     )
+    parser.add_argument(
+        "-P", "--pooled", action="store_true", help="share storage between identical messages and common endings"
+    )
+    parser.add_argument(
+        "--no-encode-cache", action="store_true", help="encode every message, without the cache of earlier runs"
+    )
 
     return parser
 
@@ -26,7 +32,14 @@ def argument_parser():
 def main(args=None):
     parser = argument_parser()
     args = parser.parse_args(args)
-    rebuild_file(args.lang_path, args.out_language_path, locale=args.locale, serializer_format=args.format)
+    rebuild_file(
+        args.lang_path,
+        args.out_language_path,
+        locale=args.locale,
+        serializer_format=args.format,
+        pooled=args.pooled,
+        use_encode_cache=not args.no_encode_cache,
+    )
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ import argparse
 
 from zerotools.cli.parser import ArgEnum
 from zerotools.text.names import MessageNames
-from zerotools.text.rebuild import rebuild_iso
+from zerotools.text.rebuild import rebuild_iso, plan_rebuild_iso_batch
 from zerotools.text.serializer import LocalizationSerializerFormat
 from zerotools.text.message.locale import Locale
 
@@ -24,6 +24,17 @@ def argument_parser():
     parser.add_argument(
         "-t", "--type", type=argenum_names, required=True, help=f"text type (one of: {argenum_names.option_str})"
     )
+    parser.add_argument("-p", "--patch", type=str, default=None, help="write a patch file instead of modifying the ISO")
+    parser.add_argument(
+        "-P", "--pooled", action="store_true", help="share storage between identical messages and common endings"
+    )
+    parser.add_argument(
+        "--no-encode-cache", action="store_true", help="encode every message, without the cache of earlier runs"
+    )
+    parser.add_argument(
+        "-n", "--dry-run", action="store_true", help="only print the candidate layouts, the ISO is left untouched"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the candidate layouts")
 
     return parser
 
@@ -31,7 +42,30 @@ def argument_parser():
 def main(args=None):
     parser = argument_parser()
     args = parser.parse_args(args)
-    rebuild_iso(args.lang_path, args.iso_path, locale=args.locale, serializer_format=args.format, event_type=args.type)
+
+    if args.dry_run:
+        layouts = plan_rebuild_iso_batch(
+            [(args.lang_path, args.locale, args.type)],
+            args.iso_path,
+            serializer_format=args.format,
+            pooled=args.pooled,
+            use_encode_cache=not args.no_encode_cache,
+        )
+    else:
+        layouts = rebuild_iso(
+            args.lang_path,
+            args.iso_path,
+            locale=args.locale,
+            serializer_format=args.format,
+            event_type=args.type,
+            patch_path=args.patch,
+            pooled=args.pooled,
+            use_encode_cache=not args.no_encode_cache,
+        )
+
+    if args.verbose or args.dry_run:
+        for n, layout in enumerate(layouts):
+            print(f"{'*' if n == 0 else ' '} {layout}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+import argparse
+
+from zerotools.cli.parser import ArgEnum
+from zerotools.text.names import MessageNames
+from zerotools.text.rebuild import rebuild_iso_batch, plan_rebuild_iso_batch, find_lang_sources
+from zerotools.text.serializer import LocalizationSerializerFormat
+from zerotools.text.message.locale import Locale
+
+
+def argument_parser():
+    argenum_locale = ArgEnum(Locale)
+    argenum_format = ArgEnum(LocalizationSerializerFormat)
+    argenum_names = ArgEnum(MessageNames)
+
+    parser = argparse.ArgumentParser(description="Rebuild many in-game text files and inject them into ISO at once.")
+    parser.add_argument("lang_folder", type=str, help="folder with the extracted language files")
+    parser.add_argument("iso_path", type=str, help="ISO path")
+    parser.add_argument(
+        "-f", "--format", type=argenum_format, required=True, help=f"format (one of: {argenum_format.option_str})"
+    )
+    parser.add_argument(
+        "-l",
+        "--locale",
+        type=argenum_locale,
+        nargs="+",
+        required=True,
+        help=f"locales (any of: {argenum_locale.option_str})",
+    )
+    parser.add_argument(
+        "-t",
+        "--type",
+        type=argenum_names,
+        nargs="+",
+        default=None,
+        help=f"text types, all when omitted (any of: {argenum_names.option_str})",
+    )
+    parser.add_argument("-p", "--patch", type=str, default=None, help="write a patch file instead of modifying the ISO")
+    parser.add_argument(
+        "-P", "--pooled", action="store_true", help="share storage between identical messages and common endings"
+    )
+    parser.add_argument(
+        "--no-encode-cache", action="store_true", help="encode every message, without the cache of earlier runs"
+    )
+    parser.add_argument(
+        "-n", "--dry-run", action="store_true", help="only print the candidate layouts, the ISO is left untouched"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the candidate layouts")
+
+    return parser
+
+
+def main(args=None):
+    parser = argument_parser()
+    args = parser.parse_args(args)
+
+    sources = find_lang_sources(
+        args.lang_folder, serializer_format=args.format, locales=args.locale, event_types=args.type
+    )
+    if args.dry_run:
+        layouts = plan_rebuild_iso_batch(
+            sources,
+            args.iso_path,
+            serializer_format=args.format,
+            pooled=args.pooled,
+            use_encode_cache=not args.no_encode_cache,
+        )
+    else:
+        layouts = rebuild_iso_batch(
+            sources,
+            args.iso_path,
+            serializer_format=args.format,
+            patch_path=args.patch,
+            pooled=args.pooled,
+            use_encode_cache=not args.no_encode_cache,
+        )
+
+    if args.verbose or args.dry_run:
+        for lang_path, _, _ in sources:
+            print(lang_path)
+        for n, layout in enumerate(layouts):
+            print(f"{'*' if n == 0 else ' '} {layout}")
+
+
+if __name__ == "__main__":
+    main()
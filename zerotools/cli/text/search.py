@@ -0,0 +1,89 @@
+import argparse
+
+from zerotools.cli.parser import ArgEnum
+from zerotools.text.search import SearchIndex, update_search_index
+from zerotools.text.serializer import LocalizationSerializerFormat
+from zerotools.text.message.locale import Locale
+
+
+def add_index_arguments(parser: argparse.ArgumentParser):
+    argenum_locale = ArgEnum(Locale)
+    argenum_format = ArgEnum(LocalizationSerializerFormat)
+
+    parser.add_argument("-i", "--iso", type=str, nargs="+", default=[], help="ISO paths to add to the index")
+    parser.add_argument(
+        "-d",
+        "--lang-folder",
+        type=str,
+        nargs="+",
+        default=[],
+        help="folders with extracted language files to add to the index",
+    )
+    parser.add_argument(
+        "-f", "--format", type=argenum_format, default=None, help=f"format (one of: {argenum_format.option_str})"
+    )
+    parser.add_argument(
+        "-l",
+        "--locale",
+        type=argenum_locale,
+        nargs="+",
+        default=None,
+        help=f"locales to add to the index, all when omitted (any of: {argenum_locale.option_str})",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="print how many sources were indexed again")
+
+
+def open_search_index(parser: argparse.ArgumentParser, args) -> SearchIndex:
+    if args.lang_folder and args.format is None:
+        parser.error("--lang-folder requires --format")
+
+    # without sources, the index is used as it is
+    if not args.iso and not args.lang_folder:
+        index = SearchIndex(args.index_path)
+        if not index.sources:
+            parser.error("empty index, give --iso or --lang-folder to build it")
+        return index
+
+    index, num_updated = update_search_index(
+        args.index_path,
+        isos=args.iso,
+        lang_folders=args.lang_folder,
+        serializer_format=args.format,
+        locales=args.locale,
+    )
+    if args.verbose:
+        print(f"{num_updated} of {len(index.sources)} sources indexed")
+
+    return index
+
+
+def argument_parser():
+    parser = argparse.ArgumentParser(description="Search in-game text of every file and locale through an index.")
+    parser.add_argument("index_path", type=str, help="index file, created or updated from the given sources")
+    parser.add_argument("text", type=str, nargs="*", help="text to look for (case-insensitive)")
+    parser.add_argument("-q", "--queries", type=str, default=None, help="file with one text to look for per line")
+    add_index_arguments(parser)
+
+    return parser
+
+
+def main(args=None):
+    parser = argument_parser()
+    args = parser.parse_args(args)
+
+    index = open_search_index(parser, args)
+
+    queries = list(args.text)
+    if args.queries is not None:
+        with open(args.queries, mode="r", encoding="utf-8") as file_h:
+            queries.extend(line for line in file_h.read().splitlines() if line)
+
+    # tab separated, new lines in messages are written as \n like in the XML format
+    for query in queries:
+        for hit in index.search(query, locales=args.locale):
+            message = hit.message.replace("\n", "\\n")
+            print(f"{query}\t{hit.locale.value}\t{hit.file}\t{hit.table}\t{hit.number}\t{message}\t{hit.source}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from pycdlib.pycdlibio import PyCdlibIO
 
 from zerotools.utils.iso import iso_context, check_elf_path
 from zerotools.text.message.locale import Locale
+from zerotools.zero.reader.cache import load_toc_cache
 
 
 def get_ingame_message_table_names_from_elf(elf_fh: "BinaryIO | PyCdlibIO") -> "list[str] | None":
@@ -33,7 +34,12 @@ def get_ingame_message_table_names_from_elf(elf_fh: "BinaryIO | PyCdlibIO") -> "
     return list(ig_msg_names_str)
 
 
-def get_ingame_message_table_names_from_iso(iso_path: str):
+def get_ingame_message_table_names_from_iso(iso_path: str, use_cache: bool = True):
+    toc_cache = load_toc_cache(iso_path) if use_cache else None
+
+    if toc_cache is not None:
+        return toc_cache.table_names, Locale.from_string(toc_cache.locale), toc_cache.elf_name
+
     with iso_context(iso_path) as iso:
         elf_path = check_elf_path(iso)
 
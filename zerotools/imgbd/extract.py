@@ -1,15 +1,17 @@
 import os
 import struct
+import threading
 
 from typing import BinaryIO
+from concurrent.futures import ThreadPoolExecutor
 from pycdlib.pycdlibio import PyCdlibIO
 
 from zerotools.elf.utils import read_file_list_from_file
-from zerotools.utils.iso import iso_context, ISO_SECTOR_SIZE, check_path, check_elf_path
+from zerotools.utils.iso import ISO_SECTOR_SIZE
 from zerotools.zero.names import IMG_BD, IMG_HD
-from zerotools.utils.fileio import read_file, copy_file_fh
+from zerotools.zero.session import ProjectZeroISO, open_iso_session
+from zerotools.utils.fileio import read_file, copy_file_fh, copy_fd_range, preallocate_fd
 from zerotools.utils.subfile import SubFile
-from zerotools.elf.tables.filename import get_file_names_from_elf
 
 
 def make_file_entry_list(img_hd_fh: "BinaryIO | PyCdlibIO") -> "list[tuple[int, int]] | None":
@@ -43,36 +45,70 @@ def extract_img_bd(
     img_bd_fh.seek(pos, os.SEEK_SET)
 
 
-def extract_iso(iso_path: str, out_folder: str):
-    with iso_context(iso_path) as iso:
-        elf_path = check_elf_path(iso)
-        img_hd_path = check_path(iso, f"/{IMG_HD};1")
-        img_bd_path = check_path(iso, f"/{IMG_BD};1")
-
-        if not elf_path or not img_hd_path or not img_bd_path:
-            raise RuntimeError("cannot find elf, img_hd or img_bd in iso")
-
-        with iso.open_file_from_iso(iso_path=elf_path) as elf_fh:
-            file_list = get_file_names_from_elf(elf_fh)
-
-            if file_list is None:
-                raise RuntimeError("cannot get file names from elf")
-
-        with iso.open_file_from_iso(iso_path=img_hd_path) as img_hd_fh:
-            file_entry_list = make_file_entry_list(img_hd_fh)
-
-            if file_entry_list is None:
-                raise RuntimeError("cannot find file entry list")
+def extract_img_bd_file(
+    img_bd_path: str,
+    img_bd_offset: int,
+    file_list: list[str],
+    file_entry_list: list[tuple[int, int]],
+    out_folder: str,
+    /,
+    *,
+    jobs: int = 1,
+):
+    # every worker thread reads through its own descriptor
+    local = threading.local()
+    fds: list[int] = []
+    fds_lock = threading.Lock()
+
+    def _worker_fd():
+        fd = getattr(local, "fd", None)
+        if fd is None:
+            fd = os.open(img_bd_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            local.fd = fd
+            with fds_lock:
+                fds.append(fd)
+        return fd
+
+    def _extract_entry(name: str, offset: int, size: int):
+        fd = _worker_fd()
+        with open(os.path.join(out_folder, name), "wb") as out_fh:
+            out_fd = out_fh.fileno()
+            preallocate_fd(out_fd, size)
+            copy_fd_range(fd, out_fd, img_bd_offset + offset, 0, size)
+
+    try:
+        if jobs <= 1:
+            for name, (offset, size) in zip(file_list, file_entry_list):
+                _extract_entry(name, offset, size)
+            return
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(_extract_entry, name, offset, size)
+                for name, (offset, size) in zip(file_list, file_entry_list)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+
+def extract_iso(iso: "str | ProjectZeroISO", out_folder: str, /, *, jobs: int = 1):
+    with open_iso_session(iso) as session:
+        _, _, img_bd_path = session.check_paths()
+
+        file_list = session.file_list
+        file_entry_list = session.file_entry_list
+
+        img_bd_offset = session.get_file_offset(img_bd_path)
 
-        if len(file_list) != len(file_entry_list):
-            raise RuntimeError("invalid file entry list")
+        os.makedirs(out_folder, exist_ok=True)
 
-        with iso.open_file_from_iso(iso_path=img_bd_path) as img_bd_fh:
-            os.makedirs(out_folder, exist_ok=True)
-            extract_img_bd(img_bd_fh, file_list, file_entry_list, out_folder)
+        extract_img_bd_file(session.iso_path, img_bd_offset, file_list, file_entry_list, out_folder, jobs=jobs)
 
 
-def extract_fs(img_bd_folder: str, file_list_path: str, out_folder: str):
+def extract_fs(img_bd_folder: str, file_list_path: str, out_folder: str, /, *, jobs: int = 1):
     img_bd_path = os.path.join(img_bd_folder, IMG_BD)
     img_hd_path = os.path.join(img_bd_folder, IMG_HD)
 
@@ -90,6 +126,6 @@ def extract_fs(img_bd_folder: str, file_list_path: str, out_folder: str):
     if len(file_list) != len(file_entry_list):
         raise RuntimeError("invalid file entry list")
 
-    with open(img_bd_path, "rb") as img_bd_fh:
-        os.makedirs(out_folder, exist_ok=True)
-        extract_img_bd(img_bd_fh, file_list, file_entry_list, out_folder)
+    os.makedirs(out_folder, exist_ok=True)
+
+    extract_img_bd_file(img_bd_path, 0, file_list, file_entry_list, out_folder, jobs=jobs)
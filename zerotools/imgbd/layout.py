@@ -0,0 +1,226 @@
+import enum
+import math
+import bisect
+
+from dataclasses import dataclass
+
+from zerotools.utils.iso import ISO_SECTOR_SIZE
+
+
+ALIGN_VALUES = 16, 8, 4, 2, 1
+ALIGN_DEFAULT = ALIGN_VALUES[0]
+
+
+class LayoutStrategy(enum.Enum):
+    # every entry keeps its offset, grown entries fit in their own slack
+    IN_PLACE = "IN_PLACE"
+    # entries that outgrew their slot are relocated into free gaps
+    SLACK = "SLACK"
+    # entries that outgrew their slot push the following ones forward until some slack absorbs the growth
+    SHIFT = "SHIFT"
+    # every entry is laid out again back to back
+    REALIGN = "REALIGN"
+
+
+@dataclass
+class LayoutPlan:
+    strategy: LayoutStrategy
+    align: int
+    # offsets in sectors, in file list order
+    offsets: "list[int]"
+    img_bd_size: int
+    # indices of the entries whose offset changes
+    moved: "list[int]"
+    bytes_moved: int
+
+    def __str__(self):
+        return (
+            f"{self.strategy.value} (align {self.align}): "
+            f"{len(self.moved)} moved entries, {self.bytes_moved} bytes moved, {self.img_bd_size} bytes"
+        )
+
+
+def to_sectors(size: int) -> int:
+    return int(math.ceil(size / ISO_SECTOR_SIZE))
+
+
+def align_up(value: int, align: int) -> int:
+    return int(math.ceil(value / align)) * align
+
+
+def recalculate_img_bin_offsets(all_sizes, align=16):
+    offsets = [0]
+    for size in all_sizes:
+        current_offset = offsets[-1]
+        next_offset = current_offset + int(math.ceil(size / align / ISO_SECTOR_SIZE)) * align
+        offsets.append(next_offset)
+
+    offset, img_bd_size = offsets[:-1], offsets[-1] * ISO_SECTOR_SIZE
+
+    return offset, img_bd_size
+
+
+def _make_plan(
+    strategy: LayoutStrategy, align: int, old_offsets: "list[int]", offsets: "list[int]", sizes: "list[int]"
+) -> LayoutPlan:
+    img_bd_size = max((offset + to_sectors(size) for offset, size in zip(offsets, sizes)), default=0) * ISO_SECTOR_SIZE
+    moved = [n for n, (old_offset, offset) in enumerate(zip(old_offsets, offsets)) if old_offset != offset]
+    bytes_moved = sum(sizes[n] for n in moved)
+
+    return LayoutPlan(strategy, align, offsets, img_bd_size, moved, bytes_moved)
+
+
+def _slot_ends(old_offsets: "list[int]", capacity: int) -> "list[int]":
+    # a slot ends where the next entry starts, aliases (entries sharing an offset) share the slot
+    starts = sorted(set(old_offsets))
+    return [
+        starts[idx] if idx < len(starts) else capacity
+        for idx in (bisect.bisect_right(starts, offset) for offset in old_offsets)
+    ]
+
+
+def _detached_aliases(old_offsets: "list[int]", replaced: "set[int]") -> "set[int]":
+    # a replaced alias needs an extent of its own, the old data stays with the aliases that were not replaced.
+    # when every alias of an offset is replaced, the first one keeps it
+    aliases: "dict[int, list[int]]" = dict()
+    for n, offset in enumerate(old_offsets):
+        aliases.setdefault(offset, list()).append(n)
+
+    detached = set()
+    for group in aliases.values():
+        if len(group) > 1:
+            group_replaced = [n for n in group if n in replaced]
+            detached.update(group_replaced[1:] if len(group_replaced) == len(group) else group_replaced)
+
+    return detached
+
+
+def _free_gaps(offsets: "list[int]", sizes: "list[int]", placed: "list[int]", capacity: int) -> "list[tuple[int, int]]":
+    extents = sorted((offsets[n], offsets[n] + to_sectors(sizes[n])) for n in placed if sizes[n])
+
+    gaps = list()
+    cursor = 0
+    for start, end in extents:
+        if start > cursor:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+
+    if capacity > cursor:
+        gaps.append((cursor, capacity))
+
+    return gaps
+
+
+def _plan_slack(
+    old_offsets: "list[int]",
+    sizes: "list[int]",
+    misfits: "list[int]",
+    detached: "set[int]",
+    capacity: int,
+    align: int,
+) -> "list[int] | None":
+    offsets = list(old_offsets)
+    misfit_set = set(misfits)
+    placed = [n for n in range(len(sizes)) if n not in misfit_set]
+
+    # misfits that were aliases move together as one extent, as big as their biggest entry, detached ones move alone
+    groups: "dict[tuple[int, int], list[int]]" = dict()
+    for n in misfits:
+        groups.setdefault((old_offsets[n], n if n in detached else -1), list()).append(n)
+
+    def _needed(group: "list[int]") -> int:
+        return max(to_sectors(sizes[n]) for n in group)
+
+    # biggest entries first, they have the fewest gaps to choose from
+    for (old_offset, _), group in sorted(groups.items(), key=lambda item: _needed(item[1]), reverse=True):
+        needed = _needed(group)
+
+        gaps = _free_gaps(offsets, sizes, placed, capacity)
+
+        # entries whose slot grew large enough (a neighbour moved away) stay where they are
+        if any(start <= old_offset and old_offset + needed <= end for start, end in gaps):
+            placed.extend(group)
+            continue
+
+        best = None
+        for start, end in gaps:
+            offset = align_up(start, align)
+            if offset + needed <= end and (best is None or end - start < best[1] - best[0]):
+                best = start, end, offset
+
+        if best is None:
+            return None
+
+        for n in group:
+            offsets[n] = best[2]
+        placed.extend(group)
+
+    return offsets
+
+
+def _plan_shift(
+    old_offsets: "list[int]", sizes: "list[int]", detached: "set[int]", capacity: int, align: int
+) -> "list[int] | None":
+    offsets = list(old_offsets)
+
+    end = 0
+    previous = -1
+    for n in sorted(range(len(sizes)), key=lambda n: (old_offsets[n], n in detached, n)):
+        # aliases are shifted together, they keep sharing their offset. detached ones come last and go after them
+        if n not in detached and previous >= 0 and old_offsets[previous] == old_offsets[n]:
+            offsets[n] = offsets[previous]
+        elif offsets[n] < end:
+            offsets[n] = align_up(end, align)
+        end = max(end, offsets[n] + to_sectors(sizes[n]))
+        previous = n
+
+    return offsets if end <= capacity else None
+
+
+def plan_layout_candidates(
+    old_offsets: "list[int]", sizes: "list[int]", max_img_bd_size: int, /, *, replaced: "set[int] | None" = None
+) -> "list[LayoutPlan]":
+    # old_offsets in sectors and new sizes in bytes, both in file list order. replaced holds the indices of the
+    # entries whose content changes, only needed for those sharing their offset with others.
+    # returns the candidates that fit in max_img_bd_size, best first (fewest bytes moved)
+    capacity = max_img_bd_size // ISO_SECTOR_SIZE
+    slot_ends = _slot_ends(old_offsets, capacity)
+    detached = _detached_aliases(old_offsets, replaced or set())
+
+    misfits = [n for n, size in enumerate(sizes) if n in detached or old_offsets[n] + to_sectors(size) > slot_ends[n]]
+
+    candidates = list()
+
+    if not misfits:
+        candidates.append(_make_plan(LayoutStrategy.IN_PLACE, 1, old_offsets, list(old_offsets), sizes))
+
+    else:
+        for align in ALIGN_VALUES:
+            offsets = _plan_slack(old_offsets, sizes, misfits, detached, capacity, align)
+            if offsets is not None:
+                candidates.append(_make_plan(LayoutStrategy.SLACK, align, old_offsets, offsets, sizes))
+
+            offsets = _plan_shift(old_offsets, sizes, detached, capacity, align)
+            if offsets is not None:
+                candidates.append(_make_plan(LayoutStrategy.SHIFT, align, old_offsets, offsets, sizes))
+
+        # the global realignment is the last resort, only keep the first alignment that fits
+        for align in ALIGN_VALUES:
+            offsets, img_bd_size = recalculate_img_bin_offsets(sizes, align=align)
+            if img_bd_size <= max_img_bd_size:
+                candidates.append(_make_plan(LayoutStrategy.REALIGN, align, old_offsets, offsets, sizes))
+                break
+
+    # sort is stable: on ties the strategy order above (and bigger alignments) wins
+    return sorted(candidates, key=lambda plan: (plan.bytes_moved, len(plan.moved)))
+
+
+def plan_layout(
+    old_offsets: "list[int]", sizes: "list[int]", max_img_bd_size: int, /, *, replaced: "set[int] | None" = None
+) -> LayoutPlan:
+    candidates = plan_layout_candidates(old_offsets, sizes, max_img_bd_size, replaced=replaced)
+
+    if not candidates:
+        raise RuntimeError("cannot find a layout to rebuild img_bd")
+
+    return candidates[0]
@@ -0,0 +1,208 @@
+import os
+import enum
+import struct
+import hashlib
+
+from typing import BinaryIO
+from dataclasses import dataclass
+
+from zerotools.utils.subfile import SubFile
+from zerotools.utils.fileio import COPY_BLOCK_SIZE, ZERO_VIEW, pread_fd
+from zerotools.zero.reader.cache import invalidate_toc_cache
+from zerotools.imgbd.planner import CopyOperation, apply_copy_plan, plan_copy_operations
+
+
+PATCH_MAGIC = b"ZTPATCH1"
+
+# magic, source iso size, record count
+PATCH_HEADER = struct.Struct("<8sQI")
+# record type, destination offset, size, source offset (COPY only)
+PATCH_RECORD = struct.Struct("<BQQQ")
+# sha1 of the source ranges, sha1 of the patched ranges, sha1 of the patch up to here
+PATCH_FOOTER = struct.Struct("<20s20s20s")
+
+
+class PatchRecordType(enum.Enum):
+    # bytes stored in the patch
+    DATA = 1
+    # bytes copied from elsewhere in the source iso (a moved entry)
+    COPY = 2
+    # zero padding
+    ZERO = 3
+
+
+@dataclass
+class PatchRecord:
+    record_type: PatchRecordType
+    dst_offset: int
+    size: int
+    src_offset: int = -1
+    source: "BinaryIO | None" = None
+
+
+def make_patch_records(operations: "list[CopyOperation]") -> "list[PatchRecord]":
+    # operations offsets are absolute offsets in the iso
+    records = list()
+    for operation in operations:
+        if operation.size and operation.in_place:
+            if operation.src_offset != operation.dst_offset:
+                records.append(
+                    PatchRecord(PatchRecordType.COPY, operation.dst_offset, operation.size, operation.src_offset)
+                )
+        elif operation.size and operation.source is not None:
+            records.append(
+                PatchRecord(PatchRecordType.DATA, operation.dst_offset, operation.size, source=operation.source)
+            )
+
+        if operation.padding:
+            records.append(PatchRecord(PatchRecordType.ZERO, operation.dst_offset + operation.size, operation.padding))
+
+    return records
+
+
+def _hash_fd_range(digest, fd: int, offset: int, size: int):
+    while size > 0:
+        data = pread_fd(fd, min(COPY_BLOCK_SIZE, size), offset)
+        if not data:
+            raise RuntimeError("patch range is out of the iso")
+        digest.update(data)
+        offset += len(data)
+        size -= len(data)
+
+
+def _hash_zeros(digest, size: int):
+    while size > 0:
+        block = min(len(ZERO_VIEW), size)
+        digest.update(ZERO_VIEW[:block])
+        size -= block
+
+
+def _hash_source(fd: int, source_size: int, records: "list[PatchRecord]") -> bytes:
+    # everything the patch overwrites or copies from, so that it only applies onto the iso it was made from
+    digest = hashlib.sha1(struct.pack("<Q", source_size))
+    for record in records:
+        _hash_fd_range(digest, fd, record.dst_offset, record.size)
+        if record.record_type == PatchRecordType.COPY:
+            _hash_fd_range(digest, fd, record.src_offset, record.size)
+    return digest.digest()
+
+
+def write_patch(patch_path: str, iso_path: str, operations: "list[CopyOperation]"):
+    records = make_patch_records(operations)
+
+    with open(iso_path, "rb") as iso_fh:
+        iso_fd = iso_fh.fileno()
+        source_size = os.fstat(iso_fd).st_size
+
+        source_sha1 = _hash_source(iso_fd, source_size, records)
+        target_digest = hashlib.sha1()
+
+        with open(patch_path, "wb") as patch_fh:
+            patch_fh.write(PATCH_HEADER.pack(PATCH_MAGIC, source_size, len(records)))
+
+            for record in records:
+                patch_fh.write(
+                    PATCH_RECORD.pack(
+                        record.record_type.value, record.dst_offset, record.size, max(0, record.src_offset)
+                    )
+                )
+
+                if record.record_type == PatchRecordType.DATA and record.source is not None:
+                    record.source.seek(0, os.SEEK_SET)
+                    size = record.size
+                    while size > 0:
+                        data = record.source.read(min(COPY_BLOCK_SIZE, size))
+                        if not data:
+                            raise RuntimeError("patch source is shorter than its entry")
+                        patch_fh.write(data)
+                        target_digest.update(data)
+                        size -= len(data)
+
+                elif record.record_type == PatchRecordType.COPY:
+                    _hash_fd_range(target_digest, iso_fd, record.src_offset, record.size)
+
+                else:
+                    _hash_zeros(target_digest, record.size)
+
+    with open(patch_path, "rb+") as patch_fh:
+        patch_digest = hashlib.sha1()
+        data = patch_fh.read(COPY_BLOCK_SIZE)
+        while data:
+            patch_digest.update(data)
+            data = patch_fh.read(COPY_BLOCK_SIZE)
+
+        patch_digest.update(source_sha1 + target_digest.digest())
+        patch_fh.write(PATCH_FOOTER.pack(source_sha1, target_digest.digest(), patch_digest.digest()))
+
+
+def read_patch(patch_fh: BinaryIO) -> "tuple[int, list[PatchRecord], bytes, bytes]":
+    patch_size = patch_fh.seek(0, os.SEEK_END)
+    if patch_size < PATCH_HEADER.size + PATCH_FOOTER.size:
+        raise RuntimeError("invalid patch file")
+
+    # the last sha1 covers everything before it, footer checksums included
+    patch_fh.seek(0, os.SEEK_SET)
+    patch_digest = hashlib.sha1()
+    remaining = patch_size - hashlib.sha1().digest_size
+    while remaining > 0:
+        data = patch_fh.read(min(COPY_BLOCK_SIZE, remaining))
+        patch_digest.update(data)
+        remaining -= len(data)
+
+    patch_fh.seek(patch_size - PATCH_FOOTER.size, os.SEEK_SET)
+    source_sha1, target_sha1, patch_sha1 = PATCH_FOOTER.unpack(patch_fh.read(PATCH_FOOTER.size))
+
+    if patch_digest.digest() != patch_sha1:
+        raise RuntimeError("patch file is corrupted")
+
+    patch_fh.seek(0, os.SEEK_SET)
+    magic, source_size, record_count = PATCH_HEADER.unpack(patch_fh.read(PATCH_HEADER.size))
+
+    if magic != PATCH_MAGIC:
+        raise RuntimeError("invalid patch file")
+
+    records = list()
+    for _ in range(record_count):
+        record_type, dst_offset, size, src_offset = PATCH_RECORD.unpack(patch_fh.read(PATCH_RECORD.size))
+        record = PatchRecord(PatchRecordType(record_type), dst_offset, size)
+
+        if record.record_type == PatchRecordType.DATA:
+            record.source = SubFile(patch_fh, offset=patch_fh.tell(), size=size)
+            patch_fh.seek(size, os.SEEK_CUR)
+        elif record.record_type == PatchRecordType.COPY:
+            record.src_offset = src_offset
+
+        records.append(record)
+
+    return source_size, records, source_sha1, target_sha1
+
+
+def apply_patch(patch_path: str, iso_path: str):
+    with open(patch_path, "rb") as patch_fh:
+        source_size, records, source_sha1, target_sha1 = read_patch(patch_fh)
+
+        with open(iso_path, "rb+") as iso_fh:
+            iso_fd = iso_fh.fileno()
+
+            if os.fstat(iso_fd).st_size != source_size or _hash_source(iso_fd, source_size, records) != source_sha1:
+                raise RuntimeError("patch does not match the iso (already patched or a different image?)")
+
+            operations = list()
+            for record in records:
+                if record.record_type == PatchRecordType.ZERO:
+                    operations.append(CopyOperation("", record.dst_offset, 0, record.size))
+                else:
+                    operations.append(
+                        CopyOperation("", record.dst_offset, record.size, 0, record.src_offset, record.source)
+                    )
+
+            # copies read from the source image, so the usual in-place ordering applies
+            invalidate_toc_cache(iso_path)
+            apply_copy_plan(iso_fh, 0, plan_copy_operations(operations))
+
+            target_digest = hashlib.sha1()
+            for record in records:
+                _hash_fd_range(target_digest, iso_fd, record.dst_offset, record.size)
+
+            if target_digest.digest() != target_sha1:
+                raise RuntimeError("patched iso does not match the expected result")
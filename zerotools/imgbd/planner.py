@@ -0,0 +1,139 @@
+import enum
+import heapq
+import bisect
+import tempfile
+
+from typing import BinaryIO, cast
+from dataclasses import dataclass
+
+from zerotools.utils.fileio import copy_range_pread, move_fd_range, write_fh_to_fd, zero_fill_fd
+
+
+# entries staged to break copy cycles spill to disk above this size
+STAGE_BUFFER_SIZE = 4 * 2**20
+
+
+class CopyAction(enum.Enum):
+    STAGE = "STAGE"
+    COPY = "COPY"
+
+
+@dataclass
+class CopyOperation:
+    name: str
+    dst_offset: int
+    size: int
+    padding: int = 0
+    # offset of the data inside the image being rewritten (-1 when it comes from elsewhere)
+    src_offset: int = -1
+    source: "BinaryIO | None" = None
+
+    @property
+    def in_place(self) -> bool:
+        return self.src_offset >= 0 and self.source is None
+
+    @property
+    def write_range(self) -> "tuple[int, int]":
+        return self.dst_offset, self.dst_offset + self.size + self.padding
+
+
+def _find_cycle(remaining: "set[int]", predecessors: "list[set[int]]") -> "list[int]":
+    # every remaining node still has a remaining predecessor, walking them must loop
+    node = min(remaining)
+    path: list[int] = []
+    visited: dict[int, int] = {}
+    while node not in visited:
+        visited[node] = len(path)
+        path.append(node)
+        node = min(predecessors[node] & remaining)
+    return path[visited[node] :]
+
+
+def plan_copy_operations(operations: "list[CopyOperation]") -> "list[tuple[CopyAction, CopyOperation]]":
+    # order operations rewriting a file in place so that no source range is read after being overwritten.
+    # cycles are broken by staging the smallest operation of the cycle (CopyAction.STAGE) into a buffer
+    reads = sorted(
+        ((op.src_offset, op.src_offset + op.size, n) for n, op in enumerate(operations) if op.in_place and op.size),
+        key=lambda r: r[0],
+    )
+    # entries may share data, so track the furthest end seen so far to keep the lookup sorted
+    read_max_ends = list()
+    for _, read_end, _ in reads:
+        read_max_ends.append(max(read_end, read_max_ends[-1] if read_max_ends else 0))
+
+    # predecessors[k]: operations whose source must be read before operation k writes
+    predecessors: list[set[int]] = [set() for _ in operations]
+    successors: list[set[int]] = [set() for _ in operations]
+
+    for k, op in enumerate(operations):
+        write_start, write_end = op.write_range
+        if write_start == write_end:
+            continue
+
+        idx = bisect.bisect_right(read_max_ends, write_start)
+        while idx < len(reads) and reads[idx][0] < write_end:
+            _, read_end, j = reads[idx]
+            if j != k and read_end > write_start:
+                predecessors[k].add(j)
+                successors[j].add(k)
+            idx += 1
+
+    plan: list[tuple[CopyAction, CopyOperation]] = []
+    remaining = set(range(len(operations)))
+    in_degree = [len(p) for p in predecessors]
+
+    def _release(n: int):
+        for k in successors[n]:
+            predecessors[k].discard(n)
+            in_degree[k] -= 1
+            if in_degree[k] == 0:
+                heapq.heappush(ready, -k)
+        successors[n] = set()
+
+    # process back to front so that plain forward shifts come out in a single sweep
+    ready = [-n for n in remaining if in_degree[n] == 0]
+    heapq.heapify(ready)
+
+    while remaining:
+        if not ready:
+            cycle = _find_cycle(remaining, predecessors)
+            staged = min(cycle, key=lambda n: operations[n].size)
+            plan.append((CopyAction.STAGE, operations[staged]))
+            _release(staged)
+            continue
+
+        n = -heapq.heappop(ready)
+        remaining.discard(n)
+        plan.append((CopyAction.COPY, operations[n]))
+        _release(n)
+
+    return plan
+
+
+def apply_copy_plan(file_h: BinaryIO, base_offset: int, plan: "list[tuple[CopyAction, CopyOperation]]"):
+    file_h.flush()
+    fd = file_h.fileno()
+
+    staged = list()
+
+    try:
+        for action, operation in plan:
+            if action == CopyAction.STAGE:
+                stage_h = tempfile.SpooledTemporaryFile(max_size=STAGE_BUFFER_SIZE)
+                copy_range_pread(fd, cast(BinaryIO, stage_h), base_offset + operation.src_offset, operation.size)
+                operation.source = cast(BinaryIO, stage_h)
+                staged.append(stage_h)
+                continue
+
+            if operation.in_place:
+                move_fd_range(
+                    fd, base_offset + operation.src_offset, base_offset + operation.dst_offset, operation.size
+                )
+            elif operation.source is not None:
+                write_fh_to_fd(operation.source, fd, base_offset + operation.dst_offset)
+
+            # fill with zeros up to the next entry
+            zero_fill_fd(fd, base_offset + operation.dst_offset + operation.size, operation.padding)
+    finally:
+        for stage_h in staged:
+            stage_h.close()
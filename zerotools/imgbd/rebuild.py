@@ -1,20 +1,24 @@
 import os
-import math
 import struct
+import contextlib
 import itertools
 
-from typing import List, BinaryIO
+from io import BytesIO
+from typing import List, BinaryIO, cast
 
 from zerotools.elf.utils import read_file_list_from_file
-from zerotools.utils.iso import iso_context, ISO_SECTOR_SIZE, check_path, check_elf_path
+from zerotools.utils.iso import ISO_SECTOR_SIZE
 from zerotools.zero.names import IMG_HD, IMG_BD
-from zerotools.elf.tables.filename import get_file_names_from_elf
+from zerotools.zero.session import ProjectZeroISO, open_iso_session
+from zerotools.zero.reader.entry import TOCEntry
 from zerotools.zero.reader.pjzreader import PJZReader
+from zerotools.utils.fileio import ZERO_BLOCK, ZERO_VIEW, copy_fd_range, zero_fill_fd, preallocate_fd
+from zerotools.imgbd.layout import ALIGN_VALUES, ALIGN_DEFAULT, LayoutPlan, plan_layout_candidates
+from zerotools.imgbd.layout import recalculate_img_bin_offsets, to_sectors
+from zerotools.imgbd.patch import write_patch
+from zerotools.imgbd.planner import CopyOperation, apply_copy_plan, plan_copy_operations
 
 
-ALIGN_VALUES = 16, 8, 4, 2, 1
-ALIGN_DEFAULT = ALIGN_VALUES[0]
-
 READ_BLOCK_SIZE = 16 * 1024
 
 
@@ -27,8 +31,8 @@ def copy_file_h(src_h: BinaryIO, dst_h: BinaryIO):
 
 def zero_pad_file_h(file_h: BinaryIO, padding: int = 0):
     while padding > 0:
-        padding_to_write = min(READ_BLOCK_SIZE, padding)
-        file_h.write(bytearray(padding_to_write))
+        padding_to_write = min(len(ZERO_BLOCK), padding)
+        file_h.write(ZERO_VIEW[:padding_to_write])
         padding -= padding_to_write
 
 
@@ -37,80 +41,137 @@ def check_img_bd_folder_files(img_bd_folder: str, file_list: List[str]):
     return set(file_list).issubset(files_in_folder)
 
 
-def recalculate_img_bin_offsets(all_sizes, align=16):
-    offsets = [0]
-    for size in all_sizes:
-        current_offset = offsets[-1]
-        next_offset = current_offset + int(math.ceil(size / align / ISO_SECTOR_SIZE)) * align
-        offsets.append(next_offset)
+def compute_paddings(offsets: List[int], file_size_list: List[int], img_bd_size: int) -> List[int]:
+    # zero padding after each entry up to the next one in the image, the image order may differ from the file order.
+    # of the entries sharing an offset only the biggest one pads, the others would zero its end
+    paddings = [0] * len(offsets)
+    order = sorted(range(len(offsets)), key=lambda n: (offsets[n], file_size_list[n], n))
+    for n, next_n in zip(order, order[1:] + [-1]):
+        next_offset = offsets[next_n] * ISO_SECTOR_SIZE if next_n >= 0 else img_bd_size
+        paddings[n] = max(0, next_offset - (offsets[n] * ISO_SECTOR_SIZE + file_size_list[n]))
+    return paddings
+
+
+def find_aliases(reader: PJZReader, file_list: List[str]) -> "set[str]":
+    # entries sharing their offset with another one
+    names_by_offset: "dict[int, list[str]]" = dict()
+    for file_name in file_list:
+        entry = reader.find_entry(file_name)
+        if entry is None:
+            raise RuntimeError(f"cannot find entry {file_name}")
+        names_by_offset.setdefault(entry.offset, list()).append(file_name)
+
+    return {file_name for names in names_by_offset.values() if len(names) > 1 for file_name in names}
+
+
+def choose_layout(
+    reader: PJZReader,
+    file_list: List[str],
+    file_size_list: List[int],
+    max_img_bd_size: int,
+    replaced: "set[str] | None" = None,
+) -> "tuple[LayoutPlan, List[LayoutPlan], int]":
+    old_offsets = list()
+    old_img_bd_size = 0
+    for file_name in file_list:
+        entry = reader.find_entry(file_name)
+        if entry is None:
+            raise RuntimeError(f"cannot find entry {file_name}")
+        old_offsets.append(entry.offset // ISO_SECTOR_SIZE)
+        old_img_bd_size = max(old_img_bd_size, entry.offset + to_sectors(entry.size) * ISO_SECTOR_SIZE)
+
+    # a replaced entry sharing its offset gets its own extent, the other entries keep the old data
+    replaced_ids = {n for n, file_name in enumerate(file_list) if file_name in (replaced or set())}
+    candidates = plan_layout_candidates(old_offsets, file_size_list, max_img_bd_size, replaced=replaced_ids)
+
+    if not candidates:
+        raise RuntimeError("cannot find a layout to rebuild img_bd")
+
+    # the area used by the old layout is zeroed as well, stale entries past the new end would survive otherwise
+    return candidates[0], candidates, max(candidates[0].img_bd_size, old_img_bd_size)
+
+
+def rebuild_img_bd_iso(
+    img_bd_folder: str, iso: "str | ProjectZeroISO", /, *, patch_path: "str | None" = None
+) -> List[LayoutPlan]:
+    with open_iso_session(iso) as session:
+        _, img_hd_path, img_bd_path = session.check_paths()
+
+        file_list = session.file_list
 
-    offset, img_bd_size = offsets[:-1], offsets[-1] * ISO_SECTOR_SIZE
+        if not check_img_bd_folder_files(img_bd_folder, file_list):
+            raise RuntimeError("cannot find all necessary files in img_bd folder")
 
-    return offset, img_bd_size
+        new_file_list = [os.path.join(img_bd_folder, f) for f in file_list]
 
+        if patch_path is not None:
+            # a patch only records the entries that differ from the ones in the iso
+            changed_files = list()
+            for file_name, new_file_name in zip(file_list, new_file_list):
+                with open(new_file_name, "rb") as file_h:
+                    if not is_same_entry_content(session.reader, file_name, file_h):
+                        changed_files.append((file_name, new_file_name))
 
-def rebuild_img_bd_iso(img_bd_folder: str, iso_path: str):
-    with iso_context(iso_path) as iso:
-        elf_path = check_elf_path(iso)
-        img_hd_path = check_path(iso, f"/{IMG_HD};1")
-        img_bd_path = check_path(iso, f"/{IMG_BD};1")
+            with contextlib.ExitStack() as stack:
+                replace_entries = {
+                    file_name: cast(BinaryIO, stack.enter_context(open(new_file_name, "rb")))
+                    for file_name, new_file_name in changed_files
+                }
 
-        if not elf_path or not img_hd_path or not img_bd_path:
-            raise RuntimeError("cannot find elf, img_hd or img_bd in iso")
+                if not replace_entries:
+                    commit_operations(session, [], patch_path=patch_path)
+                    return list()
 
-        with iso.open_file_from_iso(iso_path=elf_path) as elf_fh:
-            file_list = get_file_names_from_elf(elf_fh)
+                return rebuild_img_bd_iso_inplace(session, replace_entries, patch_path=patch_path)
 
-        if file_list is None:
-            raise RuntimeError("cannot get file names from elf")
+        file_size_list = [os.stat(f).st_size for f in new_file_list]
 
-        if not check_img_bd_folder_files(img_bd_folder, file_list):
-            raise RuntimeError("cannot find all necessary files in img_bd folder")
+        # every entry is written again, only aliases need to be compared to tell which of them were replaced
+        aliases = find_aliases(session.reader, file_list)
+        replaced = set()
+        for file_name, new_file_name in zip(file_list, new_file_list):
+            if file_name in aliases:
+                with open(new_file_name, "rb") as file_h:
+                    if not is_same_entry_content(session.reader, file_name, file_h):
+                        replaced.add(file_name)
 
-        new_file_list = [os.path.join(img_bd_folder, f) for f in file_list]
+        max_img_bd_size = session.get_file_size(img_bd_path)
 
-        file_size_list = [os.stat(f).st_size for f in new_file_list]
+        layout, candidates, img_bd_size = choose_layout(
+            session.reader, file_list, file_size_list, max_img_bd_size, replaced
+        )
+        offsets = layout.offsets
+        paddings = compute_paddings(offsets, file_size_list, img_bd_size)
 
-        max_img_bd_size = iso.get_record(iso_path=img_bd_path).get_data_length()
+        img_hd_iso_offset = session.get_file_offset(img_hd_path)
+        img_bd_iso_offset = session.get_file_offset(img_bd_path)
 
-        found = False
-        offsets = [-1]
-        img_bd_size = -1
-        align_values = list(ALIGN_VALUES)
-        align_value = align_values[0]
-        while not found and align_value > 0:
-            align_value = align_values.pop(0)
-            offsets, img_bd_size = recalculate_img_bin_offsets(file_size_list, align=align_value)
-            found = img_bd_size <= max_img_bd_size
+        with session.open_rw() as iso_fh:
+            # generate and write the new IMG_HD.BIN into ISO
+            img_hd_bin = struct.pack(f"<{len(offsets) * 2}I", *list(itertools.chain(*zip(offsets, file_size_list))))
 
-        if not found:
-            raise RuntimeError("cannot find align value to rebuild img_bd")
+            iso_fh.seek(img_hd_iso_offset, os.SEEK_SET)
+            iso_fh.write(img_hd_bin)
+            iso_fh.flush()
 
-        img_hd_iso_offset = iso.get_record(iso_path=img_hd_path).fp_offset
-        img_bd_iso_offset = iso.get_record(iso_path=img_bd_path).fp_offset
+            # generate and write the new IMG_BD.BIN into ISO
+            iso_fd = iso_fh.fileno()
 
-    # generate and write the new IMG_HD.BIN into ISO
-    with open(iso_path, "rb+") as iso_fh:
-        img_hd_bin = struct.pack(f"<{len(offsets) * 2}I", *list(itertools.chain(*zip(offsets, file_size_list))))
+            # the image may not start with an entry once entries are moved around
+            first_offset = min(offsets, default=0) * ISO_SECTOR_SIZE
+            zero_fill_fd(iso_fd, img_bd_iso_offset, first_offset)
 
-        iso_fh.seek(img_hd_iso_offset, os.SEEK_SET)
-        iso_fh.write(img_hd_bin)
+            for file_name, offset, size, zero_padding in zip(new_file_list, offsets, file_size_list, paddings):
+                current_offset = offset * ISO_SECTOR_SIZE
 
-    # generate and write the new IMG_BD.BIN into ISO
-    with open(iso_path, "rb+") as iso_fh:
-        for n, (file_name, offset, size) in enumerate(zip(new_file_list, offsets, file_size_list)):
-            # compute offset for current entry and padding value to zero out up to the next entry
-            current_offset = offset * ISO_SECTOR_SIZE
-            next_offset = offsets[n + 1] * ISO_SECTOR_SIZE if len(offsets) > n + 1 else img_bd_size
-            zero_padding = next_offset - (current_offset + size)
+                # write current entry
+                with open(file_name, "rb") as file_h:
+                    copy_fd_range(file_h.fileno(), iso_fd, 0, img_bd_iso_offset + current_offset, size)
 
-            # write current entry
-            iso_fh.seek(img_bd_iso_offset + current_offset, os.SEEK_SET)
-            with open(file_name, "rb") as file_h:
-                copy_file_h(file_h, iso_fh)
+                # fill with zeros up to the next entry
+                zero_fill_fd(iso_fd, img_bd_iso_offset + current_offset + size, zero_padding)
 
-            # fill with zeros up to the next entry
-            zero_pad_file_h(iso_fh, zero_padding)
+        return candidates
 
 
 def rebuild_img_bd_fs(img_bd_folder: str, file_list_path: str, out_folder: str, align: int = ALIGN_DEFAULT):
@@ -139,97 +200,199 @@ def rebuild_img_bd_fs(img_bd_folder: str, file_list_path: str, out_folder: str,
     # generate and write the new IMG_BD.BIN into ISO
     img_bd_bin_out = os.path.join(out_folder, IMG_BD)
     with open(img_bd_bin_out, "wb") as img_bd_fh:
-        for n, (file_name, offset, size) in enumerate(zip(new_file_list, offsets, file_size_list)):
-            # compute offset for current entry and padding value to zero out up to the next entry
-            current_offset = offset * ISO_SECTOR_SIZE
-            next_offset = offsets[n + 1] * ISO_SECTOR_SIZE if len(offsets) > n + 1 else img_bd_size
-            zero_padding = next_offset - (current_offset + size)
+        # the whole file is allocated (or left sparse) up front, so the padding between entries is already zero
+        img_bd_fd = img_bd_fh.fileno()
+        preallocate_fd(img_bd_fd, img_bd_size)
 
+        for file_name, offset, size in zip(new_file_list, offsets, file_size_list):
             # write current entry
             with open(file_name, "rb") as file_h:
-                copy_file_h(file_h, img_bd_fh)
+                copy_fd_range(file_h.fileno(), img_bd_fd, 0, offset * ISO_SECTOR_SIZE, size)
+
+
+def is_same_entry_content(reader: PJZReader, file_name: str, file_h: BinaryIO) -> bool:
+    entry = reader.find_entry(file_name)
+    size = file_h.seek(0, os.SEEK_END)
+    file_h.seek(0, os.SEEK_SET)
+
+    if entry is None or entry.size != size:
+        return False
+
+    same = True
+    with reader.open(file_name) as entry_h:
+        data = True
+        while same and data:
+            data = entry_h.read(READ_BLOCK_SIZE)
+            same = data == file_h.read(READ_BLOCK_SIZE)
+
+    file_h.seek(0, os.SEEK_SET)
+
+    return same
+
+
+def find_changed_entries(
+    reader: PJZReader,
+    file_list: List[str],
+    offsets: List[int],
+    file_size_list: List[int],
+    replace_entries: dict[str, BinaryIO],
+) -> List[bool]:
+    changed_entries = list()
+    for file_name, offset, size in zip(file_list, offsets, file_size_list):
+        entry = reader.find_entry(file_name)
+        if entry is None:
+            raise RuntimeError(f"cannot find entry {file_name}")
+
+        moved = entry.offset != offset * ISO_SECTOR_SIZE or entry.size != size
+        replaced = file_name in replace_entries and not is_same_entry_content(
+            reader, file_name, replace_entries[file_name]
+        )
+
+        changed_entries.append(moved or replaced)
 
-            # fill with zeros up to the next entry
-            zero_pad_file_h(img_bd_fh, zero_padding)
+    return changed_entries
 
 
-def rebuild_img_bd_iso_inplace(iso_path: str, replace_entries: dict[str, BinaryIO]):
+def commit_operations(session: ProjectZeroISO, operations: List[CopyOperation], /, *, patch_path: "str | None" = None):
+    # operations use absolute iso offsets. with a patch path the iso is left untouched and the writes are recorded
+    if patch_path is not None:
+        write_patch(patch_path, session.iso_path, operations)
+        return
+
+    if not operations:
+        return
+
+    plan = plan_copy_operations(operations)
+
+    with session.open_rw() as iso_fh:
+        apply_copy_plan(iso_fh, 0, plan)
+
+
+def replaced_size_list(reader: PJZReader, file_list: List[str], replace_sizes: "dict[str, int]") -> List[int]:
+    file_size_list = list()
+    for file_name in file_list:
+        if file_name in replace_sizes:
+            file_size_list.append(replace_sizes[file_name])
+            continue
+
+        entry = reader.find_entry(file_name)
+        if entry is None:
+            raise RuntimeError(f"cannot find entry {file_name}")
+        file_size_list.append(entry.size)
+
+    return file_size_list
+
+
+def plan_img_bd_iso_inplace(iso: "str | ProjectZeroISO", replace_sizes: "dict[str, int]", /) -> List[LayoutPlan]:
+    # the candidate layouts rebuild_img_bd_iso_inplace would choose from, known from the new sizes alone
+    with open_iso_session(iso) as session:
+        reader = session.reader
+
+        for entry_name in replace_sizes:
+            if not reader.find_entry(entry_name):
+                raise RuntimeError(f"{entry_name} does not exist in {IMG_BD}")
+
+        _, _, img_bd_path = session.check_paths()
+
+        file_list = session.file_list
+        file_size_list = replaced_size_list(reader, file_list, replace_sizes)
+
+        # the new content is not known yet, every alias in replace_sizes is taken as replaced
+        replaced = find_aliases(reader, file_list) & set(replace_sizes)
+
+        _, candidates, _ = choose_layout(
+            reader, file_list, file_size_list, session.get_file_size(img_bd_path), replaced
+        )
+        return candidates
+
+
+def rebuild_img_bd_iso_inplace(
+    iso: "str | ProjectZeroISO", replace_entries: dict[str, BinaryIO], /, *, patch_path: "str | None" = None
+) -> List[LayoutPlan]:
     if not replace_entries:
         raise RuntimeError("no entry to replace")
 
-    reader = PJZReader(iso_path)
+    with open_iso_session(iso) as session:
+        reader = session.reader
 
-    for entry_name in replace_entries:
-        if not reader.find_entry(entry_name):
-            raise RuntimeError(f"{entry_name} does not exist in {IMG_BD}")
+        for entry_name in replace_entries:
+            if not reader.find_entry(entry_name):
+                raise RuntimeError(f"{entry_name} does not exist in {IMG_BD}")
 
-    with iso_context(iso_path) as iso:
-        elf_path = check_elf_path(iso)
-        img_hd_path = check_path(iso, f"/{IMG_HD};1")
-        img_bd_path = check_path(iso, f"/{IMG_BD};1")
+        _, img_hd_path, img_bd_path = session.check_paths()
 
-        if not elf_path or not img_hd_path or not img_bd_path:
-            raise RuntimeError("cannot find elf, img_hd or img_bd in iso")
+        file_list = session.file_list
 
-        with iso.open_file_from_iso(iso_path=elf_path) as elf_fh:
-            file_list = get_file_names_from_elf(elf_fh)
+        replace_sizes = dict()
+        for file_name, file_h in replace_entries.items():
+            replace_sizes[file_name] = file_h.seek(0, os.SEEK_END)
+            file_h.seek(0, os.SEEK_SET)
 
-        if file_list is None:
-            raise RuntimeError("cannot read file list from elf")
+        file_size_list = replaced_size_list(reader, file_list, replace_sizes)
 
-        file_size_list = list()
-        for file_name in file_list:
-            if file_name not in replace_entries:
-                entry = reader.find_entry(file_name)
-                if entry is None:
-                    raise RuntimeError(f"cannot find entry {file_name}")
-                size = entry.size
-            else:
-                file_h = replace_entries[file_name]
-                size = file_h.seek(0, os.SEEK_END)
-                file_h.seek(0, os.SEEK_SET)
+        max_img_bd_size = session.get_file_size(img_bd_path)
 
-            file_size_list.append(size)
+        replaced = {
+            file_name
+            for file_name in find_aliases(reader, file_list) & set(replace_entries)
+            if not is_same_entry_content(reader, file_name, replace_entries[file_name])
+        }
 
-        max_img_bd_size = iso.get_record(iso_path=img_bd_path).get_data_length()
+        layout, candidates, img_bd_size = choose_layout(reader, file_list, file_size_list, max_img_bd_size, replaced)
+        offsets = layout.offsets
+        paddings = compute_paddings(offsets, file_size_list, img_bd_size)
 
-        found = False
-        offsets = [-1]
-        img_bd_size = -1
-        align_values = list(ALIGN_VALUES)
-        align_value = align_values[0]
-        while not found and align_value > 0:
-            align_value = align_values.pop(0)
-            offsets, img_bd_size = recalculate_img_bin_offsets(file_size_list, align=align_value)
-            found = img_bd_size <= max_img_bd_size
+        img_hd_iso_offset = session.get_file_offset(img_hd_path)
+        img_bd_iso_offset = session.get_file_offset(img_bd_path)
 
-        if not found:
-            raise RuntimeError("cannot find align value to rebuild img_bd")
+        changed_entries = find_changed_entries(reader, file_list, offsets, file_size_list, replace_entries)
 
-        img_hd_iso_offset = iso.get_record(iso_path=img_hd_path).fp_offset
-        img_bd_iso_offset = iso.get_record(iso_path=img_bd_path).fp_offset
+        if not any(changed_entries):
+            commit_operations(session, [], patch_path=patch_path)
+            return candidates
 
-    # generate and write the new IMG_HD.BIN into ISO
-    with open(iso_path, "rb+") as iso_fh:
+        # old extents of moved or replaced entries may be left with stale data once the new layout is written
+        stale_ranges = list()
+        for file_name, changed in zip(file_list, changed_entries):
+            if changed:
+                entry = cast(TOCEntry, reader.find_entry(file_name))
+                stale_ranges.append((entry.offset, entry.offset + entry.size))
+
+        def _is_stale(start: int, end: int) -> bool:
+            return any(stale_start < end and start < stale_end for stale_start, stale_end in stale_ranges)
+
+        # generate the new IMG_HD.BIN
         img_hd_bin = struct.pack(f"<{len(offsets) * 2}I", *list(itertools.chain(*zip(offsets, file_size_list))))
+        operations = [CopyOperation(IMG_HD, img_hd_iso_offset, len(img_hd_bin), source=BytesIO(img_hd_bin))]
 
-        iso_fh.seek(img_hd_iso_offset, os.SEEK_SET)
-        iso_fh.write(img_hd_bin)
+        # write only moved or replaced entries of the new IMG_BD.BIN
+        first_offset = min(offsets, default=0) * ISO_SECTOR_SIZE
+        if first_offset and _is_stale(0, first_offset):
+            operations.append(CopyOperation("", img_bd_iso_offset, 0, first_offset))
 
-    # generate and write the new IMG_BD.BIN into ISO
-    with open(iso_path, "rb+") as iso_fh:
-        for n, (file_name, offset, size) in enumerate(zip(file_list, offsets, file_size_list)):
-            # compute offset for current entry and padding value to zero out up to the next entry
+        for file_name, offset, size, zero_padding, changed in zip(
+            file_list, offsets, file_size_list, paddings, changed_entries
+        ):
             current_offset = offset * ISO_SECTOR_SIZE
-            next_offset = offsets[n + 1] * ISO_SECTOR_SIZE if len(offsets) > n + 1 else img_bd_size
-            zero_padding = next_offset - (current_offset + size)
 
-            # write current entry
-            iso_fh.seek(img_bd_iso_offset + current_offset, os.SEEK_SET)
-            with reader.open(file_name) as file_h:
-                if file_name in replace_entries:
-                    file_h = replace_entries[file_name]
-                copy_file_h(file_h, iso_fh)
-
-            # fill with zeros up to the next entry
-            zero_pad_file_h(iso_fh, zero_padding)
+            if changed:
+                entry = cast(TOCEntry, reader.find_entry(file_name))
+                operation = CopyOperation(
+                    file_name,
+                    img_bd_iso_offset + current_offset,
+                    size,
+                    zero_padding,
+                    img_bd_iso_offset + entry.offset,
+                    replace_entries.get(file_name),
+                )
+            elif zero_padding and _is_stale(current_offset + size, current_offset + size + zero_padding):
+                # an unchanged entry only needs its padding, when something left stale data in it
+                operation = CopyOperation(file_name, img_bd_iso_offset + current_offset + size, 0, zero_padding)
+            else:
+                continue
+
+            operations.append(operation)
+
+        commit_operations(session, operations, patch_path=patch_path)
+
+        return candidates
@@ -0,0 +1,83 @@
+import struct
+
+from zerotools.text.message.table import InGameMessageTable
+from zerotools.text.message.locale import Locale
+from zerotools.text.message.parser import InGameMessageParser
+from zerotools.text.message.message import InGameMessage
+from zerotools.text.serializer.binaryfile import BINARY_MAGIC, BINARY_HEADER, BINARY_NAME, BINARY_TABLE, BINARY_MESSAGE
+
+
+def _read_bytes(data: bytes, position: int, size: int) -> bytes:
+    chunk = data[position : position + size]
+    if len(chunk) != size:
+        raise EOFError
+    return chunk
+
+
+def _parse_table_binary(data: bytes, position: int, parent: InGameMessageTable, locale: Locale) -> int:
+    # fills parent from the table starting at position, returns where the next one starts
+    has_tables, count = BINARY_TABLE.unpack_from(data, position)
+    position += BINARY_TABLE.size
+
+    if has_tables:
+        for n in range(count):
+            igm_table = InGameMessageTable(number=n, offset=-1, size=0, parent=parent)
+            parent.tables.append(igm_table)
+            position = _parse_table_binary(data, position, igm_table, locale)
+
+    else:
+        for n in range(count):
+            text_size, encoded_size, suffix_size = BINARY_MESSAGE.unpack_from(data, position)
+            position += BINARY_MESSAGE.size
+            text = _read_bytes(data, position, text_size).decode("utf-8")
+            position += text_size
+            encoded = _read_bytes(data, position, encoded_size)
+            position += encoded_size
+
+            if suffix_size > encoded_size:
+                raise RuntimeError("message suffix is longer than the message")
+
+            suffix = encoded[encoded_size - suffix_size :]
+            parent.messages.append(InGameMessage.from_encoded(n, parent, text, suffix, encoded, locale))
+
+    return position
+
+
+def rebuild_language_binary(bin_path: str, locale: Locale):
+    with open(bin_path, "rb") as file_h:
+        data = file_h.read()
+
+    if len(data) < BINARY_HEADER.size:
+        raise RuntimeError(f"{bin_path} is not a binary text file")
+
+    magic, locale_value, num_tables = BINARY_HEADER.unpack_from(data, 0)
+    if magic != BINARY_MAGIC:
+        raise RuntimeError(f"{bin_path} is not a binary text file")
+
+    if locale_value.decode("ascii") != locale.value:
+        raise RuntimeError(f"{bin_path} holds {locale_value.decode('ascii')} text, not {locale.value}")
+
+    ig_msg_parser = InGameMessageParser(file=None, locale=locale)
+    ig_msg_parser.table_names = list()
+
+    position = BINARY_HEADER.size
+    try:
+        for n in range(num_tables):
+            (name_size,) = BINARY_NAME.unpack_from(data, position)
+            position += BINARY_NAME.size
+            ig_msg_parser.table_names.append(_read_bytes(data, position, name_size).decode("utf-8"))
+            position += name_size
+
+            igm_table = InGameMessageTable(number=n, offset=-1, size=0, parent=ig_msg_parser.msg_tables)
+            ig_msg_parser.msg_tables.tables.append(igm_table)
+            position = _parse_table_binary(data, position, igm_table, locale)
+
+    except (struct.error, EOFError):
+        raise RuntimeError(f"{bin_path} is truncated")
+    except UnicodeDecodeError:
+        raise RuntimeError(f"{bin_path} holds invalid text")
+
+    if position != len(data):
+        raise RuntimeError(f"{bin_path} has trailing data")
+
+    return ig_msg_parser
@@ -1,15 +1,16 @@
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+
+from zerotools.text.serializer import FS_INDEX_FILE, FS_MAX_WORKERS
 from zerotools.text.message.table import InGameMessageTable
 from zerotools.text.message.locale import Locale
 from zerotools.text.message.parser import InGameMessageParser
 from zerotools.text.message.message import InGameMessage
 
 
-def _parse_table_info(info_path: str):
-    with open(info_path, mode="r", encoding="utf-8") as file_h:
-        lines = file_h.read().strip().split("\n")
-        lines = [line.split(",") for line in lines]
+def _parse_info_lines(lines: "list[str]"):
+    lines = [line.split(",") for line in lines]
 
     if not all(len(line) == 2 and line[0].isnumeric() for line in lines):
         raise RuntimeError
@@ -20,88 +21,72 @@ def _parse_table_info(info_path: str):
     return sorted(lines, key=lambda x: int(x[0]))
 
 
-def _is_subtable(folder_path: str):
-    files = _list_files(folder_path)
-    folders = _list_folders(folder_path)
-
-    if ".info" not in files:
-        raise RuntimeError
-
-    info_file = os.path.join(folder_path, ".info")
-    if len(files) != 1 or len(folders) == 0:
-        return False
-
-    info = _parse_table_info(info_file)
-    orders, folders = zip(*info)
-
-    if list(map(int, orders)) != list(range(len(orders))):
-        return
+def _parse_table_info(info_path: str):
+    with open(info_path, mode="r", encoding="utf-8") as file_h:
+        return _parse_info_lines(file_h.read().strip().splitlines())
 
-    return all(os.path.isdir(os.path.join(folder_path, folder)) for folder in folders)
 
+def _scan_folder(folder_path: str) -> "tuple[set[str], set[str]]":
+    files, folders = set(), set()
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            (folders if entry.is_dir() else files).add(entry.name)
 
-def _sort_tables(children: list[str]):
-    return sorted(children, key=lambda x: int(x))
+    return files, folders
 
 
-def _is_message_list(folder_path: str):
-    files = _list_files(folder_path)
-    folders = _list_folders(folder_path)
+def _read_folder(folder_path: str) -> "tuple[bool, list[list[str]]]":
+    # one listing and one read of .info per folder, returns whether the folder holds tables and its sorted .info
+    files, folders = _scan_folder(folder_path)
 
     if ".info" not in files:
         raise RuntimeError
 
-    files.remove(".info")
+    info = _parse_table_info(os.path.join(folder_path, ".info"))
 
-    info_file = os.path.join(folder_path, ".info")
+    if files == {".info"} and folders and all(name in folders for _, name in info):
+        return True, info
 
-    info = _parse_table_info(info_file)
-    file_names, suffixes = zip(*info)
-    file_names = [f"{name}.TXT" for name in file_names]
+    if not folders and files - {".info"} == {f"{name}.TXT" for name, _ in info}:
+        return False, info
 
-    if (
-        len(folders) != 0
-        or len(files) != len(file_names)
-        or not all(os.path.isfile(os.path.join(folder_path, f)) for f in file_names)
-    ):
-        return False
+    raise RuntimeError
 
-    return True
 
+def _read_index(index_path: str) -> "dict[str, tuple[bool, int, int, list[list[str]]]]":
+    # the .info of every folder with its size and mtime when the index was written, see serialize_fs
+    folders: "dict[str, tuple[bool, int, int, list[str]]]" = dict()
+    with open(index_path, mode="r", encoding="utf-8") as file_h:
+        lines: "list[str] | None" = None
+        for line in file_h.read().strip().splitlines():
+            if not line.startswith("/"):
+                if lines is None:
+                    raise RuntimeError(f"invalid {FS_INDEX_FILE} line: {line}")
+                lines.append(line)
+                continue
 
-def _parse_fs_table(folder_path: str, parent: InGameMessageTable, locale: Locale):
-    info_file = os.path.join(folder_path, ".info")
-    info = _parse_table_info(info_file)
-
-    if _is_subtable(folder_path):
-        for order, table in info:
-            table = os.path.join(folder_path, table)
-            igm_table = InGameMessageTable(number=int(order), offset=-1, size=0)
-            parent.tables.append(igm_table)
-            _parse_fs_table(table, igm_table, locale)
-    elif _is_message_list(folder_path):
-        for file_name, suffix in info:
-            order = int(os.path.splitext(file_name)[0])
-            file_name = os.path.join(folder_path, f"{file_name}.TXT")
-            message = _parse_fs_message(file_name, order, suffix, parent, locale)
-            parent.messages.append(message)
-    else:
-        raise RuntimeError
+            fields = line[1:].rsplit(",", 3)
+            if len(fields) != 4 or not fields[2].isnumeric() or not fields[3].isnumeric():
+                raise RuntimeError(f"invalid {FS_INDEX_FILE} line: {line}")
+            path, kind, size, mtime = fields
+            if path in folders or kind not in ("T", "M"):
+                raise RuntimeError(f"invalid {FS_INDEX_FILE} line: {line}")
+            lines = list()
+            folders[path] = (kind == "T", int(size), int(mtime), lines)
 
+    return {
+        path: (subtable, size, mtime, _parse_info_lines(lines))
+        for path, (subtable, size, mtime, lines) in folders.items()
+    }
 
-def _parse_fs_message(file_name: str, number: int, suffix: str, parent: InGameMessageTable, locale: Locale):
-    with open(file_name, mode="r", encoding="utf-8") as file_h:
-        suffix_bytes = bytes.fromhex(suffix)
-        message = file_h.read()
-        return InGameMessage.from_message(number, parent, message, locale, suffix=suffix_bytes)
 
-
-def _list_folders(folder_path: str):
-    return next(os.walk(folder_path))[1]
+def _read_text(file_name: str) -> str:
+    with open(file_name, mode="r", encoding="utf-8") as file_h:
+        return file_h.read()
 
 
-def _list_files(folder_path: str):
-    return next(os.walk(folder_path))[2]
+def _join(path: str, name: str) -> str:
+    return f"{path}/{name}" if path else name
 
 
 def rebuild_language_fs(folder_path: str, locale: Locale):
@@ -111,20 +96,54 @@ def rebuild_language_fs(folder_path: str, locale: Locale):
     if not os.path.isfile(info_file):
         raise RuntimeError
 
-    if not _is_subtable(folder_path):
-        raise RuntimeError
+    # with an index, the folders are not listed at all, only their .info is checked against it
+    index_file = os.path.join(folder_path, FS_INDEX_FILE)
+    if os.path.isfile(index_file):
+        index = _read_index(index_file)
 
-    info = _parse_table_info(info_file)
-    orders, tables = zip(*info)
+        def read_folder(path: str):
+            if path in index:
+                subtable, size, mtime, info = index[path]
+                stat = os.stat(os.path.join(folder_path, path, ".info"))
+                if stat.st_size == size and stat.st_mtime_ns == mtime:
+                    return subtable, info
 
-    ig_msg_parser.table_names = [table for table in tables]
+            # edited since the index was written, or a new folder
+            return _read_folder(os.path.join(folder_path, path))
 
-    for order, table in zip(orders, tables):
-        order = int(order)
-        table = os.path.join(folder_path, table)
-        igm_table = InGameMessageTable(number=order, offset=-1, size=0)
-        ig_msg_parser.msg_tables.tables.append(igm_table)
+    else:
 
-        _parse_fs_table(table, igm_table, locale)
+        def read_folder(path: str):
+            return _read_folder(os.path.join(folder_path, path))
+
+    # (path, number, suffix, table) of every message, their files are read together at the end
+    messages: "list[tuple[str, int, str, InGameMessageTable]]" = list()
+
+    with ThreadPoolExecutor(max_workers=FS_MAX_WORKERS) as pool:
+        # the folders of a level are read at the same time
+        level = [("", ig_msg_parser.msg_tables)]
+        while level:
+            next_level = list()
+            for (path, igm_table), (subtable, info) in zip(level, pool.map(read_folder, [path for path, _ in level])):
+                if not path:
+                    if not subtable:
+                        raise RuntimeError
+                    ig_msg_parser.table_names = [name for _, name in info]
+
+                if subtable:
+                    for order, name in info:
+                        table = InGameMessageTable(number=int(order), offset=-1, size=0, parent=igm_table)
+                        igm_table.tables.append(table)
+                        next_level.append((_join(path, name), table))
+                else:
+                    for name, suffix in info:
+                        messages.append((_join(path, f"{name}.TXT"), int(name), suffix, igm_table))
+
+            level = next_level
+
+        texts = pool.map(_read_text, [os.path.join(folder_path, path) for path, _, _, _ in messages])
+        for (_, number, suffix, parent), text in zip(messages, texts):
+            message = InGameMessage.from_message(number, parent, text, locale, suffix=bytes.fromhex(suffix))
+            parent.messages.append(message)
 
     return ig_msg_parser
@@ -1,9 +1,10 @@
-import json
+from typing import Any, Generator
 
 from zerotools.text.message.table import InGameMessageTable
 from zerotools.text.message.locale import Locale
 from zerotools.text.message.parser import InGameMessageParser
 from zerotools.text.message.message import InGameMessage
+from zerotools.utils.jsonstream import iter_json_items
 
 
 def _sort_tables(tables):
@@ -21,7 +22,7 @@ def _is_message(table):
 def _parse_json_table(json_table, parent: InGameMessageTable, locale: Locale):
     for table in _sort_tables(json_table["messages"]):
         if _is_subtable(table):
-            igm_table = InGameMessageTable(number=table["order"], offset=-1, size=0)
+            igm_table = InGameMessageTable(number=table["order"], offset=-1, size=0, parent=parent)
             parent.tables.append(igm_table)
             _parse_json_table(table, igm_table, locale)
         elif _is_message(table):
@@ -38,19 +39,27 @@ def _parse_json_message(table, parent: InGameMessageTable, locale: Locale):
     return InGameMessage.from_message(number, parent, message, locale, suffix=suffix)
 
 
-def rebuild_language_json(json_path: str, locale: Locale):
-    ig_msg_parser = InGameMessageParser(file=None, locale=locale)
+def iter_language_json(
+    json_path: str, locale: Locale, parent: "InGameMessageTable | None" = None
+) -> Generator["tuple[str, Any, InGameMessageTable]", None, None]:
+    # (name, order, table) of each top table in file order, built as soon as it has been read
+    with open(json_path, mode="r", encoding="utf-8-sig") as json_fh:
+        for name, table in iter_json_items(json_fh):
+            if not isinstance(table, dict) or not _is_subtable(table):
+                raise RuntimeError
 
-    with open(json_path, "rb") as file_h:
-        json_tables: dict = json.load(file_h)
+            igm_table = InGameMessageTable(number=table["order"], offset=-1, size=0, parent=parent)
+            _parse_json_table(table, igm_table, locale)
 
-    for table in _sort_tables(json_tables):
-        if not _is_subtable(table):
-            raise RuntimeError
+            yield name, table["order"], igm_table
 
-        igm_table = InGameMessageTable(number=table["order"], offset=-1, size=0)
-        ig_msg_parser.msg_tables.tables.append(igm_table)
 
-        _parse_json_table(table, igm_table, locale)
+def rebuild_language_json(json_path: str, locale: Locale):
+    ig_msg_parser = InGameMessageParser(file=None, locale=locale)
+
+    tables = sorted(iter_language_json(json_path, locale, ig_msg_parser.msg_tables), key=lambda table: table[1])
+    ig_msg_parser.table_names = [name for name, _, _ in tables]
+    for _, _, igm_table in tables:
+        ig_msg_parser.msg_tables.tables.append(igm_table)
 
     return ig_msg_parser
@@ -0,0 +1,66 @@
+import os
+import sqlite3
+
+from contextlib import closing
+
+from zerotools.text.message.table import InGameMessageTable
+from zerotools.text.message.locale import Locale
+from zerotools.text.message.parser import InGameMessageParser
+from zerotools.text.message.message import InGameMessage
+from zerotools.text.serializer import SQLITE_VERSION
+
+
+def _read_info(connection: sqlite3.Connection, db_path: str) -> "dict[str, str]":
+    try:
+        info = dict(connection.execute("SELECT key, value FROM info"))
+    except sqlite3.DatabaseError:
+        raise RuntimeError(f"{db_path} is not a text database")
+
+    if info.get("version") != str(SQLITE_VERSION):
+        raise RuntimeError(f"{db_path} has an unsupported version {info.get('version')}")
+
+    return info
+
+
+def rebuild_language_sqlite(db_path: str, locale: Locale):
+    # connecting would create a missing database
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(db_path)
+
+    ig_msg_parser = InGameMessageParser(file=None, locale=locale)
+    ig_msg_parser.table_names = list()
+
+    with closing(sqlite3.connect(db_path)) as connection:
+        info = _read_info(connection, db_path)
+        if info.get("locale") != locale.value:
+            raise RuntimeError(f"{db_path} holds {info.get('locale')} text, not {locale.value}")
+
+        # parents have lower ids, every table is created before its sub-tables
+        tables: "dict[int, InGameMessageTable]" = dict()
+        for table_id, parent_id, number, name, path in connection.execute(
+            "SELECT id, parent, number, name, path FROM msg_tables ORDER BY parent, number"
+        ):
+            parent = ig_msg_parser.msg_tables if parent_id is None else tables.get(parent_id)
+            if parent is None:
+                raise RuntimeError(f"table {path} is listed before its parent")
+
+            igm_table = InGameMessageTable(number=number, offset=-1, size=0, parent=parent)
+            parent.tables.append(igm_table)
+            tables[table_id] = igm_table
+            if parent_id is None:
+                ig_msg_parser.table_names.append(name)
+
+        # rows come in index order, they are never all held at once
+        for table_id, number, path, message, suffix, encoded in connection.execute(
+            "SELECT table_id, number, path, message, suffix, encoded FROM messages ORDER BY table_id, number"
+        ):
+            parent = tables.get(table_id)
+            if parent is None or parent.tables:
+                raise RuntimeError(f"message {path} is not in a message table")
+
+            if encoded is None:
+                parent.messages.append(InGameMessage.from_message(number, parent, message, locale, suffix=suffix))
+            else:
+                parent.messages.append(InGameMessage.from_encoded(number, parent, message, suffix, encoded, locale))
+
+    return ig_msg_parser
@@ -32,10 +32,6 @@ def _is_subtable(element: ElementTree.Element):
     )
 
 
-def _sort_tables(children: list[ElementTree.Element]):
-    return sorted(children, key=lambda c: int(c.get("order", "")))
-
-
 def _is_message(element: ElementTree.Element):
     return (
         element.tag == "message"
@@ -48,25 +44,12 @@ def _is_message(element: ElementTree.Element):
     )
 
 
-def _parse_xml_table(xml_table: ElementTree.Element, parent: InGameMessageTable, locale: Locale):
-    children = list(xml_table)
-
-    if not all(_is_subtable(e) or _is_message(e) for e in children):
-        raise RuntimeError
-
-    children = _sort_tables(children)
-
-    for table in children:
-        if _is_subtable(table):
-            order = int(cast(str, xml_table.get("order")))
-            igm_table = InGameMessageTable(number=order, offset=-1, size=0)
-            parent.tables.append(igm_table)
-            _parse_xml_table(table, igm_table, locale)
-        elif _is_message(table):
-            message = _parse_xml_message(table, parent, locale)
-            parent.messages.append(message)
+def _add_children(igm_table: InGameMessageTable, children: "list[tuple[int, InGameMessageTable | InGameMessage]]"):
+    for _, child in sorted(children, key=lambda c: c[0]):
+        if isinstance(child, InGameMessageTable):
+            igm_table.tables.append(child)
         else:
-            raise RuntimeError
+            igm_table.messages.append(child)
 
 
 def _parse_xml_message(message: ElementTree.Element, parent: InGameMessageTable, locale: Locale) -> InGameMessage:
@@ -79,28 +62,51 @@ def _parse_xml_message(message: ElementTree.Element, parent: InGameMessageTable,
 def rebuild_language_xml(xml_path: str, locale: Locale) -> InGameMessageParser:
     ig_msg_parser = InGameMessageParser(file=None, locale=locale)
 
-    tree = ElementTree.parse(xml_path)
-    xml_root = tree.getroot()
-
-    if xml_root.tag != "localization":
-        raise RuntimeError
-
-    children = list(xml_root)
-
-    if not all(_is_subtable(e) for e in children):
-        raise RuntimeError
-
-    children = _sort_tables(children)
-    ig_msg_parser.table_names = [child.get("name", "") for child in children]
-
-    for table in children:
-        if table.tag != "messages":
-            raise RuntimeError
-
-        order = int(table.get("order", ""))
-        igm_table = InGameMessageTable(number=order, offset=-1, size=0)
-        ig_msg_parser.msg_tables.tables.append(igm_table)
-
-        _parse_xml_table(table, igm_table, locale)
+    xml_root = None
+    xml_message = None
+    # tables being read, with their children converted so far as (order, table or message)
+    stack: "list[tuple[InGameMessageTable, list[tuple[int, InGameMessageTable | InGameMessage]]]]" = []
+    tables: "list[tuple[int, str, InGameMessageTable]]" = []
+
+    # elements are converted when they end and cleared right away, only the current path is held in memory
+    for event, element in ElementTree.iterparse(xml_path, events=("start", "end")):
+        if xml_root is None:
+            if element.tag != "localization":
+                raise RuntimeError
+            xml_root = element
+            continue
+
+        if event == "start":
+            if xml_message is not None:
+                raise RuntimeError
+
+            if _is_subtable(element):
+                parent = stack[-1][0] if stack else ig_msg_parser.msg_tables
+                order = int(cast(str, element.get("order")))
+                stack.append((InGameMessageTable(number=order, offset=-1, size=0, parent=parent), list()))
+            elif stack and _is_message(element):
+                xml_message = element
+            else:
+                raise RuntimeError
+
+        elif element is xml_message:
+            message = _parse_xml_message(element, stack[-1][0], locale)
+            stack[-1][1].append((message.number, message))
+            xml_message = None
+            element.clear()
+
+        elif element is not xml_root:
+            igm_table, children = stack.pop()
+            _add_children(igm_table, children)
+            if stack:
+                stack[-1][1].append((igm_table.number, igm_table))
+            else:
+                tables.append((igm_table.number, element.get("name", ""), igm_table))
+                xml_root.clear()
+            element.clear()
+
+    tables.sort(key=lambda table: table[0])
+    ig_msg_parser.table_names = [name for _, name, _ in tables]
+    ig_msg_parser.msg_tables.tables.extend(igm_table for _, _, igm_table in tables)
 
     return ig_msg_parser
@@ -9,10 +9,12 @@ from .message.parser import InGameMessageParser
 from .serializer.xmlfile import serialize_xml
 from .serializer.jsonfile import serialize_json
 from .serializer.filesystem import serialize_fs
+from .serializer.sqlitefile import serialize_sqlite
+from .serializer.binaryfile import serialize_binary
 from ..elf.tables.igmessage import get_ingame_message_table_names_from_elf
 from ..elf.tables.igmessage import get_ingame_message_table_names_from_iso
 from ..elf.tables.igmessage import get_ingame_message_table_names_from_txt
-from ..zero.reader.pjzreader import PJZReader
+from ..zero.session import ProjectZeroISO, open_iso_session
 
 
 def _validate_locale_with_elf(locale, iso_locale, elf_name):
@@ -29,19 +31,21 @@ def _validate_locale_with_elf(locale, iso_locale, elf_name):
 
 
 def _extract_fh(
-    file_h: BinaryIO,
+    file_h: "BinaryIO | memoryview",
     out_file_name: str,
     table_names: "list[str] | None",
     locale: Locale,
     serializer_format: LocalizationSerializerFormat,
-):
+    fs_index: bool = False,
+) -> InGameMessageParser:
     out_file_name = os.path.splitext(out_file_name)[0]
 
-    ig_msg_parser = InGameMessageParser(file_h, table_names=table_names, locale=locale)
+    # every message is serialized exactly once, no need to re-encode them while parsing
+    ig_msg_parser = InGameMessageParser(file_h, table_names=table_names, locale=locale, lazy=True)
 
     # serialize into chosen format
     if serializer_format == LocalizationSerializerFormat.FS:
-        serialize_fs(ig_msg_parser, out_file_name)
+        serialize_fs(ig_msg_parser, out_file_name, index=fs_index)
 
     elif serializer_format == LocalizationSerializerFormat.JSON:
         serialize_json(ig_msg_parser, out_file_name + ".json")
@@ -49,28 +53,43 @@ def _extract_fh(
     elif serializer_format == LocalizationSerializerFormat.XML:
         serialize_xml(ig_msg_parser, out_file_name + ".xml")
 
+    elif serializer_format == LocalizationSerializerFormat.SQLITE:
+        serialize_sqlite(ig_msg_parser, out_file_name + ".sqlite")
+
+    elif serializer_format == LocalizationSerializerFormat.BINARY:
+        serialize_binary(ig_msg_parser, out_file_name + ".bin")
+
+    return ig_msg_parser
 
-def extract_iso(iso_path: str, out_folder: str, /, *, serializer_format: LocalizationSerializerFormat, locale: Locale):
-    table_names, iso_locale, elf_name = get_ingame_message_table_names_from_iso(iso_path)
 
-    if table_names is None:
-        raise RuntimeError("cannot parse ELF file for in-game messages")
+def extract_iso(
+    iso: "str | ProjectZeroISO",
+    out_folder: str,
+    /,
+    *,
+    serializer_format: LocalizationSerializerFormat,
+    locale: Locale,
+    fs_index: bool = False,
+):
+    with open_iso_session(iso) as session:
+        table_names, iso_locale, elf_name = session.ingame_message_table_names
+
+        if table_names is None:
+            raise RuntimeError("cannot parse ELF file for in-game messages")
 
-    locale = _validate_locale_with_elf(locale, iso_locale, elf_name)
+        locale = _validate_locale_with_elf(locale, iso_locale, elf_name)
 
-    reader = PJZReader(iso_path)
+        reader = session.reader
 
-    # extract in-game text
-    in_game_text_file = locale.ig_msg_file_name
-    out_file = os.path.join(out_folder, in_game_text_file)
-    with reader.open(in_game_text_file) as file_h:
-        _extract_fh(file_h, out_file, table_names, locale, serializer_format)
+        # extract in-game text
+        in_game_text_file = locale.ig_msg_file_name
+        out_file = os.path.join(out_folder, in_game_text_file)
+        _extract_fh(reader.view(in_game_text_file), out_file, table_names, locale, serializer_format, fs_index)
 
-    # extract event text
-    for m_event_file in locale.event_file_names:
-        with reader.open(m_event_file) as file_h:
+        # extract event text
+        for m_event_file in locale.event_file_names:
             out_file = os.path.join(out_folder, m_event_file)
-            _extract_fh(file_h, out_file, table_names, locale, serializer_format)
+            _extract_fh(reader.view(m_event_file), out_file, table_names, locale, serializer_format, fs_index)
 
 
 def extract_file(
@@ -81,7 +100,8 @@ def extract_file(
     name_list_src: str,
     locale: Locale,
     serializer_format: LocalizationSerializerFormat,
-):
+    fs_index: bool = False,
+) -> InGameMessageParser:
     name_list_src_ext = os.path.splitext(name_list_src)[1].upper()
 
     if os.path.basename(name_list_src) in (ELF_EU, ELF_JP, ELF_US):
@@ -107,4 +127,4 @@ def extract_file(
         # raise ValueError('wrong file list source')
 
     with open(lang_file, "rb") as file_h:
-        _extract_fh(file_h, out_file, table_names, locale, serializer_format)
+        return _extract_fh(file_h, out_file, table_names, locale, serializer_format, fs_index)
@@ -0,0 +1,143 @@
+import heapq
+
+from collections import Counter
+from dataclasses import dataclass
+
+from .names import MessageNames
+from .search import SearchIndex, text_ngrams
+from .message.locale import Locale
+from ..utils.levenshtein import levenshtein
+
+
+@dataclass
+class MemoryMatch:
+    # 1 - edit distance / length of the longest text
+    score: float
+    source: str
+    target: str
+    # (kind, table, number) of the messages holding this pair, the kind is IG_MSG, M0_EVENT...
+    locations: "list[tuple[str, str, int]]"
+
+
+def _max_dice(num_ngrams: int, shared: int) -> float:
+    # Dice coefficient of the trigrams of a text sharing that many, at best the text holds no other trigram
+    return 2 * shared / (num_ngrams + shared) if shared else 0.0
+
+
+def message_kind(file_name: str, locale: Locale) -> str:
+    for event_type in MessageNames:
+        if event_type.to_locale_file_name(locale) == file_name:
+            return event_type.name
+    return file_name
+
+
+class TranslationMemory:
+    def __init__(self, source_locale: Locale, target_locale: Locale):
+        if source_locale == target_locale:
+            raise ValueError("source and target locales must differ")
+
+        self.source_locale = source_locale
+        self.target_locale = target_locale
+
+        # distinct source texts, each with its distinct translations and where they are found
+        self.texts: "list[str]" = list()
+        self.translations: "list[dict[str, list[tuple[str, str, int]]]]" = list()
+        self._text_ids: "dict[str, int]" = dict()
+
+        # lowercase trigram -> ids of the source texts holding it
+        self._postings: "dict[str, list[int]]" = dict()
+
+    def add(self, source: str, target: str, location: "tuple[str, str, int]"):
+        text_id = self._text_ids.get(source)
+        if text_id is None:
+            text_id = self._text_ids[source] = len(self.texts)
+            self.texts.append(source)
+            self.translations.append(dict())
+
+            for ngram in text_ngrams(source.lower()):
+                self._postings.setdefault(ngram, []).append(text_id)
+
+        self.translations[text_id].setdefault(target, []).append(location)
+
+    @classmethod
+    def from_search_index(cls, index: SearchIndex, source_locale: Locale, target_locale: Locale) -> "TranslationMemory":
+        # messages are aligned by kind, table and number, a later source replaces the same file of an earlier one
+        messages: "dict[str, dict[tuple[str, str, int], str]]" = {source_locale.value: {}, target_locale.value: {}}
+        for indexed in index.sources.values():
+            if indexed.locale not in messages:
+                continue
+
+            kind = message_kind(indexed.file, Locale(indexed.locale))
+            locale_messages = messages[indexed.locale]
+            for table, number, message in indexed.messages:
+                locale_messages[(kind, table, number)] = message
+
+        memory = cls(source_locale, target_locale)
+
+        # untranslated messages are left out
+        targets = messages[target_locale.value]
+        for location, source in messages[source_locale.value].items():
+            target = targets.get(location)
+            if source and target:
+                memory.add(source, target, location)
+
+        return memory
+
+    def lookup(self, text: str, /, *, k: int = 5, min_score: float = 0.5) -> "list[MemoryMatch]":
+        # texts are scored in order of shared trigrams, until the Dice coefficient of the texts left cannot reach the
+        # k-th best score. texts sharing no trigram are never scored, except the exact text
+        ngrams = text_ngrams(text.lower())
+
+        counts: "Counter[int]" = Counter()
+        for ngram in ngrams:
+            counts.update(self._postings.get(ngram, ()))
+
+        # scores of the k best texts so far
+        best: "list[float]" = list()
+
+        matches = list()
+
+        def _threshold() -> float:
+            return max(min_score, best[0] if len(best) == k else 0)
+
+        def _score(text_id: int):
+            source = self.texts[text_id]
+            longest = max(len(text), len(source), 1)
+
+            # the length difference is a lower bound of the edit distance
+            if 1 - abs(len(text) - len(source)) / longest < _threshold():
+                return
+
+            score = 1 - levenshtein(text, source) / longest
+            if score < min_score:
+                return
+
+            if len(best) < k:
+                heapq.heappush(best, score)
+            else:
+                heapq.heappushpop(best, score)
+
+            for target, locations in self.translations[text_id].items():
+                matches.append(MemoryMatch(score, source, target, locations))
+
+        # too short to have trigrams, or sharing few of them with longer texts
+        exact = self._text_ids.get(text)
+        if exact is not None:
+            _score(exact)
+
+        # texts sharing too few trigrams to reach min_score are not even sorted
+        min_shared = len(ngrams) * min_score / (2 - min_score)
+        candidates = [c for c in counts.items() if c[1] >= min_shared]
+        for text_id, shared in sorted(candidates, key=lambda c: c[1], reverse=True):
+            if _max_dice(len(ngrams), shared) < _threshold():
+                break
+            if text_id != exact:
+                _score(text_id)
+
+        # the most used translation first among equally close texts
+        matches.sort(key=lambda match: (match.score, len(match.locations)), reverse=True)
+
+        return matches[:k]
+
+    def __len__(self):
+        return len(self.texts)
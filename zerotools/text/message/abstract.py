@@ -5,3 +5,7 @@ class Serializable(ABC):
     @abstractmethod
     def encode(self, offset=0):
         ...
+
+    @abstractmethod
+    def encoded_size(self) -> int:
+        ...
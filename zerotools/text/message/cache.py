@@ -0,0 +1,168 @@
+import os
+import struct
+
+from typing import Generator
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+ENCODE_CACHE_MAGIC = b"ZTENC001"
+ENCODE_CACHE_FILE = "encoded.cache"
+
+# magic, entry count, followed by the entries then by the encoded texts
+ENCODE_CACHE_HEADER = struct.Struct("<8sI")
+# sha1 of the font tables and the text, offset of the encoded text after the entries, encoded size
+ENCODE_CACHE_ENTRY = struct.Struct("<20sII")
+
+# the least recently used texts are dropped once the cache file would grow past this size
+ENCODE_CACHE_MAX_SIZE = 32 * 1024 * 1024
+
+_active_cache: "EncodeCache | None" = None
+
+
+class EncodeCache:
+    def __init__(self, path: str, max_size: int = ENCODE_CACHE_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+
+        # encoded texts of the cache file, only copied out when they are looked up
+        self._texts = memoryview(b"")
+        # key -> (offset, size) in the texts, least recently used first
+        self._spans: "dict[bytes, tuple[int, int]]" = dict()
+        # looked up or added since the file was read, most recently used last
+        self._used: "OrderedDict[bytes, bytes]" = OrderedDict()
+
+    def get(self, key: bytes) -> "bytes | None":
+        encoded = self._used.get(key)
+        if encoded is not None:
+            self._used.move_to_end(key)
+            return encoded
+
+        span = self._spans.get(key)
+        if span is None:
+            return None
+
+        offset, size = span
+        encoded = self._used[key] = bytes(self._texts[offset : offset + size])
+        return encoded
+
+    def put(self, key: bytes, encoded: bytes):
+        self._used[key] = encoded
+        self._used.move_to_end(key)
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as file_h:
+                data = file_h.read()
+        except OSError:
+            return
+
+        # a damaged cache is dropped, it is only an optimization
+        if len(data) < ENCODE_CACHE_HEADER.size:
+            return
+
+        magic, count = ENCODE_CACHE_HEADER.unpack_from(data, 0)
+        texts_start = ENCODE_CACHE_HEADER.size + count * ENCODE_CACHE_ENTRY.size
+        if magic != ENCODE_CACHE_MAGIC or texts_start > len(data):
+            return
+
+        view = memoryview(data)
+        spans = {
+            key: (offset, size)
+            for key, offset, size in ENCODE_CACHE_ENTRY.iter_unpack(view[ENCODE_CACHE_HEADER.size : texts_start])
+        }
+        if any(offset + size > len(data) - texts_start for offset, size in spans.values()):
+            return
+
+        self._texts = view[texts_start:]
+        self._spans = spans
+        self._used.clear()
+
+    def save(self):
+        # nothing new, and the texts were used in the order they already have
+        keys = list(self._spans)
+        if not self._used or (len(self._used) <= len(keys) and keys[len(keys) - len(self._used) :] == list(self._used)):
+            return
+
+        entries = [(key, span) for key, span in self._spans.items() if key not in self._used]
+        new_texts = list()
+        texts_size = len(self._texts)
+        for key, encoded in self._used.items():
+            span = self._spans.get(key)
+            if span is None:
+                span = texts_size, len(encoded)
+                new_texts.append(encoded)
+                texts_size += len(encoded)
+            entries.append((key, span))
+
+        texts = [self._texts, *new_texts]
+
+        # too big: the least recently used texts, that come first, are dropped and the others are written again
+        file_size = ENCODE_CACHE_HEADER.size + len(entries) * ENCODE_CACHE_ENTRY.size + texts_size
+        if file_size > self.max_size:
+            all_texts = memoryview(b"".join(texts))
+            size = ENCODE_CACHE_HEADER.size + sum(ENCODE_CACHE_ENTRY.size + size for _, (_, size) in entries)
+            num_evicted = 0
+            while size > self.max_size and num_evicted < len(entries):
+                size -= ENCODE_CACHE_ENTRY.size + entries[num_evicted][1][1]
+                num_evicted += 1
+
+            texts = list()
+            texts_size = 0
+            for n, (key, (offset, size)) in enumerate(entries[num_evicted:]):
+                texts.append(all_texts[offset : offset + size])
+                entries[num_evicted + n] = key, (texts_size, size)
+                texts_size += size
+            entries = entries[num_evicted:]
+
+        chunks = [ENCODE_CACHE_HEADER.pack(ENCODE_CACHE_MAGIC, len(entries))]
+        chunks += [ENCODE_CACHE_ENTRY.pack(key, offset, size) for key, (offset, size) in entries]
+        chunks += texts
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+
+        # concurrent runs do not share their entries, the last one to finish writes the file
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "wb") as file_h:
+                file_h.write(b"".join(chunks))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._spans.keys() | self._used.keys())
+
+
+def default_encode_cache_path() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "zerotools", ENCODE_CACHE_FILE)
+
+
+def active_encode_cache() -> "EncodeCache | None":
+    return _active_cache
+
+
+@contextmanager
+def open_encode_cache(
+    path: "str | None", max_size: int = ENCODE_CACHE_MAX_SIZE
+) -> Generator["EncodeCache | None", None, None]:
+    # every message encoded meanwhile goes through the cache, which is written back on exit
+    global _active_cache
+
+    if path is None or _active_cache is not None:
+        yield _active_cache
+        return
+
+    encode_cache = EncodeCache(path, max_size)
+    encode_cache.load()
+
+    _active_cache = encode_cache
+    try:
+        yield encode_cache
+    finally:
+        _active_cache = None
+        encode_cache.save()
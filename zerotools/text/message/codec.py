@@ -0,0 +1,154 @@
+import re
+import hashlib
+import functools
+
+from .cache import active_encode_cache
+from .locale import Locale, EU_LOCALES
+from ..tables import table_jp, table_eu, COLOR, NEWLINE, LASTCH
+from ..tables.american import table_us
+
+
+def get_font_table(locale: Locale) -> dict:
+    if locale == Locale.JP:
+        return table_jp
+    elif locale == Locale.US:
+        return table_us
+    return table_eu
+
+
+def split_suffix(data: bytes) -> "tuple[bytes, bytes]":
+    # the suffix is an optional 0xFA followed by any number of 0xFF
+    end = len(data)
+    while end > 0 and data[end - 1] == 0xFF:
+        end -= 1
+    if end > 0 and data[end - 1] == 0xFA:
+        end -= 1
+    return data[:end], data[end:]
+
+
+class MessageDecoder:
+    def __init__(self, locale: Locale):
+        font_table = get_font_table(locale)
+
+        # one string per byte value, applied with str.translate on latin-1 decoded runs
+        default = font_table["default"]
+        self.single = [default[x] if x <= LASTCH else f"{{0x{x:02X}}}" for x in range(256)]
+        self.single[NEWLINE] = "\n"
+
+        # second level tables, indexed by the prefix byte (only JP and US fonts have two-byte characters)
+        self.prefixed: "list[list[str] | None]" = [None] * 256
+        if locale not in EU_LOCALES:
+            for prefix, table in font_table.items():
+                if prefix != "default":
+                    self.prefixed[prefix] = table
+
+        specials = [COLOR] + [x for x, table in enumerate(self.prefixed) if table is not None]
+        self.re_special = re.compile(b"[" + b"".join(re.escape(bytes([x])) for x in specials) + b"]")
+
+    def decode(self, data: bytes) -> str:
+        single = self.single
+        size = len(data)
+
+        out = list()
+        position = 0
+        while position < size:
+            match = self.re_special.search(data, position)
+            end = match.start() if match is not None else size
+
+            # plain run of single byte characters
+            if end > position:
+                out.append(data[position:end].decode("latin-1").translate(single))
+
+            if match is None:
+                break
+
+            x = data[end]
+            if x == COLOR:
+                if size - 1 - end >= 3:
+                    out.append("{Color#%02X%02X%02X}" % (data[end + 1], data[end + 2], data[end + 3]))
+                    position = end + 4
+                else:
+                    out.append("{Color}")
+                    position = end + 1
+            else:
+                table = self.prefixed[x]
+                if table is not None and end + 1 < size and data[end + 1] < len(table):
+                    out.append(table[data[end + 1]])
+                    position = end + 2
+                else:
+                    out.append(single[x])
+                    position = end + 1
+
+        return "".join(out)
+
+
+class MessageEncoder:
+    # {Color#RRGGBB}, {0xNN}, any other {name} and single characters
+    re_token = re.compile(r"{Color#[A-F0-9]{6}}|{0x[A-F0-9]{2}}|{[^}\n]*}|.|\n")
+    re_color = re.compile(r"{Color#([A-F0-9]{6})}")
+
+    def __init__(self, locale: Locale):
+        font_table = get_font_table(locale)
+
+        # tables are searched in order and the first match wins, like the font lookup in game
+        self.codes: "dict[str, bytes]" = dict()
+        for name, table in font_table.items():
+            prefix = b"" if name == "default" else bytes([name])
+            for n, ch in enumerate(table):
+                self.codes.setdefault(ch, prefix + bytes([n]))
+
+        for x in range(256):
+            self.codes[f"{{0x{x:02X}}}"] = bytes([x])
+
+        self.codes["{Color}"] = bytes([COLOR])
+        self.codes["\n"] = bytes([NEWLINE])
+
+        # cached texts are only reused with the same font tables
+        self.fingerprint = hashlib.sha1(repr(sorted(self.codes.items())).encode()).digest()
+
+    def _encode_token(self, token: str) -> bytes:
+        color = self.re_color.fullmatch(token)
+        if color is not None:
+            return bytes([COLOR]) + bytes.fromhex(color.group(1))
+
+        # lowercase hex escapes
+        if len(token) == 6 and token.startswith("{0x"):
+            try:
+                return bytes.fromhex(token[3:5])
+            except ValueError:
+                pass
+
+        raise RuntimeError(f"unable to find encoding in language table for character {token}")
+
+    def encode(self, message: str) -> bytes:
+        encode_cache = active_encode_cache()
+        if encode_cache is None:
+            return self._encode(message)
+
+        key = hashlib.sha1(self.fingerprint + message.encode("utf-8", "surrogatepass")).digest()
+        encoded = encode_cache.get(key)
+        if encoded is None:
+            encoded = self._encode(message)
+            encode_cache.put(key, encoded)
+
+        return encoded
+
+    def _encode(self, message: str) -> bytes:
+        codes = self.codes
+
+        encoded = bytearray()
+        for token in self.re_token.findall(message):
+            code = codes.get(token)
+            encoded += code if code is not None else self._encode_token(token)
+
+        return bytes(encoded)
+
+
+@functools.lru_cache(maxsize=None)
+def get_decoder(locale: Locale) -> MessageDecoder:
+    return MessageDecoder(locale)
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoder(locale: Locale) -> MessageEncoder:
+    return MessageEncoder(locale)
@@ -1,13 +1,8 @@
-import io
-import os
-import re
-
 from typing import BinaryIO, TYPE_CHECKING, cast
 
-from .locale import Locale, EU_LOCALES
-from ..tables import table_jp, table_eu, COLOR, NEWLINE, LASTCH
+from .locale import Locale
 from .abstract import Serializable
-from ..tables.american import table_us
+from .codec import get_decoder, get_encoder, split_suffix
 
 
 if TYPE_CHECKING:
@@ -20,11 +15,73 @@ class InGameMessage(Serializable):
         self.offset: int = offset
         self._parent: "InGameMessageTable | None" = parent
         self.size: int = 0
-        self.message: str = ""
-        self.suffix: bytes = b""
-        self.data: bytes = b""
         self.locale = locale
 
+        self._message: "str | None" = ""
+        self._suffix: "bytes | None" = b""
+        self._data: "bytes | None" = b""
+        # undecoded bytes of a lazily parsed message, split and decoded on first access
+        self._raw: "memoryview | None" = None
+        # encoded bytes, reused until message or suffix change
+        self._encoded: "bytes | None" = None
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = get_decoder(self.locale).decode(self.data)
+        return self._message
+
+    @message.setter
+    def message(self, message: str):
+        self._message = message
+        self.invalidate()
+
+    @property
+    def suffix(self) -> bytes:
+        if self._suffix is None:
+            self._split_raw()
+        return cast(bytes, self._suffix)
+
+    @suffix.setter
+    def suffix(self, suffix: bytes):
+        self._suffix = suffix
+        self.invalidate()
+
+    @property
+    def data(self) -> bytes:
+        if self._data is None:
+            self._split_raw()
+        return cast(bytes, self._data)
+
+    @data.setter
+    def data(self, data: bytes):
+        self._data = data
+
+    @property
+    def decoded(self) -> bool:
+        return self._message is not None
+
+    @property
+    def dirty(self) -> bool:
+        return self._encoded is None
+
+    def invalidate(self):
+        # a dirty message always has dirty parents, so there is no need to go further up
+        if self._encoded is None and self._parent is not None and self._parent.dirty:
+            return
+
+        self._encoded = None
+        if self._parent is not None:
+            self._parent.invalidate()
+
+    def _split_raw(self):
+        data, suffix = self._separate_suffix(bytes(self._raw or b""))
+        if self._data is None:
+            self._data = data
+        if self._suffix is None:
+            self._suffix = suffix
+        self._raw = None
+
     @classmethod
     def from_message(
         cls,
@@ -43,6 +100,28 @@ class InGameMessage(Serializable):
             msg.encode()
         return msg
 
+    @classmethod
+    def from_encoded(
+        cls,
+        number: int,
+        parent: "InGameMessageTable",
+        message: str,
+        suffix: bytes,
+        encoded: bytes,
+        locale: Locale,
+        offset=-1,
+    ):
+        # text and bytes known to match, the message is only encoded again once it changes
+        msg = cls(number, offset, parent, locale)
+        msg._message = message
+        msg._suffix = suffix
+        msg._data = encoded[: len(encoded) - len(suffix)]
+        msg.size = len(encoded)
+        msg._encoded = encoded
+        if parent is not None:
+            parent.invalidate()
+        return msg
+
     @classmethod
     def from_data(cls, number, parent, data: bytes, locale: Locale, offset=-1):
         msg = cls(number, offset, parent, locale)
@@ -51,10 +130,7 @@ class InGameMessage(Serializable):
 
     @staticmethod
     def _separate_suffix(data: bytes) -> tuple[bytes, bytes]:
-        match = re.match(b"^(.*?)(\xFA?\xFF*)$", data, re.DOTALL)
-        assert match is not None
-        data, suffix = match.groups()
-        return data, suffix
+        return split_suffix(data)
 
     def parse_text(self, file_h: BinaryIO, size: int):
         file_h.seek(self.offset)
@@ -63,93 +139,29 @@ class InGameMessage(Serializable):
 
     def _parse_data(self, data: bytes):
         self.size = len(data)
-        # data_hex_str = " ".join(f"{x:02X}" for x in data)
         self.data, self.suffix = self._separate_suffix(data)
+        self.message = get_decoder(self.locale).decode(self.data)
 
-        text_bin = self.data
-
-        font_table = table_eu
-        if self.locale == Locale.JP:
-            font_table = table_jp
-        elif self.locale == Locale.US:
-            font_table = table_us
-
-        idx = 0
-        while idx < len(text_bin):
-            x = text_bin[idx]
-
-            if x == COLOR:
-                idx_left = len(text_bin) - 1 - idx
-                if idx_left >= 3:
-                    self.message += "{Color#%02X%02X%02X}" % (text_bin[idx + 1], text_bin[idx + 2], text_bin[idx + 3])
-                    idx += 3
-                else:
-                    self.message += "{Color}"
-
-            elif x == NEWLINE:
-                self.message += "\n"
+    def _set_raw(self, raw: memoryview):
+        # lazy parsing: only the location is known until the text is needed
+        self.size = len(raw)
+        self._raw = raw
+        self._message = self._suffix = self._data = None
+        self.invalidate()
 
-            elif self.locale not in EU_LOCALES and x in font_table:
-                table = font_table[x]
-                idx += 1
-                self.message += table[text_bin[idx]]
-
-            elif x <= LASTCH:
-                self.message += font_table["default"][x]
+    def encode(self, offset=0):
+        if self._encoded is None:
+            # a message whose text was never looked at is written back as it was read
+            if self.decoded:
+                self.data = get_encoder(self.locale).encode(self.message)
+                self.size = len(self.data) + len(self.suffix)
 
-            else:
-                self.message += f"{{0x{x:02X}}}"
+            self._encoded = self.data + self.suffix
 
-            idx += 1
+        return self._encoded
 
-    @staticmethod
-    def _encode_color(color_str):
-        return re.sub(
-            r"{Color#([A-F0-9]{2})([A-F0-9]{2})([A-F0-9]{2})}",
-            f"{{0x{COLOR:02X}}}{{0x\\1}}{{0x\\2}}{{0x\\3}}",
-            color_str,
-        )
-
-    def encode(self, offset=0):
-        message = (
-            self._encode_color(self.message)
-            .replace("{Color}", f"{{0x{COLOR:02X}}}")
-            .replace("\n", f"{{0x{NEWLINE:02X}}}")
-        )
-
-        encoded = io.BytesIO()
-
-        char_table = table_eu
-        if self.locale == Locale.JP:
-            char_table = table_jp
-        elif self.locale == Locale.US:
-            char_table = table_us
-
-        characters = re.findall(r"({0x[A-F0-9]{2}}|{.*?}|.)", message)
-        for ch in characters:
-            enc = None
-            if len(ch) != 6:
-                for name, table in char_table.items():
-                    if ch in table:
-                        enc = table.index(ch).to_bytes(1, "little")
-                    if enc is not None and name != "default":
-                        name = cast(int, name)
-                        enc = name.to_bytes(1, "little") + enc
-                    if enc is not None:
-                        break
-            else:
-                enc = bytes.fromhex(ch[3:5])
-
-            if enc is None:
-                raise RuntimeError(f"unable to find encoding in language table for character {ch}")
-
-            encoded.write(enc)
-
-        encoded.seek(0, os.SEEK_SET)
-        self.data = encoded.read()
-        self.size = len(self.data) + len(self.suffix)
-
-        return self.data + self.suffix
+    def encoded_size(self) -> int:
+        return len(self.encode())
 
     def __str__(self):
         suffix_hex = "".join(f"{x:02X}" for x in self.suffix)
@@ -165,6 +177,6 @@ class InGameMessage(Serializable):
             return id(self) == id(other)
 
     def has_overlap(self, other):
-        r1 = range(self.offset, self.offset + self.size)
-        r2 = range(other.offset, other.offset + other.size)
-        return len(list(set(r1) & set(r2))) != 0
+        if self.size <= 0 or other.size <= 0:
+            return False
+        return self.offset < other.offset + other.size and other.offset < self.offset + self.size
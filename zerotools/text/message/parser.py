@@ -1,45 +1,80 @@
 import io
 import os
-import struct
+import bisect
 
 from typing import BinaryIO
+from dataclasses import dataclass
 
-from .table import InGameMessageTable
+from .pool import encode_pooled
+from .table import DWORD, InGameMessageTable
 from .locale import Locale
 from .message import InGameMessage
+from ..tables import TERMINATOR
+from ...utils.intervals import IntervalSet
+
+
+@dataclass
+class CoverageReport:
+    file_size: int
+    covered: int
+    # ranges referenced more than once (e.g. messages shared by several tables)
+    overlaps: "list[tuple[int, int]]"
+    # ranges no table or message points to
+    unreferenced: "list[tuple[int, int]]"
 
 
 class InGameMessageParser:
-    def __init__(self, file: "str | bytes | BinaryIO | None", table_names: "list[str] | None" = None, locale=Locale.EN):
+    def __init__(
+        self,
+        file: "str | bytes | memoryview | BinaryIO | None",
+        table_names: "list[str] | None" = None,
+        locale=Locale.EN,
+        lazy=False,
+    ):
+        data: "bytes | memoryview | None"
         if isinstance(file, str):
             with open(file, "rb") as fh:
-                self.file_h = io.BytesIO(fh.read())
-        elif isinstance(file, bytes):
-            self.file_h = io.BytesIO(file)
+                data = fh.read()
+        elif isinstance(file, (bytes, memoryview)):
+            # walked where it is, a view of the mapped IMG_BD is not copied
+            data = file
         elif isinstance(file, io.IOBase):
             pos = file.tell()
             file.seek(0, os.SEEK_SET)
-            self.file_h = io.BytesIO(file.read())
+            data = file.read()
             file.seek(pos, os.SEEK_SET)
         elif file is None:
-            self.file_h = None
+            data = None
         else:
             raise ValueError("input must be filename or open file handle")
 
         self.table_names: "list[str] | None"
 
-        self.file_size = self.file_h.getbuffer().nbytes if self.file_h else 0
+        # lazily parsed messages keep slices of it, a mapped view has to outlive them
+        self._has_data = data is not None
+        self._view = memoryview(data if data is not None else b"")
+        self.file_size = self._view.nbytes
         self.locale = locale
+        # lazy parsing only walks the tables, messages are decoded when their text is first needed
+        self.lazy = lazy
 
         self._boundaries: list[int] = []
-        self._byte_address_read = []
-
-        self.msg_tables = self._parse_obj(locale=locale) if self.file_h else InGameMessageTable(0, -1, 0)
+        # message starts pointing back into storage an earlier message already points past (see MessagePool)
+        self._message_offsets: set[int] = set()
+        self._message_starts: list[int] = []
+        self._tail_offsets: set[int] = set()
+        # starts whose text a later tail may run into: the ones past every earlier start, and the tails
+        self._host_offsets: set[int] = set()
+        self._max_message_offset = -1
+        self.coverage = IntervalSet()
+        self.overlaps = IntervalSet()
+
+        self.msg_tables = self._parse_obj(locale=locale) if self._has_data else InGameMessageTable(0, -1, 0)
 
         if self.msg_tables is None:
             raise RuntimeError("cannot find message tables")
 
-        if self.file_h is None or (isinstance(table_names, list) and len(table_names) == len(self.msg_tables.tables)):
+        if not self._has_data or (isinstance(table_names, list) and len(table_names) == len(self.msg_tables.tables)):
             self.table_names = table_names
         else:
             num_tables = len(self.msg_tables.tables)
@@ -56,12 +91,44 @@ class InGameMessageParser:
         table_idx = self.table_names.index(item)
         return self.msg_tables.tables[table_idx]
 
-    @staticmethod
-    def _read_dword(f):
-        return struct.unpack("<I", f.read(4))[0], f.tell()
-
     def next_boundary(self, offset):
-        return next(b for b in self._boundaries if b > offset)
+        return self._boundaries[bisect.bisect_right(self._boundaries, offset)]
+
+    def message_end(self, offset):
+        # a message sharing its tail with others runs on through their starts, up to its terminator
+        end = self.next_boundary(offset)
+        run_on = end
+        while run_on in self._tail_offsets and self._view[run_on - 1] != TERMINATOR:
+            run_on = self.next_boundary(run_on)
+
+        return run_on if self._view[run_on - 1] == TERMINATOR else end
+
+    def _is_tail(self, offset) -> bool:
+        # like MessagePool writes them: the closest start below is a host that does not stop right before the tail.
+        # stock files pointing back into text are read as before, their closest start is not a host
+        idx = bisect.bisect_left(self._message_starts, offset)
+        if idx == 0 or self._view[offset - 1] == TERMINATOR:
+            return False
+
+        return self._message_starts[idx - 1] in self._host_offsets
+
+    def _add_message_offset(self, offset):
+        if offset not in self._message_offsets:
+            if offset > self._max_message_offset:
+                self._host_offsets.add(offset)
+            elif self._is_tail(offset):
+                self._tail_offsets.add(offset)
+                self._host_offsets.add(offset)
+
+            bisect.insort(self._message_starts, offset)
+
+        self._message_offsets.add(offset)
+        self._max_message_offset = max(self._max_message_offset, offset)
+        self._boundaries.append(offset)
+
+    def _mark_read(self, start: int, end: int):
+        for overlap in self.coverage.add(start, end):
+            self.overlaps.add(*overlap)
 
     def _parse_obj_rec(self, msg_table: InGameMessageTable):
         file_has_table = len(msg_table.tables) > 0
@@ -71,43 +138,45 @@ class InGameMessageParser:
                 self._parse_obj_rec(sub_table)
             return
 
-        if self.file_h is None:
+        if not self._has_data:
             raise RuntimeError("missing data handle")
 
         for message in msg_table.messages:
-            size = self.next_boundary(message.offset) - message.offset
-            addresses = [x for x in range(message.offset, message.offset + message.size)]
-            self._byte_address_read.extend(addresses)
-            message.parse_text(self.file_h, size)
-            message.encode()
+            size = self.message_end(message.offset) - message.offset
+            self._mark_read(message.offset, message.offset + size)
+
+            if self.lazy:
+                message._set_raw(self._view[message.offset : message.offset + size])
+            else:
+                message._parse_data(bytes(self._view[message.offset : message.offset + size]))
+                message.encode()
 
     def _find_table_size(self, offset):
+        if not self._has_data:
+            raise RuntimeError("missing data handle")
+
+        # a table is a run of dwords pointing past its own end, only whole dwords before the last byte are valid
+        dword_count = max(0, (self.file_size - 1 - offset) // DWORD.size) if offset >= 0 else 0
         max_offset = self.file_size
-        position = -1
+        position = offset
         maybe_table = []
-        address_read = []
-
-        if not self.file_h:
-            raise RuntimeError("missing data handle")
 
-        while max_offset > position:
-            address_read.extend([x for x in range(self.file_h.tell(), self.file_h.tell() + 4)])
-            if self.file_h.tell() + 4 >= self.file_size:
-                return False, 0
-            address, position = self._read_dword(self.file_h)
+        for (address,) in DWORD.iter_unpack(self._view[offset : offset + dword_count * DWORD.size]):
+            position += DWORD.size
             max_offset = min(address, max_offset)
             if address > self.file_size or max_offset < offset:
                 return False, 0
             maybe_table.append(address)
-        self._byte_address_read.extend(address_read)
-        return maybe_table, max_offset - offset
+            if max_offset <= position:
+                self._mark_read(offset, position)
+                return maybe_table, max_offset - offset
+
+        return False, 0
 
     def _parse_obj_tables(self, number, offset=0, msg_table: "InGameMessageTable | None" = None, locale=Locale.EN):
-        if not self.file_h:
+        if not self._has_data:
             raise RuntimeError("missing data handle")
 
-        self.file_h.seek(offset, os.SEEK_SET)
-
         table, tbl_size = self._find_table_size(offset)
 
         if table is False:
@@ -123,7 +192,7 @@ class InGameMessageParser:
             has_subtable = self._parse_obj_tables(n, offset_start, cur_msg_table, locale) is not None
             if not has_subtable:
                 cur_msg_table.add_message(InGameMessage(n, offset_start, cur_msg_table, locale))
-                self._boundaries.append(offset_start)
+                self._add_message_offset(offset_start)
 
         return cur_msg_table
 
@@ -142,6 +211,14 @@ class InGameMessageParser:
 
         return msg_tables
 
+    def coverage_report(self) -> CoverageReport:
+        return CoverageReport(
+            file_size=self.file_size,
+            covered=self.coverage.total,
+            overlaps=list(self.overlaps),
+            unreferenced=self.coverage.gaps(0, self.file_size),
+        )
+
     def _find_message_containing(self, text: str, msg_table: InGameMessageTable, results: list[InGameMessage]):
         for table in msg_table.tables:
             self._find_message_containing(text, table, results)
@@ -155,5 +232,13 @@ class InGameMessageParser:
         self._find_message_containing(text.lower(), self.msg_tables, results)
         return results
 
-    def encode(self):
+    def encoded_size(self, pooled=False) -> int:
+        # the pooled layout is only known once the messages have been placed
+        if pooled:
+            return len(encode_pooled(self.msg_tables))
+        return self.msg_tables.encoded_size()
+
+    def encode(self, pooled=False):
+        if pooled:
+            return encode_pooled(self.msg_tables)
         return self.msg_tables.encode()
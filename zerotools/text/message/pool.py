@@ -0,0 +1,68 @@
+import struct
+
+from .table import DWORD, InGameMessageTable
+from ..tables import TERMINATOR
+
+
+class MessagePool:
+    # lays out the tables like InGameMessageTable.encode, except that messages of a table share storage: identical
+    # messages are written once and a message ending another one points into its tail (the game reads up to the
+    # terminator). The parser only accepts tables pointing past themselves, so nothing is shared across tables
+    def __init__(self):
+        self.encoded = bytearray()
+        self.max_message_offset = -1
+
+    def _tail_offset(self, data: bytes, placed: "dict[bytes, int]") -> "int | None":
+        if not data.endswith(bytes([TERMINATOR])):
+            return None
+
+        for host, host_offset in placed.items():
+            if len(host) <= len(data) or not host.endswith(data):
+                continue
+
+            # the host has to stop at the tail start for the parser to run on through it, and the tail start has to
+            # point back before a message already written to be told apart from a message start
+            tail_offset = host_offset + len(host) - len(data)
+            if host[-len(data) - 1] != TERMINATOR and tail_offset < self.max_message_offset:
+                return tail_offset
+
+        return None
+
+    def _message_offset(self, data: bytes, placed: "dict[bytes, int]") -> int:
+        offset = placed.get(data)
+        if offset is None:
+            offset = self._tail_offset(data, placed)
+        if offset is None:
+            offset = len(self.encoded)
+            self.encoded += data
+
+        placed[data] = offset
+        self.max_message_offset = max(self.max_message_offset, offset)
+        return offset
+
+    def _write_table(self, msg_table: InGameMessageTable):
+        table = msg_table.tables if msg_table.tables else msg_table.messages
+
+        table_offset = len(self.encoded)
+        self.encoded += bytes(len(table) * DWORD.size)
+
+        offsets = list()
+        placed: "dict[bytes, int]" = dict()
+        for entry in table:
+            if isinstance(entry, InGameMessageTable):
+                offsets.append(len(self.encoded))
+                self._write_table(entry)
+            else:
+                offsets.append(self._message_offset(entry.encode(), placed))
+
+        struct.pack_into(f"<{len(offsets)}I", self.encoded, table_offset, *offsets)
+
+    def encode(self, msg_table: InGameMessageTable) -> bytes:
+        self.encoded = bytearray()
+        self.max_message_offset = -1
+        self._write_table(msg_table)
+        return bytes(self.encoded)
+
+
+def encode_pooled(msg_table: InGameMessageTable) -> bytes:
+    return MessagePool().encode(msg_table)
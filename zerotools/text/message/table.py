@@ -1,11 +1,14 @@
-import io
-import os
 import struct
 
+from typing import cast
+
 from .message import InGameMessage
 from .abstract import Serializable
 
 
+DWORD = struct.Struct("<I")
+
+
 class InGameMessageTable(Serializable):
     def __init__(
         self,
@@ -22,18 +25,38 @@ class InGameMessageTable(Serializable):
         self._parent = parent
         self.tables = tables if tables is not None else list()
         self.messages = messages if messages is not None else list()
+        # size of the encoded table and everything it points to
+        self._size: "int | None" = None
+        # where the table was last written: offset in the file, buffer and position in the buffer.
+        # pointers in the tables are absolute, so the bytes are only reused at the same offset
+        self._encoded: "tuple[int, bytearray, int] | None" = None
+
+    @property
+    def dirty(self) -> bool:
+        return self._size is None
+
+    def invalidate(self):
+        if self._size is None:
+            return
+
+        self._size = None
+        self._encoded = None
+        if self._parent is not None:
+            self._parent.invalidate()
 
     def add_table(self, table: "InGameMessageTable"):
         if self.messages:
             raise RuntimeError("cannot add table while messages exist")
 
         self.tables.append(table)
+        self.invalidate()
 
     def add_message(self, message: "InGameMessage"):
         if self.tables:
             raise RuntimeError("cannot add message while tables exists")
 
         self.messages.append(message)
+        self.invalidate()
 
     def __str__(self):
         if self.tables:
@@ -54,30 +77,48 @@ class InGameMessageTable(Serializable):
         return self.messages[item]
 
     def has_overlap(self, other):
-        r1 = range(self.offset, self.offset + self.size)
-        r2 = range(other.offset, other.offset + other.size)
-        return len(list(set(r1) & set(r2))) != 0
+        if self.size <= 0 or other.size <= 0:
+            return False
+        return self.offset < other.offset + other.size and other.offset < self.offset + self.size
 
-    def encode(self, offset=0):
-        table = self.tables if self.tables else self.messages
+    def encoded_size(self) -> int:
+        if self._size is None:
+            table = self.tables if self.tables else self.messages
+            self._size = len(table) * DWORD.size + sum(entry.encoded_size() for entry in table)
+        return self._size
+
+    def _write(self, buffer: bytearray, position: int, offset: int):
+        size = self.encoded_size()
+
+        # untouched tables are copied over as long as they do not move
+        if self._encoded is not None and self._encoded[0] == offset:
+            _, cached, cached_position = self._encoded
+            buffer[position : position + size] = memoryview(cached)[cached_position : cached_position + size]
 
-        encoded = io.BytesIO()
-        offsets = list()
+        else:
+            table = self.tables if self.tables else self.messages
+
+            offsets = list()
+            entry_position = position + len(table) * DWORD.size
+            for entry in table:
+                entry_offset = offset + entry_position - position
+                offsets.append(entry_offset)
 
-        encoded.write(bytearray(len(table * 4)))
-        offset += len(table) * 4
+                if isinstance(entry, InGameMessageTable):
+                    entry._write(buffer, entry_position, entry_offset)
+                else:
+                    buffer[entry_position : entry_position + entry.encoded_size()] = entry.encode()
 
-        for entry in table:
-            offsets.append(offset)
-            enc = entry.encode(offset)
-            encoded.write(enc)
-            offset += len(enc)
+                entry_position += entry.encoded_size()
 
-        encoded.seek(0, os.SEEK_SET)
+            struct.pack_into(f"<{len(offsets)}I", buffer, position, *offsets)
 
-        table_bin = struct.pack(f"<{len(offsets)}I", *offsets)
-        encoded.write(table_bin)
+        self._encoded = offset, buffer, position
 
-        encoded.seek(0, os.SEEK_SET)
+    def encode(self, offset=0):
+        # sizes are known upfront, every table and message is written once straight at its final position
+        if self._encoded is None or self._encoded[0] != offset:
+            self._write(bytearray(self.encoded_size()), 0, offset)
 
-        return encoded.read()
+        _, buffer, position = cast("tuple[int, bytearray, int]", self._encoded)
+        return bytes(memoryview(buffer)[position : position + self.encoded_size()])
@@ -5,18 +5,20 @@ from typing import BinaryIO, cast
 
 from .names import MessageNames
 from .serializer import LocalizationSerializerFormat
-from ..utils.iso import iso_context
-from ..zero.names import IMG_BD
+from .message.cache import default_encode_cache_path, open_encode_cache
 from .message.locale import Locale
 from .message.parser import InGameMessageParser
-from ..imgbd.rebuild import rebuild_img_bd_iso_inplace
+from ..imgbd.layout import LayoutPlan
+from ..imgbd.rebuild import plan_img_bd_iso_inplace, rebuild_img_bd_iso_inplace
 from .deserializer.xmlfile import rebuild_language_xml
 from .deserializer.jsonfile import rebuild_language_json
-from ..zero.reader.pjzreader import PJZReader
+from ..zero.session import ProjectZeroISO, open_iso_session
 from .deserializer.filesystem import rebuild_language_fs
+from .deserializer.sqlitefile import rebuild_language_sqlite
+from .deserializer.binaryfile import rebuild_language_binary
 
 
-def _rebuild_file(
+def rebuild_language_file(
     lang_path: str, locale: Locale, serializer_format: LocalizationSerializerFormat
 ) -> InGameMessageParser:
     if serializer_format == LocalizationSerializerFormat.FS:
@@ -28,56 +30,154 @@ def _rebuild_file(
     elif serializer_format == LocalizationSerializerFormat.XML:
         return rebuild_language_xml(lang_path, locale)
 
+    elif serializer_format == LocalizationSerializerFormat.SQLITE:
+        return rebuild_language_sqlite(lang_path, locale)
+
+    elif serializer_format == LocalizationSerializerFormat.BINARY:
+        return rebuild_language_binary(lang_path, locale)
+
     else:
         raise ValueError("wrong serializer format")
 
 
+def _open_encode_cache(use_encode_cache: bool):
+    # texts encoded by an earlier run are not encoded again
+    return open_encode_cache(default_encode_cache_path() if use_encode_cache else None)
+
+
+def _rebuild_sources(
+    sources: "list[tuple[str, Locale, MessageNames]]", serializer_format: LocalizationSerializerFormat
+) -> "dict[str, InGameMessageParser]":
+    if not sources:
+        raise RuntimeError("no language file to rebuild")
+
+    ig_msg_parsers: dict[str, InGameMessageParser] = dict()
+    for lang_path, locale, event_type in sources:
+        file_name = event_type.to_locale_file_name(locale)
+
+        if file_name in ig_msg_parsers:
+            raise RuntimeError(f"{file_name} is rebuilt more than once")
+
+        ig_msg_parsers[file_name] = rebuild_language_file(lang_path, locale, serializer_format)
+
+    return ig_msg_parsers
+
+
 def rebuild_iso(
     lang_path: str,
-    iso_path: str,
+    iso: "str | ProjectZeroISO",
     /,
     *,
     locale: Locale,
     serializer_format: LocalizationSerializerFormat,
     event_type: MessageNames,
-):
-    ig_msg_parser = _rebuild_file(lang_path, locale, serializer_format)
-
-    new_lang_bytes = ig_msg_parser.encode()
-    new_lang_size = len(new_lang_bytes)
-
-    file_name = event_type.to_locale_file_name(locale)
-
-    reader = PJZReader(iso_path)
-    entry = reader.find_entry(file_name)
-
-    if entry is None:
-        raise RuntimeError(f"cannot find entry {file_name}")
+    patch_path: "str | None" = None,
+    pooled: bool = False,
+    use_encode_cache: bool = True,
+) -> "list[LayoutPlan]":
+    return rebuild_iso_batch(
+        [(lang_path, locale, event_type)],
+        iso,
+        serializer_format=serializer_format,
+        patch_path=patch_path,
+        pooled=pooled,
+        use_encode_cache=use_encode_cache,
+    )
+
+
+def rebuild_iso_batch(
+    sources: "list[tuple[str, Locale, MessageNames]]",
+    iso: "str | ProjectZeroISO",
+    /,
+    *,
+    serializer_format: LocalizationSerializerFormat,
+    patch_path: "str | None" = None,
+    pooled: bool = False,
+    use_encode_cache: bool = True,
+) -> "list[LayoutPlan]":
+    # encode everything first, the ISO is then rewritten once for all the entries
+    replace_entries: dict[str, BinaryIO] = dict()
+    with _open_encode_cache(use_encode_cache):
+        for file_name, ig_msg_parser in _rebuild_sources(sources, serializer_format).items():
+            # pooled files are smaller, so they more often keep their slot in IMG_BD
+            replace_entries[file_name] = cast(BinaryIO, BytesIO(ig_msg_parser.encode(pooled=pooled)))
+
+    with open_iso_session(iso) as session:
+        for file_name in replace_entries:
+            if session.reader.find_entry(file_name) is None:
+                raise RuntimeError(f"cannot find entry {file_name}")
+
+        # entries that still fit in their slot keep their offset, the layout planner only moves what it must
+        return rebuild_img_bd_iso_inplace(session, replace_entries, patch_path=patch_path)
+
+
+def plan_rebuild_iso_batch(
+    sources: "list[tuple[str, Locale, MessageNames]]",
+    iso: "str | ProjectZeroISO",
+    /,
+    *,
+    serializer_format: LocalizationSerializerFormat,
+    pooled: bool = False,
+    use_encode_cache: bool = True,
+) -> "list[LayoutPlan]":
+    # the layouts rebuild_iso_batch would choose from, only the sizes of the new files are computed
+    replace_sizes: dict[str, int] = dict()
+    with _open_encode_cache(use_encode_cache):
+        for file_name, ig_msg_parser in _rebuild_sources(sources, serializer_format).items():
+            replace_sizes[file_name] = ig_msg_parser.encoded_size(pooled=pooled)
 
-    if new_lang_size <= entry.max_size:
-        with iso_context(iso_path) as iso:
-            img_bd_offset = iso.get_record(iso_path=f"/{IMG_BD};1").fp_offset
+    return plan_img_bd_iso_inplace(iso, replace_sizes)
 
-        zero_padding = entry.max_size - new_lang_size
 
-        with open(iso_path, "rb+") as iso_fh:
-            iso_fh.seek(img_bd_offset + entry.offset, os.SEEK_SET)
-            iso_fh.write(new_lang_bytes)
-            iso_fh.write(bytearray(zero_padding))
+def find_lang_sources(
+    lang_folder: str,
+    /,
+    *,
+    serializer_format: LocalizationSerializerFormat,
+    locales: "list[Locale]",
+    event_types: "list[MessageNames] | None" = None,
+) -> "list[tuple[str, Locale, MessageNames]]":
+    # look for the files written by extract_iso (e.g. M1_EVENT_F.json), missing ones are skipped
+    if serializer_format == LocalizationSerializerFormat.FS:
+        ext = ""
+    elif serializer_format == LocalizationSerializerFormat.JSON:
+        ext = ".json"
+    elif serializer_format == LocalizationSerializerFormat.XML:
+        ext = ".xml"
+    elif serializer_format == LocalizationSerializerFormat.SQLITE:
+        ext = ".sqlite"
+    elif serializer_format == LocalizationSerializerFormat.BINARY:
+        ext = ".bin"
     else:
-        replace_entries = {
-            file_name: cast(BinaryIO, BytesIO(new_lang_bytes)),
-        }
+        raise ValueError("wrong serializer format")
+
+    sources = list()
+    for locale in locales:
+        for event_type in event_types or MessageNames:
+            file_name = os.path.splitext(event_type.to_locale_file_name(locale))[0]
+            lang_path = os.path.join(lang_folder, file_name + ext)
+            if os.path.exists(lang_path):
+                sources.append((lang_path, locale, event_type))
 
-        rebuild_img_bd_iso_inplace(iso_path, replace_entries)
+    return sources
 
 
 def rebuild_file(
-    lang_path: str, out_language_path: str, /, *, locale: Locale, serializer_format: LocalizationSerializerFormat
+    lang_path: str,
+    out_language_path: str,
+    /,
+    *,
+    locale: Locale,
+    serializer_format: LocalizationSerializerFormat,
+    pooled: bool = False,
+    use_encode_cache: bool = True,
 ):
-    ig_msg_parser = _rebuild_file(lang_path, locale, serializer_format)
+    ig_msg_parser = rebuild_language_file(lang_path, locale, serializer_format)
+
+    with _open_encode_cache(use_encode_cache):
+        data = ig_msg_parser.encode(pooled=pooled)
 
     os.makedirs(os.path.dirname(out_language_path), exist_ok=True)
 
     with open(out_language_path, "wb") as file_h:
-        file_h.write(ig_msg_parser.encode())
+        file_h.write(data)
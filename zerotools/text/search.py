@@ -0,0 +1,278 @@
+import os
+import json
+import hashlib
+
+from typing import Callable, Iterable
+from contextlib import ExitStack
+from dataclasses import dataclass, asdict
+
+from .serializer import LocalizationSerializerFormat, TABLE_NAME_MIN_DIGIT
+from .message.locale import Locale, EU_LOCALES
+from .message.table import InGameMessageTable
+from .message.parser import InGameMessageParser
+from .rebuild import find_lang_sources, rebuild_language_file
+from ..elf.version import ELF_EU
+from ..zero.session import ProjectZeroISO, open_iso_session
+
+
+SEARCH_INDEX_VERSION = 1
+
+# messages are indexed by their lowercase character trigrams, shorter queries scan every message
+NGRAM_SIZE = 3
+
+
+@dataclass
+class MessageHit:
+    # ISO or language file the message was read from
+    source: str
+    # OBJ file name (e.g. M1_EVENT_F.OBJ)
+    file: str
+    locale: Locale
+    # top table name and sub-table names, as in the extracted files (e.g. IGMSG_N46/0002)
+    table: str
+    number: int
+    message: str
+
+
+@dataclass
+class IndexedSource:
+    source: str
+    file: str
+    locale: str
+    # changes whenever the source has to be indexed again
+    key: "list[int | str]"
+    # (table, number, message) of every message
+    messages: "list[list]"
+    # trigram -> indices in messages
+    ngrams: "dict[str, list[int]]"
+
+
+@dataclass
+class SearchSource:
+    source: str
+    file: str
+    locale: Locale
+    key: "list[int | str]"
+    # only called when the source is not in the index yet or its key changed
+    load: Callable[[], InGameMessageParser]
+
+    @property
+    def source_id(self) -> str:
+        return f"{self.source}:{self.file}"
+
+
+def text_ngrams(text: str) -> "set[str]":
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _table_messages(ig_msg_table: InGameMessageTable, path: str, messages: "list[list]"):
+    if ig_msg_table.tables:
+        num_table_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(ig_msg_table.tables))))
+        for i, table in enumerate(ig_msg_table.tables):
+            _table_messages(table, f"{path}/{i:0{num_table_digits}d}", messages)
+
+    else:
+        for i, message in enumerate(ig_msg_table.messages):
+            messages.append([path, i, message.message])
+
+
+def index_messages(ig_msg_parser: InGameMessageParser) -> "tuple[list[list], dict[str, list[int]]]":
+    tables = ig_msg_parser.msg_tables.tables
+    table_names = ig_msg_parser.table_names
+    if not table_names or len(table_names) != len(tables):
+        table_names = [f"{i:0{TABLE_NAME_MIN_DIGIT}d}" for i in range(len(tables))]
+
+    messages: "list[list]" = list()
+    for name, table in zip(table_names, tables):
+        _table_messages(table, name, messages)
+
+    ngrams: "dict[str, list[int]]" = dict()
+    for n, (_, _, message) in enumerate(messages):
+        for ngram in text_ngrams(message.lower()):
+            ngrams.setdefault(ngram, []).append(n)
+
+    return messages, ngrams
+
+
+class SearchIndex:
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.sources: "dict[str, IndexedSource]" = dict()
+
+        # lowercase messages, built on the first search
+        self._lowered: "dict[str, list[str]]" = dict()
+
+        if os.path.isfile(index_path):
+            self.load()
+
+    def load(self):
+        with open(self.index_path, mode="r", encoding="utf-8") as file_h:
+            index = json.load(file_h)
+
+        # an index from another version is rebuilt from scratch
+        if index.get("version") != SEARCH_INDEX_VERSION:
+            return
+
+        self.sources = {source_id: IndexedSource(**source) for source_id, source in index["sources"].items()}
+
+    def save(self):
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+
+        index = {
+            "version": SEARCH_INDEX_VERSION,
+            "sources": {source_id: asdict(source) for source_id, source in self.sources.items()},
+        }
+        with open(tmp_path, mode="w", encoding="utf-8") as file_h:
+            json.dump(index, file_h, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def update(self, sources: "Iterable[SearchSource]") -> int:
+        # sources are added to the ones already indexed, only new and changed ones are read, returns how many
+        num_updated = 0
+        for source in sources:
+            indexed_source = self.sources.get(source.source_id)
+            if indexed_source is None or indexed_source.key != source.key:
+                messages, ngrams = index_messages(source.load())
+                locale = source.locale.value
+                indexed_source = IndexedSource(source.source, source.file, locale, source.key, messages, ngrams)
+                self.sources[source.source_id] = indexed_source
+                self._lowered.pop(source.source_id, None)
+                num_updated += 1
+
+        return num_updated
+
+    def prune(self) -> int:
+        # drops the sources whose ISO or language file was removed, returns how many
+        missing = [source_id for source_id, source in self.sources.items() if not os.path.exists(source.source)]
+        for source_id in missing:
+            del self.sources[source_id]
+            self._lowered.pop(source_id, None)
+
+        return len(missing)
+
+    @staticmethod
+    def _candidates(source: IndexedSource, ngrams: "set[str]") -> "Iterable[int]":
+        if not ngrams:
+            return range(len(source.messages))
+
+        # the messages with the rarest trigram of the query, they are checked against the whole query anyway
+        return min((source.ngrams.get(ngram, []) for ngram in ngrams), key=len)
+
+    def search(self, text: str, /, *, locales: "list[Locale] | None" = None) -> "list[MessageHit]":
+        # case-insensitive substring search, like InGameMessageParser.find_message_containing
+        query = text.lower()
+        ngrams = text_ngrams(query)
+        locale_values = {locale.value for locale in locales} if locales else None
+
+        hits = list()
+        for source_id, source in self.sources.items():
+            if locale_values is not None and source.locale not in locale_values:
+                continue
+
+            lowered = self._lowered.get(source_id)
+            if lowered is None:
+                lowered = self._lowered[source_id] = [message.lower() for _, _, message in source.messages]
+
+            for n in self._candidates(source, ngrams):
+                if query in lowered[n]:
+                    table, number, message = source.messages[n]
+                    hits.append(MessageHit(source.source, source.file, Locale(source.locale), table, number, message))
+
+        return hits
+
+
+def _path_key(path: str) -> "list[int | str]":
+    # size and modification time, of every file for the FS format
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    digest = hashlib.sha1()
+    for root, folders, files in os.walk(path):
+        folders.sort()
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            stat = os.stat(file_path)
+            digest.update(f"{os.path.relpath(file_path, path)},{stat.st_size},{stat.st_mtime_ns}\n".encode())
+    return [digest.hexdigest()]
+
+
+def iso_search_sources(session: ProjectZeroISO, /, *, locales: "list[Locale] | None" = None) -> "list[SearchSource]":
+    # every language OBJ in the ISO, keyed by its content
+    table_names, iso_locale, elf_name = session.ingame_message_table_names
+    iso_locales = EU_LOCALES if elf_name == ELF_EU else (iso_locale,)
+
+    reader = session.reader
+    source = os.path.abspath(session.iso_path)
+
+    sources = list()
+    for locale in iso_locales:
+        if locales and locale not in locales:
+            continue
+
+        for file_name in [locale.ig_msg_file_name] + list(locale.event_file_names):
+            if reader.find_entry(file_name) is None:
+                continue
+
+            # views must not outlive the session, they are only taken while hashing and parsing
+            key: "list[int | str]" = [hashlib.sha1(reader.view(file_name)).hexdigest()]
+
+            def load(file_name=file_name, locale=locale):
+                return InGameMessageParser(reader.view(file_name), table_names=table_names, locale=locale, lazy=True)
+
+            sources.append(SearchSource(source, file_name, locale, key, load))
+
+    return sources
+
+
+def lang_search_sources(
+    lang_folder: str,
+    /,
+    *,
+    serializer_format: LocalizationSerializerFormat,
+    locales: "list[Locale] | None" = None,
+) -> "list[SearchSource]":
+    # every language file written by extract_iso, keyed by its size and modification time
+    lang_sources = find_lang_sources(lang_folder, serializer_format=serializer_format, locales=locales or list(Locale))
+
+    sources = list()
+    for lang_path, locale, event_type in lang_sources:
+
+        def load(lang_path=lang_path, locale=locale):
+            return rebuild_language_file(lang_path, locale, serializer_format)
+
+        source = os.path.abspath(lang_path)
+        sources.append(SearchSource(source, event_type.to_locale_file_name(locale), locale, _path_key(lang_path), load))
+
+    return sources
+
+
+def update_search_index(
+    index_path: str,
+    /,
+    *,
+    isos: "list[str | ProjectZeroISO] | None" = None,
+    lang_folders: "list[str] | None" = None,
+    serializer_format: "LocalizationSerializerFormat | None" = None,
+    locales: "list[Locale] | None" = None,
+) -> "tuple[SearchIndex, int]":
+    # the given sources are added to the saved index, or indexed again when they changed
+    index = SearchIndex(index_path)
+
+    with ExitStack() as stack:
+        sources = list()
+        for iso in isos or []:
+            session = stack.enter_context(open_iso_session(iso))
+            sources.extend(iso_search_sources(session, locales=locales))
+
+        for lang_folder in lang_folders or []:
+            if serializer_format is None:
+                raise ValueError("language folders need a serializer format")
+            sources.extend(lang_search_sources(lang_folder, serializer_format=serializer_format, locales=locales))
+
+        num_updated = index.update(sources)
+
+    index.prune()
+    index.save()
+
+    return index, num_updated
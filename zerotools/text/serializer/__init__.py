@@ -5,6 +5,8 @@ class LocalizationSerializerFormat(enum.Enum):
     FS = "FS"
     JSON = "JSON"
     XML = "XML"
+    SQLITE = "SQLITE"
+    BINARY = "BINARY"
 
     def __eq__(self, other):
         if id(other) == id(self):
@@ -19,3 +21,11 @@ class LocalizationSerializerFormat(enum.Enum):
 LOCALIZATION_SERIALIZERS = tuple(s.value for s in LocalizationSerializerFormat)
 
 TABLE_NAME_MIN_DIGIT = 4
+
+# FS format: every folder has a .info file, the optional .index in the top folder holds all of them
+FS_INDEX_FILE = ".index"
+# small files are read and written by a pool of threads, most of the time is spent waiting for the file system
+FS_MAX_WORKERS = 16
+
+# SQLITE format: databases written with another layout are refused
+SQLITE_VERSION = 1
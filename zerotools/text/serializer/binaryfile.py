@@ -0,0 +1,54 @@
+import os
+import struct
+
+
+from zerotools.text.message.parser import InGameMessageParser
+from zerotools.text.message.table import InGameMessageTable
+
+
+BINARY_MAGIC = b"ZTTEXT01"
+
+# magic, locale, top table count
+BINARY_HEADER = struct.Struct("<8s2sI")
+# top table name size, followed by the name
+BINARY_NAME = struct.Struct("<H")
+# holds tables (1) or messages (0), entry count
+BINARY_TABLE = struct.Struct("<BI")
+# text size, encoded size, suffix size, followed by the text and the encoded bytes ending with the suffix
+BINARY_MESSAGE = struct.Struct("<IIH")
+
+
+def _serialize_table_binary(chunks: "list[bytes]", ig_msg_table: InGameMessageTable):
+    if ig_msg_table.tables:
+        chunks.append(BINARY_TABLE.pack(1, len(ig_msg_table.tables)))
+        for table in ig_msg_table.tables:
+            _serialize_table_binary(chunks, table)
+
+    else:
+        chunks.append(BINARY_TABLE.pack(0, len(ig_msg_table.messages)))
+        for message in ig_msg_table.messages:
+            # taken before the text, a lazily parsed message then gives back the bytes it was read from
+            encoded = message.encode()
+            text = message.message.encode("utf-8")
+            chunks.append(BINARY_MESSAGE.pack(len(text), len(encoded), len(message.suffix)))
+            chunks.append(text)
+            chunks.append(encoded)
+
+
+def serialize_binary(ig_msg_parser: InGameMessageParser, out_file: str):
+    if not ig_msg_parser.table_names:
+        raise RuntimeError("invalid ig_msg_parser (no table names)")
+
+    tables = list(zip(ig_msg_parser.table_names, ig_msg_parser.msg_tables.tables))
+
+    chunks = [BINARY_HEADER.pack(BINARY_MAGIC, ig_msg_parser.locale.value.encode("ascii"), len(tables))]
+    for name, table in tables:
+        name_bytes = name.encode("utf-8")
+        chunks.append(BINARY_NAME.pack(len(name_bytes)))
+        chunks.append(name_bytes)
+        _serialize_table_binary(chunks, table)
+
+    os.makedirs(os.path.dirname(out_file), exist_ok=True)
+
+    with open(out_file, "wb") as file_h:
+        file_h.write(b"".join(chunks))
@@ -1,44 +1,81 @@
 import os
 
-from zerotools.text.serializer import TABLE_NAME_MIN_DIGIT
+from concurrent.futures import ThreadPoolExecutor
+
+from zerotools.text.serializer import TABLE_NAME_MIN_DIGIT, FS_INDEX_FILE, FS_MAX_WORKERS
 from zerotools.text.message.table import InGameMessageTable
 from zerotools.text.message.parser import InGameMessageParser
 
 
-def _serialize_table_fs(ig_msg_table: InGameMessageTable, out_folder: str):
+def _join(path: str, name: str) -> str:
+    return f"{path}/{name}" if path else name
+
+
+def _collect_table_fs(
+    ig_msg_table: InGameMessageTable,
+    path: str,
+    folders: "list[tuple[str, bool, list[str]]]",
+    messages: "list[tuple[str, str]]",
+):
+    # folders are (path, holds tables, .info lines) and messages are (path, text), paths are relative to the top folder
     if ig_msg_table.tables:
         num_table_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(ig_msg_table.tables))))
-        hidden_info_file = os.path.join(out_folder, ".info")
-        os.makedirs(out_folder, exist_ok=True)
-        with open(hidden_info_file, mode="w", encoding="utf-8") as info_h:
-            for i, table in enumerate(ig_msg_table.tables):
-                name = f"{i:0{num_table_digits}d}"
-                table_folder = os.path.join(out_folder, name)
-                _serialize_table_fs(table, table_folder)
-                info_h.write(f"{i},{name}\n")
+        names = [f"{i:0{num_table_digits}d}" for i in range(len(ig_msg_table.tables))]
+        folders.append((path, True, [f"{i},{name}" for i, name in enumerate(names)]))
+        for name, table in zip(names, ig_msg_table.tables):
+            _collect_table_fs(table, _join(path, name), folders, messages)
 
     else:
-        os.makedirs(out_folder, exist_ok=True)
-        hidden_info_file = os.path.join(out_folder, ".info")
-        os.makedirs(out_folder, exist_ok=True)
-        with open(hidden_info_file, mode="w", encoding="utf-8") as info_h:
-            num_message_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(ig_msg_table.messages))))
-            for i, message in enumerate(ig_msg_table.messages):
-                name = f"{i:0{num_message_digits}d}"
-                message_file = os.path.join(out_folder, f"{name}.TXT")
-                with open(message_file, mode="w", encoding="utf-8") as file_h:
-                    file_h.write(message.message)
-                info_h.write(f"{name},{message.suffix.hex()}\n")
-
-
-def serialize_fs(ig_msg_parser: InGameMessageParser, out_folder: str):
+        num_message_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(ig_msg_table.messages))))
+        info = list()
+        for i, message in enumerate(ig_msg_table.messages):
+            name = f"{i:0{num_message_digits}d}"
+            messages.append((_join(path, f"{name}.TXT"), message.message))
+            info.append(f"{name},{message.suffix.hex()}")
+        folders.append((path, False, info))
+
+
+def _write_text(file: "tuple[str, str]"):
+    file_name, text = file
+    with open(file_name, mode="w", encoding="utf-8") as file_h:
+        file_h.write(text)
+
+
+def serialize_fs(ig_msg_parser: InGameMessageParser, out_folder: str, index: bool = False):
     if not ig_msg_parser.table_names:
         raise RuntimeError("invalid ig_msg_parser (no table names)")
 
-    os.makedirs(out_folder, exist_ok=True)
-    hidden_info_file = os.path.join(out_folder, ".info")
-    with open(hidden_info_file, mode="w", encoding="utf-8") as info_h:
-        for i, (name, table) in enumerate(zip(ig_msg_parser.table_names, ig_msg_parser.msg_tables.tables)):
-            table_folder = os.path.join(out_folder, name)
-            _serialize_table_fs(table, table_folder)
-            info_h.write(f"{i},{name}\n")
+    tables = list(zip(ig_msg_parser.table_names, ig_msg_parser.msg_tables.tables))
+
+    folders: "list[tuple[str, bool, list[str]]]" = [("", True, [f"{i},{name}" for i, (name, _) in enumerate(tables)])]
+    messages: "list[tuple[str, str]]" = list()
+    for name, table in tables:
+        _collect_table_fs(table, name, folders, messages)
+
+    # folders are listed before their children
+    for path, _, _ in folders:
+        os.makedirs(os.path.join(out_folder, path), exist_ok=True)
+
+    info_files = [os.path.join(out_folder, path, ".info") for path, _, _ in folders]
+    files = [(info_file, "".join(f"{line}\n" for line in info)) for info_file, (_, _, info) in zip(info_files, folders)]
+    files += [(os.path.join(out_folder, path), text) for path, text in messages]
+
+    index_file = os.path.join(out_folder, FS_INDEX_FILE)
+    if not index and os.path.isfile(index_file):
+        # it would not match the new files
+        os.remove(index_file)
+
+    with ThreadPoolExecutor(max_workers=FS_MAX_WORKERS) as pool:
+        # consumed so that errors are raised here
+        list(pool.map(_write_text, files))
+
+        if index:
+            # the index is every .info file at once, each one after a "/path,T,size,mtime" (tables) or
+            # "/path,M,size,mtime" (messages) line, the .info files are written first to know their size and mtime
+            stats = pool.map(os.stat, info_files)
+            index_lines = [
+                line
+                for (path, subtable, info), stat in zip(folders, stats)
+                for line in [f"/{path},{'T' if subtable else 'M'},{stat.st_size},{stat.st_mtime_ns}"] + info
+            ]
+            _write_text((index_file, "".join(f"{line}\n" for line in index_lines)))
@@ -1,7 +1,7 @@
 import os
 import json
 
-from collections import OrderedDict
+from typing import TextIO
 
 
 from zerotools.text.message.parser import InGameMessageParser
@@ -9,27 +9,53 @@ from zerotools.text.message.table import InGameMessageTable
 from zerotools.text.serializer import TABLE_NAME_MIN_DIGIT
 
 
-def _serialize_table_json(ig_msg_table: InGameMessageTable):
-    json_tables = OrderedDict()
+JSON_INDENT = 2
 
+
+def _dump(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _write_entry_json(json_fh: TextIO, name: str, fields: "list[tuple[str, str]]", level: int, first: bool):
+    # writes '"name": {fields}' laid out the way json.dump(indent=2) does, field values are already dumped
+    indent = " " * (JSON_INDENT * level)
+    json_fh.write(f'{"" if first else ","}\n{indent}{_dump(name)}: {{')
+    for n, (key, value) in enumerate(fields):
+        json_fh.write(f'{"" if n == 0 else ","}\n{indent}{" " * JSON_INDENT}{_dump(key)}: {value}')
+
+
+def _serialize_table_json(json_fh: TextIO, ig_msg_table: InGameMessageTable, level: int):
+    # the "messages" object of a table, tables are written as they are walked
+    entries = ig_msg_table.tables if ig_msg_table.tables else ig_msg_table.messages
+    if not entries:
+        json_fh.write("{}")
+        return
+
+    indent = " " * (JSON_INDENT * level)
+    num_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(entries))))
+
+    json_fh.write("{")
     if ig_msg_table.tables:
-        num_table_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(ig_msg_table.tables))))
         for i, table in enumerate(ig_msg_table.tables):
-            name = f"{i:0{num_table_digits}d}"
-            json_table = _serialize_table_json(table)
-            json_tables[name] = {"order": i, "messages": json_table}
+            _serialize_named_table_json(json_fh, f"{i:0{num_digits}d}", i, table, level + 1, i == 0)
 
     else:
-        num_message_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(ig_msg_table.messages))))
         for i, message in enumerate(ig_msg_table.messages):
-            name = f"{i:0{num_message_digits}d}"
-            json_tables[name] = {
-                "order": i,
-                "message": message.message,
-                "suffix": message.suffix.hex(),
-            }
+            fields = [("order", _dump(i)), ("message", _dump(message.message)), ("suffix", _dump(message.suffix.hex()))]
+            _write_entry_json(json_fh, f"{i:0{num_digits}d}", fields, level + 1, i == 0)
+            json_fh.write(f"\n{indent}{' ' * JSON_INDENT}}}")
+
+    json_fh.write(f"\n{indent}}}")
+
 
-    return json_tables
+def _serialize_named_table_json(
+    json_fh: TextIO, name: str, order: int, ig_msg_table: InGameMessageTable, level: int, first: bool
+):
+    indent = " " * (JSON_INDENT * level)
+    _write_entry_json(json_fh, name, [("order", _dump(order))], level, first)
+    json_fh.write(f',\n{indent}{" " * JSON_INDENT}"messages": ')
+    _serialize_table_json(json_fh, ig_msg_table, level + 1)
+    json_fh.write(f"\n{indent}}}")
 
 
 def serialize_json(ig_msg_parser: InGameMessageParser, out_file: str):
@@ -38,10 +64,14 @@ def serialize_json(ig_msg_parser: InGameMessageParser, out_file: str):
 
     os.makedirs(os.path.dirname(out_file), exist_ok=True)
 
-    json_data = OrderedDict()
+    # same output as json.dump(indent=2), without building the whole document first
     with open(out_file, mode="w", encoding="utf-8") as json_fh:
-        for i, (name, table) in enumerate(zip(ig_msg_parser.table_names, ig_msg_parser.msg_tables.tables)):
-            json_table = _serialize_table_json(table)
-            json_data[name] = {"order": i, "messages": json_table}
+        tables = list(zip(ig_msg_parser.table_names, ig_msg_parser.msg_tables.tables))
+        if not tables:
+            json_fh.write("{}")
+            return
 
-        json.dump(json_data, json_fh, indent=2, ensure_ascii=False)
+        json_fh.write("{")
+        for i, (name, table) in enumerate(tables):
+            _serialize_named_table_json(json_fh, name, i, table, 1, i == 0)
+        json_fh.write("\n}")
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import hashlib
+
+from contextlib import closing
+
+
+from zerotools.text.message.parser import InGameMessageParser
+from zerotools.text.message.table import InGameMessageTable
+from zerotools.text.serializer import TABLE_NAME_MIN_DIGIT, SQLITE_VERSION
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+
+CREATE TABLE msg_tables (
+    id INTEGER PRIMARY KEY,
+    parent INTEGER REFERENCES msg_tables (id),
+    number INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+
+CREATE TABLE messages (
+    id INTEGER PRIMARY KEY,
+    table_id INTEGER NOT NULL REFERENCES msg_tables (id),
+    number INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    message TEXT NOT NULL,
+    suffix BLOB NOT NULL,
+    encoded BLOB,
+    hash TEXT
+);
+
+-- rebuilds reuse the encoded bytes until the text or the suffix change
+CREATE TRIGGER messages_edited AFTER UPDATE OF message, suffix ON messages
+WHEN OLD.message IS NOT NEW.message OR OLD.suffix IS NOT NEW.suffix
+BEGIN
+    UPDATE messages SET encoded = NULL, hash = NULL WHERE id = NEW.id;
+END;
+"""
+
+# created once the rows are in, that is faster than keeping them up to date while inserting
+SQLITE_INDEXES = """
+CREATE UNIQUE INDEX msg_tables_parent ON msg_tables (parent, number);
+CREATE UNIQUE INDEX msg_tables_path ON msg_tables (path);
+CREATE UNIQUE INDEX messages_table ON messages (table_id, number);
+CREATE UNIQUE INDEX messages_path ON messages (path);
+CREATE INDEX messages_hash ON messages (hash);
+"""
+
+
+def _collect_table_sqlite(
+    ig_msg_table: InGameMessageTable,
+    table_id: int,
+    path: str,
+    tables: "list[tuple[int, int | None, int, str, str]]",
+    messages: "list[tuple[int, int, str, str, bytes, bytes, str]]",
+):
+    # tables are (id, parent, number, name, path), ids are given in walking order so parents come first
+    if ig_msg_table.tables:
+        num_table_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(ig_msg_table.tables))))
+        for i, table in enumerate(ig_msg_table.tables):
+            name = f"{i:0{num_table_digits}d}"
+            sub_table_id = len(tables) + 1
+            tables.append((sub_table_id, table_id, i, name, f"{path}/{name}"))
+            _collect_table_sqlite(table, sub_table_id, f"{path}/{name}", tables, messages)
+
+    else:
+        num_message_digits = max(TABLE_NAME_MIN_DIGIT, len(str(len(ig_msg_table.messages))))
+        for i, message in enumerate(ig_msg_table.messages):
+            # taken before the text, a lazily parsed message then gives back the bytes it was read from
+            encoded = message.encode()
+            path_name = f"{path}/{i:0{num_message_digits}d}"
+            digest = hashlib.sha1(encoded).hexdigest()
+            messages.append((table_id, i, path_name, message.message, message.suffix, encoded, digest))
+
+
+def serialize_sqlite(ig_msg_parser: InGameMessageParser, out_file: str):
+    if not ig_msg_parser.table_names:
+        raise RuntimeError("invalid ig_msg_parser (no table names)")
+
+    tables: "list[tuple[int, int | None, int, str, str]]" = list()
+    messages: "list[tuple[int, int, str, str, bytes, bytes, str]]" = list()
+    for i, (name, table) in enumerate(zip(ig_msg_parser.table_names, ig_msg_parser.msg_tables.tables)):
+        table_id = len(tables) + 1
+        tables.append((table_id, None, i, name, name))
+        _collect_table_sqlite(table, table_id, name, tables, messages)
+
+    info = [
+        ("version", str(SQLITE_VERSION)),
+        ("locale", ig_msg_parser.locale.value),
+        ("file", os.path.splitext(os.path.basename(out_file))[0]),
+    ]
+
+    os.makedirs(os.path.dirname(out_file), exist_ok=True)
+
+    # a new database every time, like the other formats overwrite their file
+    if os.path.exists(out_file):
+        os.remove(out_file)
+
+    with closing(sqlite3.connect(out_file)) as connection:
+        connection.executescript(SQLITE_SCHEMA)
+
+        # one transaction for all the rows
+        with connection:
+            connection.executemany("INSERT INTO info (key, value) VALUES (?, ?)", info)
+            connection.executemany(
+                "INSERT INTO msg_tables (id, parent, number, name, path) VALUES (?, ?, ?, ?, ?)", tables
+            )
+            connection.executemany(
+                "INSERT INTO messages (table_id, number, path, message, suffix, encoded, hash)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                messages,
+            )
+
+        connection.executescript(SQLITE_INDEXES)
@@ -5,3 +5,4 @@ from .japanese import table_jp
 LASTCH = 0xD1
 COLOR = 0xFD
 NEWLINE = 0xFE
+TERMINATOR = 0xFF
@@ -1,9 +1,28 @@
 import os
+import errno
 
 from typing import BinaryIO
 
 from pycdlib.pycdlibio import PyCdlibIO
 
+COPY_BLOCK_SIZE = 2**20
+
+# one shared block of zeros for all padding writes
+ZERO_BLOCK = bytes(COPY_BLOCK_SIZE)
+ZERO_VIEW = memoryview(ZERO_BLOCK)
+
+# errors meaning the kernel cannot copy between these descriptors, as opposed to real I/O errors
+KERNEL_COPY_FALLBACK_ERRNO = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EBADF,
+    errno.EOPNOTSUPP,
+    errno.ENOTSOCK,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+    getattr(errno, "ETXTBSY", errno.EINVAL),
+}
+
 
 def read_file(file_h: "BinaryIO | PyCdlibIO"):
     pos = file_h.tell()
@@ -13,9 +32,146 @@ def read_file(file_h: "BinaryIO | PyCdlibIO"):
     return file_bin
 
 
-def copy_file_fh(src_fh: BinaryIO, dst_fh: BinaryIO, /, *, block_size: int = 2**20):
+def copy_file_fh(src_fh: BinaryIO, dst_fh: BinaryIO, /, *, block_size: int = COPY_BLOCK_SIZE):
     src_fh.seek(0, os.SEEK_SET)
     data = True
     while data:
         data = src_fh.read(block_size)
         dst_fh.write(data)
+
+
+def copy_range_pread(src_fd: int, dst_fh: BinaryIO, offset: int, size: int, /, *, block_size: int = COPY_BLOCK_SIZE):
+    while size > 0:
+        data = pread_fd(src_fd, min(block_size, size), offset)
+        if not data:
+            raise EOFError(f"unexpected end of file at offset {offset}")
+        dst_fh.write(data)
+        offset += len(data)
+        size -= len(data)
+
+
+def pread_fd(fd: int, size: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def pwrite_fd(fd: int, data: "bytes | memoryview", offset: int):
+    view = memoryview(data)
+    while view:
+        if hasattr(os, "pwrite"):
+            written = os.pwrite(fd, view, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+
+def _copy_fd_range_kernel(src_fd: int, dst_fd: int, src_offset: int, dst_offset: int, size: int) -> int:
+    # returns the number of bytes copied before the kernel calls (if any) gave up
+    copied = 0
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < size:
+                count = os.copy_file_range(src_fd, dst_fd, size - copied, src_offset + copied, dst_offset + copied)
+                if count == 0:
+                    raise EOFError(f"unexpected end of file at offset {src_offset + copied}")
+                copied += count
+            return copied
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_FALLBACK_ERRNO:
+                raise
+
+    if hasattr(os, "sendfile"):
+        try:
+            os.lseek(dst_fd, dst_offset + copied, os.SEEK_SET)
+            while copied < size:
+                count = os.sendfile(dst_fd, src_fd, src_offset + copied, size - copied)
+                if count == 0:
+                    raise EOFError(f"unexpected end of file at offset {src_offset + copied}")
+                copied += count
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_FALLBACK_ERRNO:
+                raise
+
+    return copied
+
+
+def copy_fd_range(
+    src_fd: int, dst_fd: int, src_offset: int, dst_offset: int, size: int, /, *, block_size: int = COPY_BLOCK_SIZE
+):
+    copied = _copy_fd_range_kernel(src_fd, dst_fd, src_offset, dst_offset, size)
+
+    # plain user-space copy for whatever the kernel could not handle
+    while copied < size:
+        data = pread_fd(src_fd, min(block_size, size - copied), src_offset + copied)
+        if not data:
+            raise EOFError(f"unexpected end of file at offset {src_offset + copied}")
+        pwrite_fd(dst_fd, data, dst_offset + copied)
+        copied += len(data)
+
+
+def move_fd_range(fd: int, src_offset: int, dst_offset: int, size: int, /, *, block_size: int = COPY_BLOCK_SIZE):
+    if src_offset == dst_offset or size <= 0:
+        return
+
+    distance = abs(dst_offset - src_offset)
+
+    # disjoint ranges are a plain copy, the kernel can do it in one go
+    if distance >= size:
+        copy_fd_range(fd, fd, src_offset, dst_offset, size, block_size=block_size)
+        return
+
+    # like memmove, copy from the end when moving forward so overlapping data is read before being overwritten.
+    # kernel copies need disjoint ranges, so they only go block by block when the move is at least a block long.
+    # shorter moves read each block into memory before writing it, that is always safe
+    kernel = distance >= block_size
+    position = size if dst_offset > src_offset else 0
+    while size > 0:
+        block = min(block_size, size)
+        if dst_offset > src_offset:
+            position -= block
+        if kernel:
+            copy_fd_range(fd, fd, src_offset + position, dst_offset + position, block)
+        else:
+            data = pread_fd(fd, block, src_offset + position)
+            if len(data) != block:
+                raise EOFError(f"unexpected end of file at offset {src_offset + position + len(data)}")
+            pwrite_fd(fd, data, dst_offset + position)
+        if dst_offset < src_offset:
+            position += block
+        size -= block
+
+
+def write_fh_to_fd(src_fh: BinaryIO, dst_fd: int, dst_offset: int, /, *, block_size: int = COPY_BLOCK_SIZE) -> int:
+    src_fh.seek(0, os.SEEK_SET)
+    written = 0
+    data = src_fh.read(block_size)
+    while data:
+        pwrite_fd(dst_fd, data, dst_offset + written)
+        written += len(data)
+        data = src_fh.read(block_size)
+    return written
+
+
+def zero_fill_fd(fd: int, offset: int, size: int):
+    while size > 0:
+        block = min(len(ZERO_BLOCK), size)
+        pwrite_fd(fd, ZERO_VIEW[:block], offset)
+        offset += block
+        size -= block
+
+
+def preallocate_fd(fd: int, size: int):
+    # reserve the whole output at once, a sparse file is fine when the filesystem cannot allocate
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass
+    if os.fstat(fd).st_size < size:
+        os.ftruncate(fd, size)
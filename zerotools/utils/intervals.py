@@ -0,0 +1,62 @@
+import bisect
+
+
+class IntervalSet:
+    # sorted, disjoint [start, end) intervals, merged as they are added
+    def __init__(self):
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+
+    def add(self, start: int, end: int) -> "list[tuple[int, int]]":
+        # returns the parts of [start, end) that were already in the set
+        if start >= end:
+            return []
+
+        # intervals touching [start, end) are merged with it
+        lo = bisect.bisect_left(self.ends, start)
+        hi = bisect.bisect_right(self.starts, end)
+
+        overlaps = list()
+        for n in range(lo, hi):
+            overlap_start, overlap_end = max(start, self.starts[n]), min(end, self.ends[n])
+            if overlap_start < overlap_end:
+                overlaps.append((overlap_start, overlap_end))
+
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+        return overlaps
+
+    def gaps(self, start: int, end: int) -> "list[tuple[int, int]]":
+        gaps = list()
+        cursor = start
+        for interval_start, interval_end in self:
+            if interval_end <= cursor:
+                continue
+            if interval_start >= end:
+                break
+            if interval_start > cursor:
+                gaps.append((cursor, interval_start))
+            cursor = interval_end
+
+        if cursor < end:
+            gaps.append((cursor, end))
+
+        return gaps
+
+    @property
+    def total(self) -> int:
+        return sum(end - start for start, end in self)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}{list(self)}"
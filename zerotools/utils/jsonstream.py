@@ -0,0 +1,142 @@
+import re
+import json
+
+from typing import Any, Generator, TextIO
+
+
+READ_SIZE = 64 * 1024
+
+re_space = re.compile(r"[ \t\n\r]*")
+re_scalar = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null")
+
+LITERALS = {"true": True, "false": False, "null": None}
+PUNCTUATION = "{}[]:,"
+
+
+class JSONTokenizer:
+    # reads the file a chunk at a time, tokens are punctuation characters, strings and scalars
+    def __init__(self, file_h: TextIO, read_size: int = READ_SIZE):
+        self.file_h = file_h
+        self.read_size = read_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = 0) -> bool:
+        if self.eof:
+            return False
+
+        data = self.file_h.read(max(self.read_size, size))
+        if not data:
+            self.eof = True
+            return False
+
+        self.buffer = self.buffer[self.position :] + data
+        self.position = 0
+        return True
+
+    def _skip_space(self) -> bool:
+        while True:
+            self.position = re_space.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return True
+            if not self._fill():
+                return False
+
+    def _string(self) -> str:
+        while True:
+            try:
+                value, self.position = json.decoder.scanstring(self.buffer, self.position + 1)
+                return value
+            except json.JSONDecodeError as e:
+                # the string may just go on in the next chunk
+                if not self._fill():
+                    raise RuntimeError(f"invalid json string: {e.msg}")
+
+    def _scalar(self) -> Any:
+        # a scalar may be cut by the end of the chunk (like "tr|ue" or "1.|5", "1e|-5" needs two characters to go on)
+        match = re_scalar.match(self.buffer, self.position)
+        while (match is None or len(self.buffer) - match.end() < 3) and self._fill():
+            match = re_scalar.match(self.buffer, self.position)
+
+        if match is None:
+            raise RuntimeError(f"invalid json value near {self.buffer[self.position : self.position + 16]!r}")
+
+        self.position = match.end()
+        text = match.group()
+        if text in LITERALS:
+            return LITERALS[text]
+        if "." in text or "e" in text or "E" in text:
+            return float(text)
+        return int(text)
+
+    def value(self) -> Any:
+        # the next whole value, objects and arrays are read until complete and decoded by the json module
+        if not self._skip_space():
+            raise RuntimeError("unexpected end of json file")
+
+        ch = self.buffer[self.position]
+        if ch == '"':
+            return self._string()
+        if ch not in "{[":
+            return self._scalar()
+
+        while True:
+            try:
+                value, self.position = self.decoder.raw_decode(self.buffer, self.position)
+                return value
+            except json.JSONDecodeError as e:
+                # read as much again, so that a big value is not decoded over and over
+                if not self._fill(len(self.buffer)):
+                    raise RuntimeError(f"invalid json value: {e.msg}")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> "tuple[str, Any]":
+        if not self._skip_space():
+            raise StopIteration
+
+        ch = self.buffer[self.position]
+        if ch in PUNCTUATION:
+            self.position += 1
+            return ch, None
+        if ch == '"':
+            return "string", self._string()
+        return "scalar", self._scalar()
+
+
+def _next_token(tokens: JSONTokenizer) -> "tuple[str, Any]":
+    token = next(tokens, None)
+    if token is None:
+        raise RuntimeError("unexpected end of json file")
+    return token
+
+
+def iter_json_items(file_h: TextIO, read_size: int = READ_SIZE) -> Generator["tuple[str, Any]", None, None]:
+    # the items of a json object in file order, only the value being read is held in memory
+    tokens = JSONTokenizer(file_h, read_size)
+
+    if _next_token(tokens)[0] != "{":
+        raise RuntimeError("json file is not an object")
+
+    token = _next_token(tokens)
+    while token[0] != "}":
+        if token[0] != "string":
+            raise RuntimeError("json object keys must be strings")
+        if _next_token(tokens)[0] != ":":
+            raise RuntimeError("missing ':' in json object")
+
+        yield token[1], tokens.value()
+
+        token = _next_token(tokens)
+        if token[0] == ",":
+            token = _next_token(tokens)
+            if token[0] == "}":
+                raise RuntimeError("trailing ',' in json object")
+        elif token[0] != "}":
+            raise RuntimeError("missing ',' in json object")
+
+    if next(tokens, None) is not None:
+        raise RuntimeError("extra data after the json document")
@@ -0,0 +1,39 @@
+def levenshtein(a: str, b: str) -> int:
+    # bit-parallel edit distance (Myers, Hyyro), one big int operation per character of the longest string
+    if len(a) < len(b):
+        a, b = b, a
+
+    m = len(b)
+    if m == 0:
+        return len(a)
+
+    # bit i of peq[ch] is set where b[i] == ch
+    peq: "dict[str, int]" = dict()
+    for i, ch in enumerate(b):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv = full, 0
+    distance = m
+
+    # ph is negative after ~ (infinite leading ones), only pv needs masking to keep the numbers small
+    for ch in a:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+
+        if ph & last:
+            distance += 1
+        elif mh & last:
+            distance -= 1
+
+        # the first row of the distance matrix grows by one at each step
+        ph = (ph << 1) | 1
+        mh = mh << 1
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+
+    return distance
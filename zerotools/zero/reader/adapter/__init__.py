@@ -1,2 +1,2 @@
 from .filesystem import FilesystemAdapter
-from .iso import ISOAdapter
+from .iso import ISOAdapter, CachedISOAdapter
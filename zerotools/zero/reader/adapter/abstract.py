@@ -23,6 +23,10 @@ class AbstractAdapter(ABC):
     def find_file(self, file_name: str) -> str:
         ...
 
+    @abstractmethod
+    def get_img_bd_extent(self) -> "tuple[str, int]":
+        ...
+
     @contextmanager
     @abstractmethod
     def open(self, file_name: str) -> BytesIO:
@@ -47,3 +51,6 @@ class AbstractAdapter(ABC):
 
         if not self.elf_path or not self.img_hd_path or not self.img_bd_path:
             raise RuntimeError('path does not point to valid "Zero / Project Zero / Fatal Frame" data')
+
+    def close(self):
+        return
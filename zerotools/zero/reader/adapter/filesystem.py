@@ -20,6 +20,11 @@ class FilesystemAdapter(AbstractAdapter):
             raise RuntimeError("uninitialized")
         return os.stat(self.img_bd_path).st_size
 
+    def get_img_bd_extent(self) -> "tuple[str, int]":
+        if not self.img_bd_path:
+            raise RuntimeError("uninitialized")
+        return self.img_bd_path, 0
+
     def find_file(self, file_name: str) -> "str | None":
         all_files = next(os.walk(self.load_path))[2]
         file_name_upper = file_name.upper()
@@ -1 +1,2 @@
 from .iso import ISOAdapter
+from .cached import CachedISOAdapter
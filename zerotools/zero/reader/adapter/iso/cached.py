@@ -0,0 +1,57 @@
+from typing import BinaryIO, Generator
+from contextlib import contextmanager
+
+from ..abstract import AbstractAdapter
+from ...cache import TOCCache
+from zerotools.utils.subfile import SubFile
+
+
+class CachedISOAdapter(AbstractAdapter):
+    def __init__(self, load_path: str, toc_cache: TOCCache):
+        super().__init__(load_path)
+
+        self.toc_cache = toc_cache
+
+        # name to iso name (e.g. README.TXT -> README.TXT;1)
+        self.files = {file_name.rsplit(";", 1)[0]: file_name for file_name in toc_cache.files}
+
+    def test_file(self, file_path: str) -> bool:
+        return self.find_file(file_path) is not None
+
+    def read_file(self, file_name: str, size=-1, offset=0) -> "bytes | None":
+        try:
+            with self.open(file_name) as file_h:
+                file_h.seek(offset)
+                return file_h.read(size)
+        except FileNotFoundError:
+            return None
+
+    def get_img_bd_size(self) -> int:
+        if not self.img_bd_path:
+            raise RuntimeError("uninitialized")
+        return self.toc_cache.files[self.img_bd_path][1]
+
+    def get_img_bd_extent(self) -> "tuple[str, int]":
+        if not self.img_bd_path:
+            raise RuntimeError("uninitialized")
+        return self.load_path, self.toc_cache.files[self.img_bd_path][0]
+
+    def find_file(self, file_name: str) -> "str | None":
+        upper_name = file_name.upper()
+        if upper_name in self.files:
+            return self.files[upper_name]
+        elif file_name in self.toc_cache.files:
+            return file_name
+        return None
+
+    @contextmanager
+    def open(self, file_name: str) -> Generator[BinaryIO, None, None]:
+        file_name_ = self.find_file(file_name)
+
+        if not file_name_:
+            raise FileNotFoundError(file_name)
+
+        offset, size = self.toc_cache.files[file_name_]
+
+        with open(self.load_path, "rb") as file_h:
+            yield SubFile(file_h, offset=offset, size=size)
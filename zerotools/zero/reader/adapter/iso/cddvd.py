@@ -5,9 +5,12 @@ from contextlib import contextmanager
 
 
 class CDDVD:
-    def __init__(self, iso_path):
-        self.iso = pycdlib.PyCdlib()
-        self.iso.open(iso_path, mode="rb")
+    def __init__(self, iso_path, iso: "pycdlib.PyCdlib | None" = None):
+        # an already open iso is borrowed and left open on close
+        self._owns_iso = iso is None
+        self.iso = iso if iso is not None else pycdlib.PyCdlib()
+        if self._owns_iso:
+            self.iso.open(iso_path, mode="rb")
         self.iso9660_facade = self.iso.get_iso9660_facade()
 
         # name to iso name (e.g. README.TXT -> README.TXT;1)
@@ -17,7 +20,11 @@ class CDDVD:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.iso.close()
+        self.close()
+
+    def close(self):
+        if self._owns_iso:
+            self.iso.close()
 
     def find_file(self, file_name: str):
         upper_name = file_name.upper()
@@ -54,5 +61,13 @@ class CDDVD:
 
         return self.iso9660_facade.get_record(f"/{file_name_}").get_data_length()
 
+    def get_file_offset(self, file_name: str):
+        file_name_ = self.find_file(file_name)
+
+        if file_name_ is None:
+            return None
+
+        return self.iso9660_facade.get_record(f"/{file_name_}").fp_offset
+
     def __delete__(self, instance):
-        self.iso.close()
+        self.close()
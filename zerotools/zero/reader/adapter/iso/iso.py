@@ -1,3 +1,5 @@
+import pycdlib
+
 from typing import BinaryIO, Generator
 from contextlib import contextmanager
 from pycdlib.pycdlibexception import PyCdlibInvalidISO
@@ -7,11 +9,11 @@ from ..abstract import AbstractAdapter
 
 
 class ISOAdapter(AbstractAdapter):
-    def __init__(self, load_path: str):
+    def __init__(self, load_path: str, iso: "pycdlib.PyCdlib | None" = None):
         super().__init__(load_path)
 
         try:
-            self.iso = CDDVD(load_path)
+            self.iso = CDDVD(load_path, iso)
         except (IsADirectoryError, PermissionError, FileNotFoundError, PyCdlibInvalidISO):
             raise RuntimeError("cannot open iso")
 
@@ -26,6 +28,14 @@ class ISOAdapter(AbstractAdapter):
             raise RuntimeError("uninitialized")
         return self.iso.get_file_size(self.img_bd_path)
 
+    def get_img_bd_extent(self) -> "tuple[str, int]":
+        if not self.img_bd_path:
+            raise RuntimeError("uninitialized")
+        img_bd_offset = self.iso.get_file_offset(self.img_bd_path)
+        if img_bd_offset is None:
+            raise RuntimeError("cannot get IMG_BD.BIN offset")
+        return self.load_path, img_bd_offset
+
     def find_file(self, file_name: str) -> "str | None":
         return self.iso.find_file(file_name)
 
@@ -33,3 +43,6 @@ class ISOAdapter(AbstractAdapter):
     def open(self, file_name: str) -> Generator[BinaryIO, None, None]:
         with self.iso.open(file_name) as file_h:
             yield file_h
+
+    def close(self):
+        self.iso.close()
@@ -0,0 +1,87 @@
+import os
+import json
+import hashlib
+
+from dataclasses import dataclass, asdict
+
+from .entry import TOCEntry
+
+
+TOC_CACHE_VERSION = 2
+TOC_CACHE_SUFFIX = ".ztoc.json"
+
+FINGERPRINT_SAMPLES = 16
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+
+
+@dataclass
+class TOCCache:
+    fingerprint: "list[int | str]"
+    # iso file name (e.g. IMG_BD.BIN;1) -> (fp_offset, size)
+    files: "dict[str, list[int]]"
+    elf_path: str
+    img_hd_path: str
+    img_bd_path: str
+    # (name, number, offset, size) for each IMG_BD entry
+    toc: "list[list]"
+    table_names: "list[str] | None"
+    locale: str
+    elf_name: str
+    version: int = TOC_CACHE_VERSION
+
+    def make_toc_entry_list(self) -> "list[TOCEntry]":
+        return [TOCEntry(name, number, offset, size) for name, number, offset, size in self.toc]
+
+
+def toc_cache_path(iso_path: str) -> str:
+    return iso_path + TOC_CACHE_SUFFIX
+
+
+def fingerprint_iso(iso_path: str) -> "list[int | str]":
+    stat = os.stat(iso_path)
+    digest = hashlib.sha1()
+
+    # hash a few evenly spaced samples rather than the whole multi-GB image
+    with open(iso_path, "rb") as file_h:
+        last_sample = max(0, stat.st_size - FINGERPRINT_SAMPLE_SIZE)
+        for n in range(FINGERPRINT_SAMPLES):
+            file_h.seek(last_sample * n // (FINGERPRINT_SAMPLES - 1), os.SEEK_SET)
+            digest.update(file_h.read(FINGERPRINT_SAMPLE_SIZE))
+
+    return [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+
+
+def load_toc_cache(iso_path: str) -> "TOCCache | None":
+    try:
+        with open(toc_cache_path(iso_path), mode="r", encoding="utf-8") as file_h:
+            toc_cache = TOCCache(**json.load(file_h))
+    except (OSError, ValueError, TypeError):
+        return None
+
+    if toc_cache.version != TOC_CACHE_VERSION or toc_cache.fingerprint != fingerprint_iso(iso_path):
+        return None
+
+    return toc_cache
+
+
+def save_toc_cache(iso_path: str, toc_cache: TOCCache):
+    cache_path = toc_cache_path(iso_path)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+
+    # the cache is only an optimization, a read-only location must not be an error
+    try:
+        with open(tmp_path, mode="w", encoding="utf-8") as file_h:
+            json.dump(asdict(toc_cache), file_h)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def invalidate_toc_cache(iso_path: str):
+    try:
+        os.remove(toc_cache_path(iso_path))
+    except OSError:
+        pass
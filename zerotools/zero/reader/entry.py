@@ -7,7 +7,6 @@ class TOCEntry:
     number: int
     offset: int = 0
     size: int = -1
-    max_size = -1
 
 
 @dataclass
@@ -1,14 +1,21 @@
 import os
 import re
+import mmap
 import struct
+import pycdlib
 
 from typing import BinaryIO, Generator, cast
 from contextlib import contextmanager
 
+from io import BytesIO
+
+from .cache import TOCCache, load_toc_cache, save_toc_cache, fingerprint_iso
 from .entry import TOCEntry, FileEntry
-from .adapter import FilesystemAdapter, ISOAdapter
+from .adapter import FilesystemAdapter, ISOAdapter, CachedISOAdapter
 from ...utils.iso import ISO_SECTOR_SIZE
 from zerotools.utils.subfile import SubFile
+from zerotools.text.message.locale import Locale
+from zerotools.elf.tables.igmessage import get_ingame_message_table_names_from_elf
 
 
 def is_iso_file(file_path):
@@ -18,11 +25,24 @@ def is_iso_file(file_path):
 class PJZReader:
     re_dat_entry = re.compile(r"([A-Z0-9_]+)_([A-Z0-9]+):([0-9]+)")
 
-    def __init__(self, load_path):
+    def __init__(
+        self, load_path, /, *, mapped: bool = False, use_cache: bool = True, iso: "pycdlib.PyCdlib | None" = None
+    ):
         self.load_path = load_path
 
-        if is_iso_file(load_path):
-            self.adapter = ISOAdapter(self.load_path)
+        self._img_bd_map: "mmap.mmap | None" = None
+        self._img_bd_map_offset = 0
+        self._img_bd_view: "memoryview | None" = None
+
+        self.toc_cache: "TOCCache | None" = None
+
+        if is_iso_file(load_path) and use_cache:
+            self.toc_cache = load_toc_cache(load_path)
+
+        if self.toc_cache is not None:
+            self.adapter = CachedISOAdapter(self.load_path, self.toc_cache)
+        elif is_iso_file(load_path):
+            self.adapter = ISOAdapter(self.load_path, iso)
         elif os.path.isdir(load_path):
             self.adapter = FilesystemAdapter(self.load_path)
         else:
@@ -30,7 +50,10 @@ class PJZReader:
 
         self.adapter.setup()
 
-        toc_entry_list = self.prepare_toc_and_entries()
+        if self.toc_cache is not None:
+            toc_entry_list = self.toc_cache.make_toc_entry_list()
+        else:
+            toc_entry_list = self.prepare_toc_and_entries()
 
         if toc_entry_list is None:
             raise RuntimeError("cannot prepare toc and entries")
@@ -39,6 +62,72 @@ class PJZReader:
 
         self.file_name_index = self.make_file_name_index()
 
+        if use_cache and self.toc_cache is None and isinstance(self.adapter, ISOAdapter):
+            self.toc_cache = self.make_toc_cache()
+            save_toc_cache(self.load_path, self.toc_cache)
+
+        if mapped:
+            self.map_img_bd()
+
+    @property
+    def mapped(self) -> bool:
+        return self._img_bd_view is not None
+
+    def map_img_bd(self):
+        if self._img_bd_view is not None:
+            return
+
+        img_bd_size = self.adapter.get_img_bd_size()
+
+        if not img_bd_size:
+            raise RuntimeError("cannot map empty IMG_BD.BIN")
+
+        host_path, img_bd_offset = self.adapter.get_img_bd_extent()
+
+        # mmap offsets must be a multiple of the allocation granularity
+        map_offset = img_bd_offset - img_bd_offset % mmap.ALLOCATIONGRANULARITY
+        self._img_bd_map_offset = img_bd_offset - map_offset
+
+        with open(host_path, "rb") as file_h:
+            self._img_bd_map = mmap.mmap(
+                file_h.fileno(), self._img_bd_map_offset + img_bd_size, access=mmap.ACCESS_READ, offset=map_offset
+            )
+
+        self._img_bd_view = memoryview(self._img_bd_map)[self._img_bd_map_offset :]
+
+    def view(self, file_name) -> memoryview:
+        if self._img_bd_view is None:
+            raise RuntimeError("IMG_BD.BIN is not mapped")
+
+        toc_entry = self.find_entry(file_name)
+
+        if toc_entry is None:
+            raise RuntimeError(f"file not found ({file_name})")
+
+        return self._img_bd_view[toc_entry.offset : toc_entry.offset + toc_entry.size]
+
+    def close(self):
+        if self._img_bd_view is not None:
+            self._img_bd_view.release()
+            self._img_bd_view = None
+
+        if self._img_bd_map is not None:
+            try:
+                self._img_bd_map.close()
+            except BufferError:
+                # views taken with view() are still alive (e.g. in lazily parsed messages), the map is only unmapped
+                # once the last of them is gone
+                pass
+            self._img_bd_map = None
+
+        self.adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def parse_cd_file_dat(self, elf_path):
         elf_bin = self.adapter.read_file(elf_path)
 
@@ -130,6 +219,9 @@ class PJZReader:
         if size == -1 or size > bytes_left:
             size = bytes_left
 
+        if self._img_bd_view is not None:
+            return self._img_bd_view[toc_entry.offset + offset : toc_entry.offset + offset + size].tobytes()
+
         return self.adapter.read_file(self.adapter.img_bd_path, size, toc_entry.offset + offset)
 
     @contextmanager
@@ -142,6 +234,10 @@ class PJZReader:
         if toc_entry is None:
             raise RuntimeError(f"file not found ({file_name})")
 
+        if self._img_bd_map is not None:
+            yield SubFile(self._img_bd_map, offset=self._img_bd_map_offset + toc_entry.offset, size=toc_entry.size)
+            return
+
         with self.adapter.open(self.adapter.img_bd_path) as file_h:
             yield SubFile(file_h, offset=toc_entry.offset, size=toc_entry.size)
 
@@ -167,20 +263,40 @@ class PJZReader:
         if not self.validate_toc(toc_entry_list, file_entry_list) or not self.validate_image_bd_size(file_entry_list):
             raise RuntimeError("wrong format")
 
-        img_bd_size = self.adapter.get_img_bd_size()
-
-        if img_bd_size is None:
-            raise RuntimeError("cannot get IMG_BD.BIN file size")
-
-        next_offsets = [file_entry.offset for file_entry in file_entry_list[1:]] + [img_bd_size]
-
-        for toc_entry, file_entry, next_offset in zip(toc_entry_list, file_entry_list, next_offsets):
+        for toc_entry, file_entry in zip(toc_entry_list, file_entry_list):
             toc_entry.offset = file_entry.offset
             toc_entry.size = file_entry.size
-            toc_entry.max_size = next_offset - file_entry.offset
 
         return toc_entry_list
 
+    def make_toc_cache(self) -> TOCCache:
+        if not isinstance(self.adapter, ISOAdapter):
+            raise RuntimeError("toc cache is only available for iso files")
+
+        if not self.adapter.elf_path or not self.adapter.img_hd_path or not self.adapter.img_bd_path:
+            raise RuntimeError("adapter uninitialized")
+
+        iso_files = (self.adapter.elf_path, self.adapter.img_hd_path, self.adapter.img_bd_path)
+        files = {
+            file_name: [self.adapter.iso.get_file_offset(file_name), self.adapter.iso.get_file_size(file_name)]
+            for file_name in iso_files
+        }
+
+        table_names = get_ingame_message_table_names_from_elf(BytesIO(self.adapter.read_file(self.adapter.elf_path)))
+        locale, elf_name = Locale.from_elf_path(self.adapter.elf_path)
+
+        return TOCCache(
+            fingerprint=fingerprint_iso(self.load_path),
+            files=files,
+            elf_path=self.adapter.elf_path,
+            img_hd_path=self.adapter.img_hd_path,
+            img_bd_path=self.adapter.img_bd_path,
+            toc=[[e.name, e.number, e.offset, e.size] for e in self.toc_entry_list],
+            table_names=table_names,
+            locale=locale.name,
+            elf_name=elf_name,
+        )
+
     def make_file_name_index(self) -> dict[str, TOCEntry]:
         return {entry.name: entry for entry in self.toc_entry_list}
 
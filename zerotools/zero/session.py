@@ -0,0 +1,208 @@
+import io
+import pycdlib
+
+from typing import BinaryIO, Generator
+from contextlib import contextmanager
+from pycdlib.dr import DirectoryRecord
+
+from .names import IMG_HD, IMG_BD
+from .reader.entry import TOCEntry
+from .reader.cache import TOCCache, load_toc_cache, invalidate_toc_cache
+from .reader.pjzreader import PJZReader, is_iso_file
+from ..utils.iso import check_path, check_elf_path
+from ..text.message.locale import Locale
+from ..elf.tables.filename import get_file_names_from_elf
+from ..elf.tables.igmessage import get_ingame_message_table_names_from_elf
+
+
+class ProjectZeroISO:
+    def __init__(self, iso_path: str, /, *, use_cache: bool = True):
+        if not is_iso_file(iso_path):
+            raise ValueError("iso_path must be an iso file")
+
+        self.iso_path = iso_path
+        self.use_cache = use_cache
+
+        self._iso: "pycdlib.PyCdlib | None" = None
+        self._paths: dict[str, "str | None"] = {}
+        self._records: dict[str, DirectoryRecord] = {}
+        self._reader: "PJZReader | None" = None
+        self._elf_bin: "bytes | None" = None
+        self._file_list: "list[str] | None" = None
+        self._table_names: "tuple[list[str] | None, Locale, str] | None" = None
+        # sidecar read once while no reader is open, a miss is remembered too
+        self._toc_cache: "TOCCache | None" = None
+        self._toc_cache_loaded = False
+
+    @property
+    def iso(self) -> pycdlib.PyCdlib:
+        if self._iso is None:
+            iso = pycdlib.PyCdlib()
+            iso.open(self.iso_path, mode="rb")
+            self._iso = iso
+        return self._iso
+
+    @property
+    def reader(self) -> PJZReader:
+        if self._reader is None:
+            # share the pycdlib facade with the reader, unless a warm toc cache makes it unnecessary
+            iso = self._iso
+            if iso is None and self._load_toc_cache() is None:
+                iso = self.iso
+            self._reader = PJZReader(self.iso_path, mapped=True, use_cache=self.use_cache, iso=iso)
+        return self._reader
+
+    def _load_toc_cache(self) -> "TOCCache | None":
+        if self._reader is not None:
+            return self._reader.toc_cache
+        if not self._toc_cache_loaded:
+            self._toc_cache = load_toc_cache(self.iso_path) if self.use_cache else None
+            self._toc_cache_loaded = True
+        return self._toc_cache
+
+    def _cached_extent(self, iso_path: str) -> "list[int] | None":
+        toc_cache = self._load_toc_cache()
+        if toc_cache is None:
+            return None
+        return toc_cache.files.get(iso_path.lstrip("/"))
+
+    def check_path(self, iso_path: str) -> "str | None":
+        if self._cached_extent(iso_path) is not None:
+            return iso_path
+        if iso_path not in self._paths:
+            self._paths[iso_path] = check_path(self.iso, iso_path)
+        return self._paths[iso_path]
+
+    @property
+    def elf_path(self) -> "str | None":
+        toc_cache = self._load_toc_cache()
+        if toc_cache is not None:
+            return f"/{toc_cache.elf_path}"
+        if "elf" not in self._paths:
+            self._paths["elf"] = check_elf_path(self.iso)
+        return self._paths["elf"]
+
+    @property
+    def img_hd_path(self) -> "str | None":
+        return self.check_path(f"/{IMG_HD};1")
+
+    @property
+    def img_bd_path(self) -> "str | None":
+        return self.check_path(f"/{IMG_BD};1")
+
+    def get_record(self, iso_path: str) -> DirectoryRecord:
+        if iso_path not in self._records:
+            self._records[iso_path] = self.iso.get_record(iso_path=iso_path)
+        return self._records[iso_path]
+
+    def get_file_offset(self, iso_path: str) -> int:
+        extent = self._cached_extent(iso_path)
+        if extent is not None:
+            return extent[0]
+        return self.get_record(iso_path).fp_offset
+
+    def get_file_size(self, iso_path: str) -> int:
+        extent = self._cached_extent(iso_path)
+        if extent is not None:
+            return extent[1]
+        return self.get_record(iso_path).get_data_length()
+
+    def check_paths(self) -> "tuple[str, str, str]":
+        elf_path, img_hd_path, img_bd_path = self.elf_path, self.img_hd_path, self.img_bd_path
+
+        if not elf_path or not img_hd_path or not img_bd_path:
+            raise RuntimeError("cannot find elf, img_hd or img_bd in iso")
+
+        return elf_path, img_hd_path, img_bd_path
+
+    @property
+    def elf_bin(self) -> bytes:
+        if self._elf_bin is None:
+            elf_path = self.elf_path
+            if not elf_path:
+                raise RuntimeError("invalid elf path")
+            with self.iso.open_file_from_iso(iso_path=elf_path) as elf_fh:
+                self._elf_bin = elf_fh.read()
+        return self._elf_bin
+
+    @property
+    def toc_entry_list(self) -> "list[TOCEntry]":
+        return sorted(self.reader.toc_entry_list, key=lambda entry: entry.number)
+
+    @property
+    def file_list(self) -> "list[str]":
+        if self._file_list is None:
+            toc_cache = self._load_toc_cache()
+            if toc_cache is not None:
+                file_list = [name for name, number, *_ in sorted(toc_cache.toc, key=lambda entry: entry[1])]
+            else:
+                file_list = get_file_names_from_elf(io.BytesIO(self.elf_bin))
+
+            if file_list is None:
+                raise RuntimeError("cannot get file names from elf")
+
+            self._file_list = file_list
+        return self._file_list
+
+    @property
+    def file_entry_list(self) -> "list[tuple[int, int]]":
+        return [(entry.offset, entry.size) for entry in self.toc_entry_list]
+
+    @property
+    def ingame_message_table_names(self) -> "tuple[list[str] | None, Locale, str]":
+        if self._table_names is None:
+            toc_cache = self._load_toc_cache()
+            if toc_cache is not None:
+                locale = Locale.from_string(toc_cache.locale)
+                self._table_names = toc_cache.table_names, locale, toc_cache.elf_name
+            else:
+                table_names = get_ingame_message_table_names_from_elf(io.BytesIO(self.elf_bin))
+                locale, elf_name = Locale.from_elf_path(self.elf_path or "")
+                self._table_names = table_names, locale, elf_name
+        return self._table_names
+
+    @contextmanager
+    def open_rw(self) -> Generator[BinaryIO, None, None]:
+        # the layout of IMG_BD is about to change, drop everything derived from the old one
+        self.invalidate()
+        try:
+            with open(self.iso_path, "rb+") as iso_fh:
+                yield iso_fh
+        finally:
+            self.invalidate()
+
+    def invalidate(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self._toc_cache = None
+        self._toc_cache_loaded = False
+        invalidate_toc_cache(self.iso_path)
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+        if self._iso is not None:
+            self._iso.close()
+            self._iso = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}[{self.iso_path}]"
+
+
+@contextmanager
+def open_iso_session(iso: "str | ProjectZeroISO") -> Generator[ProjectZeroISO, None, None]:
+    if isinstance(iso, ProjectZeroISO):
+        yield iso
+        return
+
+    with ProjectZeroISO(iso) as session:
+        yield session